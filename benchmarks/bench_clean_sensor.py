@@ -0,0 +1,94 @@
+"""Benchmark the sensor cleaning paths on typical ESP32 payloads.
+
+Compares the full ``FIELD_MAP`` scan the cleaner used to do per record with
+the cached per-shape plans in ``clean_sensor_data`` and the NumPy batch path.
+
+Usage:
+    python benchmarks/bench_clean_sensor.py [--records 100000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from transform.clean_sensor import FIELD_MAP, clean_sensor_batch, clean_sensor_data
+
+
+def full_scan_clean(sensor_data: dict) -> dict:
+    """Reference cleaner that checks every FIELD_MAP entry for every record."""
+    logging.info(
+        "Cleaning sensor data: %s at %s",
+        sensor_data.get("sensor_id", "unknown"),
+        sensor_data.get("timestamp", "unknown"),
+    )
+    cleaned = {}
+    for raw_field, (clean_field, transformer) in FIELD_MAP.items():
+        if raw_field in sensor_data:
+            try:
+                cleaned[clean_field] = transformer(sensor_data[raw_field])
+            except Exception:
+                cleaned[clean_field] = None
+    return cleaned
+
+
+def esp32_payloads(count: int) -> list[dict]:
+    """Build ESP32-style payloads from a few device models with fixed key sets."""
+    payloads = []
+    for index in range(count):
+        payload = {
+            "sensor_id": f"esp32_{index % 200:03d}",
+            "timestamp": "2025-06-29T14:00:00",
+            "temperature_c": f"{random.uniform(-5, 40):.2f}",
+            "humidity": f"{random.uniform(10, 100):.1f}",
+            "pressure_hpa": f"{random.uniform(990, 1030):.1f}",
+            "battery_level": random.randint(20, 100),
+            "signal_strength": random.randint(-90, -40),
+        }
+        if index % 3 == 0:
+            payload["wind_speed_mps"] = f"{random.uniform(0, 15):.1f}"
+            payload["wind_direction"] = random.randint(0, 359)
+        if index % 5 == 0:
+            payload["data_quality"] = "good"
+        payloads.append(payload)
+    return payloads
+
+
+def timed(label: str, func, payloads: list[dict], baseline: float = None) -> float:
+    """Run ``func`` over the payloads and print records per second."""
+    start = time.perf_counter()
+    func(payloads)
+    elapsed = time.perf_counter() - start
+    rate = len(payloads) / elapsed
+    speedup = f"  ({baseline / elapsed:.2f}x)" if baseline else ""
+    print(f"{label:<28}{elapsed:8.3f} s {rate:12,.0f} rec/s{speedup}")
+    return elapsed
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, force=True)
+    payloads = esp32_payloads(args.records)
+
+    baseline = timed(
+        "full FIELD_MAP scan", lambda rows: [full_scan_clean(r) for r in rows], payloads
+    )
+    timed(
+        "cached plans",
+        lambda rows: [clean_sensor_data(r) for r in rows],
+        payloads,
+        baseline,
+    )
+    timed("numpy batch", clean_sensor_batch, payloads, baseline)
+
+
+if __name__ == "__main__":
+    main()
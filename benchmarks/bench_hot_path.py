@@ -0,0 +1,279 @@
+"""Offline benchmark suite for the ingest hot path.
+
+Times every stage a reading passes through, against an in-memory MongoDB
+stand-in (mongomock) so no server is needed:
+
+- ``clean``: ``transform.clean_sensor.clean_sensor_data`` on flat payloads
+- ``schema_cleaned``: the flat ``validation.schemas.cleaned_sensor_data`` model
+- ``schema_nested``: the nested ``validation.schemas.weather_sensor_data`` model
+- ``insert``: ``WeatherDB.insert_sensor_data``
+- ``upload``: ``POST /upload`` through the Flask test client
+
+Each stage runs at a minimal and a fully populated payload size, without an
+image and with embedded base64 images. Throughput and p50/p99 latency per
+case are written as JSON. With ``--baseline`` the run is compared against an
+earlier result file and exits with status 1 if any case lost more than
+``--max-regression`` of its throughput or grew its p99 latency by as much.
+
+Usage:
+    python benchmarks/bench_hot_path.py --output bench-results.json
+    python benchmarks/bench_hot_path.py --baseline bench-results.json --max-regression 0.15
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import mongomock
+
+from database.mongo_ops import WeatherDB
+from ingestion.image_jobs import ImageJobQueue
+from observability.structured_logging import configure_logging, shutdown_logging
+from transform.clean_sensor import clean_sensor_data
+from validation.schemas.cleaned_sensor_data import (
+    WeatherSensorData as CleanedSensorData,
+)
+from validation.schemas.weather_sensor_data import WeatherSensorData
+
+# Embedded image sizes (raw bytes before base64), keyed by case suffix
+IMAGE_SIZES = {"no_image": 0, "img_16k": 16 * 1024, "img_256k": 256 * 1024}
+PAYLOAD_SIZES = ("minimal", "full")
+
+
+def image_base64(size: int) -> str:
+    """Return ``size`` random bytes as base64 text."""
+    return base64.b64encode(random.randbytes(size)).decode()
+
+
+def flat_payload(size: str, image: str) -> dict:
+    """Raw flat ESP32 payload as handled by ``clean_sensor_data``."""
+    payload = {
+        "sensor_id": "esp32_01",
+        "timestamp": "2025-06-29T14:00:00",
+        "temperature_c": "31.4",
+        "humidity": "62.5",
+    }
+    if size == "full":
+        payload.update(
+            pressure_hpa="1008.2",
+            wind_speed_mps="3.1",
+            wind_direction="270",
+            dew_point_c="22.9",
+            heat_index_c="35.0",
+            battery_level=87,
+            signal_strength=-61,
+            data_quality="true",
+            location="Delhi rooftop",
+            model="ESP32-CAM",
+            firmware_version="1.4.2",
+            sensor_type="BME280",
+            upload_status="received",
+            processing_notes="edge filtered",
+        )
+    if image:
+        payload["raw_data"] = image
+    return payload
+
+
+def cleaned_record(size: str, image: str) -> dict:
+    """Cleaned flat record as validated by the cleaned-data schema."""
+    return clean_sensor_data(flat_payload(size, image))
+
+
+def nested_payload(size: str, image: str) -> dict:
+    """Nested payload as posted to the ingestion app."""
+    payload = {
+        "timestamp": "2025-06-29T14:00:00",
+        "sensor_id": "esp32_01",
+        "location": {"lat": 28.6139, "lon": 77.2090},
+        "readings": {"temperature_c": 31.4, "humidity_percent": 62.5},
+        "device_info": {"battery_level": 87},
+    }
+    if size == "full":
+        payload["location"].update(description="Delhi rooftop", altitude=216.0)
+        payload["readings"].update(
+            pressure_hpa=1008.2,
+            wind_speed_mps=3.1,
+            wind_direction_deg=270,
+            rain_mm=0.0,
+            sunlight_lux=51000,
+            dew_point_c=22.9,
+            heat_index_c=35.0,
+        )
+        payload["device_info"].update(
+            model="ESP32-CAM", firmware_version="1.4.2", signal_strength=-61
+        )
+        payload["upload"] = {"upload_time": "2025-06-29T14:00:03", "status": "received"}
+        payload["logs"] = {"processing_notes": "edge filtered"}
+        payload["comments"] = "scheduled reading"
+    if image:
+        payload["image"] = {"base64_data": image, "format": "jpeg"}
+    return payload
+
+
+def measure(func, make_args, iterations: int, warmup: int) -> dict:
+    """Time ``func(*make_args())`` per call; argument creation is not timed."""
+    for _ in range(warmup):
+        func(*make_args())
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        args = make_args()
+        begin = time.perf_counter_ns()
+        func(*args)
+        latencies.append(time.perf_counter_ns() - begin)
+    wall = time.perf_counter() - started
+    latencies.sort()
+    busy = sum(latencies) / 1e9
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / busy,
+        "p50_us": latencies[len(latencies) // 2] / 1000,
+        "p99_us": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1000,
+        "wall_seconds": wall,
+    }
+
+
+def build_cases(workdir: str):
+    """Yield ``(name, func, make_args)`` for every stage, size and image variant."""
+    # Log into the work directory; the app then keeps this logging setup
+    configure_logging(log_file=os.path.join(workdir, "logs", "system.log"))
+    from ingestion import app as ingestion_app
+
+    weather_db = WeatherDB(
+        client=mongomock.MongoClient(), latest_cache_size=0, dedupe_filter_size=0
+    )
+    upload_dir = os.path.join(workdir, "uploads")
+    ingestion_app.app.config["UPLOAD_FOLDER"] = upload_dir
+    ingestion_app.image_jobs = ImageJobQueue(os.path.join(workdir, "jobs"))
+    client = ingestion_app.app.test_client()
+
+    def upload(body):
+        response = client.post(
+            "/upload",
+            data={
+                "file": (io.BytesIO(body), "frame.jpg"),
+                "sensor_id": "esp32_01",
+                "timestamp": "2025-06-29T14:00:00",
+            },
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 200, response.get_json()
+
+    for image_case, image_size in IMAGE_SIZES.items():
+        image = image_base64(image_size) if image_size else ""
+        for size in PAYLOAD_SIZES:
+            suffix = f"{size}/{image_case}"
+            flat = flat_payload(size, image)
+            cleaned = cleaned_record(size, image)
+            nested = nested_payload(size, image)
+            yield f"clean/{suffix}", clean_sensor_data, lambda p=flat: (dict(p),)
+            yield f"schema_cleaned/{suffix}", lambda r: CleanedSensorData(
+                **r
+            ), lambda r=cleaned: (r,)
+            yield f"schema_nested/{suffix}", lambda p: WeatherSensorData(
+                **p
+            ), lambda p=nested: (p,)
+            yield (
+                f"insert/{suffix}",
+                weather_db.insert_sensor_data,
+                lambda p=nested: (
+                    WeatherSensorData(**p).model_dump(exclude_none=True),
+                ),
+            )
+        body = random.randbytes(image_size or 1024)
+        yield f"upload/{image_case}", upload, lambda b=body: (b,)
+
+
+def run_suite(iterations: int, warmup: int, only=None) -> dict:
+    """Run every case and return the JSON-ready result document."""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, func, make_args in build_cases(workdir):
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            # Keep the app's per-request console logging out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[name] = measure(func, make_args, iterations, warmup)
+            row = results[name]
+            print(
+                f"{name:<34}{row['ops_per_sec']:12,.0f} ops/s"
+                f"{row['p50_us']:10.1f} us p50{row['p99_us']:10.1f} us p99"
+            )
+        shutdown_logging()
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": iterations,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Return a message for every case that regressed beyond the threshold."""
+    failures = []
+    for name, base in baseline["results"].items():
+        row = current["results"].get(name)
+        if row is None:
+            continue
+        if row["ops_per_sec"] < base["ops_per_sec"] * (1 - max_regression):
+            failures.append(
+                f"{name}: throughput {row['ops_per_sec']:,.0f} ops/s"
+                f" vs baseline {base['ops_per_sec']:,.0f} ops/s"
+            )
+        if row["p99_us"] > base["p99_us"] * (1 + max_regression):
+            failures.append(
+                f"{name}: p99 {row['p99_us']:.1f} us vs baseline {base['p99_us']:.1f} us"
+            )
+    return failures
+
+
+def main():
+    """Parse arguments, run the suite and apply the regression check."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.15,
+        help="allowed fractional throughput loss / p99 growth per case",
+    )
+    parser.add_argument(
+        "--only", action="append", help="run only cases with this name prefix"
+    )
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore", DeprecationWarning)
+    current = run_suite(args.iterations, args.warmup, args.only)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(current, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            failures = compare(current, json.load(baseline_file), args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+        print("No regressions beyond threshold.")
+
+
+if __name__ == "__main__":
+    main()
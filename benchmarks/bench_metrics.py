@@ -0,0 +1,84 @@
+"""Measure the overhead of the ingest stage instrumentation.
+
+Reports the cost of one ``metrics.stage`` block on its own, and the relative
+slowdown of the validate + insert path (against mongomock) with and without
+the instrumentation, to check it can stay enabled in production.
+
+Usage:
+    python benchmarks/bench_metrics.py [--records 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import mongomock
+
+from database.mongo_ops import WeatherDB
+from observability import metrics
+from validation.schemas.weather_sensor_data import WeatherSensorData
+
+PAYLOAD = {
+    "timestamp": "2025-06-29T14:00:00",
+    "sensor_id": "esp32_01",
+    "location": {"lat": 28.6139, "lon": 77.2090},
+    "readings": {"temperature_c": 31.4, "humidity_percent": 62.5},
+    "device_info": {"battery_level": 87},
+}
+
+
+def plain(weather_db):
+    """Validate and insert one record without instrumentation."""
+    record = WeatherSensorData(**PAYLOAD).model_dump(exclude_none=True)
+    weather_db.insert_sensor_data(record)
+
+
+def instrumented(weather_db):
+    """Validate and insert one record the way ``ingestion.app`` does."""
+    with metrics.stage("validate"):
+        record = WeatherSensorData(**PAYLOAD).model_dump(exclude_none=True)
+    with metrics.stage("insert"):
+        weather_db.insert_sensor_data(record)
+
+
+def per_call(func, count: int) -> float:
+    """Return the mean seconds per call of ``func()``."""
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    """Parse arguments and run the measurements."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20_000)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    def empty_stage():
+        with metrics.stage("bench"):
+            pass
+
+    per_call(empty_stage, 1000)
+    stage_cost = per_call(empty_stage, args.records * 10)
+    print(f"metrics.stage overhead         {stage_cost * 1e6:8.2f} us per stage")
+
+    results = {}
+    for label, func in (("plain", plain), ("instrumented", instrumented)):
+        weather_db = WeatherDB(
+            client=mongomock.MongoClient(), latest_cache_size=0, dedupe_filter_size=0
+        )
+        per_call(lambda: func(weather_db), 500)
+        results[label] = per_call(lambda: func(weather_db), args.records)
+        print(f"validate + insert {label:<13}{results[label] * 1e6:8.2f} us per record")
+    overhead = results["instrumented"] / results["plain"] - 1
+    print(f"instrumentation overhead       {overhead * 100:8.2f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark async ingest batch throughput with 1..N worker processes.
+
+Feeds the same batches through the process-mode store path of
+``ingestion.async_app`` (validate, then ``insert_sensor_data_many``) with a
+database stub that discards the documents, so the numbers show how the
+CPU-bound part scales with cores. Compare against the thread mode row, which
+is what a single ingestion process achieves under the GIL.
+
+Usage:
+    python benchmarks/bench_process_pool.py [--records 100000] [--processes 1 2 4 8]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from bench_validation import nested_payloads  # noqa: E402
+
+from ingestion.async_app import _init_worker, _store_in_worker, store_batch
+
+
+class DiscardDB:
+    """Stands in for WeatherDB; every document is reported as stored."""
+
+    def insert_sensor_data_many(self, documents):
+        return [(index, None) for index in range(len(documents))]
+
+
+def discard_db():
+    """Worker database factory (module level so it pickles)."""
+    return DiscardDB()
+
+
+def run_processes(batches: list, processes: int) -> float:
+    """Store all batches on a pool of worker processes; return the seconds taken."""
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(discard_db,),
+    ) as pool:
+        # Start the workers before timing
+        list(pool.map(_store_in_worker, [[]] * processes))
+        start = time.perf_counter()
+        list(pool.map(_store_in_worker, batches))
+        return time.perf_counter() - start
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--processes", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()]
+    )
+    args = parser.parse_args()
+
+    payloads = nested_payloads(args.records)
+    batches = [
+        payloads[start : start + args.batch_size]
+        for start in range(0, len(payloads), args.batch_size)
+    ]
+
+    start = time.perf_counter()
+    for batch in batches:
+        store_batch(DiscardDB(), batch)
+    baseline = time.perf_counter() - start
+    print(f"{'threads (1 process)':<22}{args.records / baseline:12,.0f} records/s")
+    for processes in sorted(set(args.processes)):
+        elapsed = run_processes(batches, processes)
+        print(
+            f"{f'{processes} worker(s)':<22}{args.records / elapsed:12,.0f} records/s"
+            f"  ({baseline / elapsed:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark ingestion app cold start: process start to first request served.
+
+Starts fresh interpreters that import ``ingestion.app``, build the app with
+``create_app()`` and serve one ``/ingest/bulk`` request through the Flask test
+client, and reports the median time of each phase. Without ``--mongo-uri`` the
+app gets an in-memory MongoDB; with it, the real client is created lazily by
+the first request (or by the warm-up with ``--warm``).
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 7] [--warm] [--budget 1.5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"))
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from ingestion import app as ingestion_app
+imported = time.perf_counter()
+weather_db = None
+if not {mongo_uri!r}:
+    import mongomock
+    from database.mongo_ops import WeatherDB
+    weather_db = WeatherDB(client=mongomock.MongoClient())
+app = ingestion_app.create_app(weather_db=weather_db, warm={warm!r})
+created = time.perf_counter()
+response = app.test_client().post("/ingest/bulk", json=[{{
+    "timestamp": "2025-06-29T14:00:00",
+    "sensor_id": "esp32_01",
+    "location": {{"lat": 28.6139, "lon": 77.209}},
+    "readings": {{"temperature_c": 36.5}},
+    "device_info": {{"model": "ESP32-CAM"}},
+}}])
+assert response.status_code == 200, response.get_data()
+served = time.perf_counter()
+print(json.dumps({{
+    "import": imported - started,
+    "create_app": created - imported,
+    "first_request": served - created,
+}}))
+"""
+
+
+def run_once(mongo_uri: str, warm: bool) -> dict:
+    """Start one interpreter and return its phase timings plus the process wall time."""
+    env = dict(os.environ, PYTHONPATH=SRC)
+    if mongo_uri:
+        env["MONGO_URI"] = mongo_uri
+    # The app writes logs/ relative to the working directory
+    with tempfile.TemporaryDirectory() as workdir:
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD.format(mongo_uri=mongo_uri, warm=warm)],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        process = time.perf_counter() - started
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process"] = process
+    return timings
+
+
+def main():
+    """Parse arguments, run the benchmark and enforce the budget."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--warm", action="store_true", help="warm up in create_app")
+    parser.add_argument("--mongo-uri", default="", help="use a real MongoDB")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        help="fail if the median process time exceeds this many seconds",
+    )
+    args = parser.parse_args()
+
+    runs = [run_once(args.mongo_uri, args.warm) for _ in range(args.runs)]
+    medians = {
+        phase: statistics.median(run[phase] for run in runs) for phase in runs[0]
+    }
+    for phase, seconds in medians.items():
+        print(f"{phase:<15}{seconds * 1000:9.1f} ms")
+
+    if args.budget is not None and medians["process"] > args.budget:
+        print(
+            f"startup {medians['process']:.3f}s exceeds budget {args.budget:.3f}s",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark WeatherSensorData validation, per record versus batched.
+
+Compares the per-record ``WeatherSensorData(**payload).dict(exclude_none=True)``
+the ingestion app used to run with ``validate_sensor_batch`` in validating and
+trusted mode, and reports the time per 10k records.
+
+Usage:
+    python benchmarks/bench_validation.py [--records 50000] [--batch-size 500]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from validation.batch import validate_sensor_batch
+from validation.schemas.weather_sensor_data import WeatherSensorData
+
+
+def nested_payloads(count: int) -> list[dict]:
+    """Build nested payloads like those posted by the ESP32 stations."""
+    return [
+        {
+            "timestamp": "2025-06-29T14:00:00",
+            "sensor_id": f"esp32_{index % 200:03d}",
+            "location": {"lat": 28.6139, "lon": 77.2090, "description": "Delhi"},
+            "readings": {
+                "temperature_c": random.uniform(-5, 40),
+                "humidity_percent": random.uniform(10, 100),
+                "pressure_hpa": random.uniform(990, 1030),
+                "wind_speed_mps": random.uniform(0, 15),
+            },
+            "device_info": {
+                "model": "ESP32-CAM",
+                "battery_level": random.randint(20, 100),
+                "signal_strength": random.randint(-90, -40),
+                "firmware_version": "1.4.2",
+            },
+            "upload": {"upload_time": "2025-06-29T14:00:05", "status": "received"},
+            "logs": {"processing_notes": "edge filtered"},
+            "image": {"format": "jpeg", "width": 640, "height": 480},
+        }
+        for index in range(count)
+    ]
+
+
+def in_batches(func, batch_size):
+    """Apply a batch function to consecutive slices of the payload list."""
+
+    def run(payloads):
+        for start in range(0, len(payloads), batch_size):
+            func(payloads[start : start + batch_size])
+
+    return run
+
+
+def timed(label: str, func, payloads: list[dict], baseline: float = None) -> float:
+    """Run ``func`` over the payloads and print the time per 10k records."""
+    start = time.perf_counter()
+    func(payloads)
+    elapsed = time.perf_counter() - start
+    per_10k = elapsed / len(payloads) * 10_000
+    speedup = f"  ({baseline / elapsed:.2f}x)" if baseline else ""
+    print(f"{label:<28}{per_10k * 1000:9.1f} ms / 10k records{speedup}")
+    return elapsed
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore", DeprecationWarning)
+    payloads = nested_payloads(args.records)
+
+    baseline = timed(
+        "per-record .dict()",
+        lambda rows: [WeatherSensorData(**r).dict(exclude_none=True) for r in rows],
+        payloads,
+    )
+    timed(
+        "batch validate",
+        in_batches(validate_sensor_batch, args.batch_size),
+        payloads,
+        baseline,
+    )
+    timed(
+        "batch trusted",
+        in_batches(
+            lambda rows: validate_sensor_batch(rows, trusted=True), args.batch_size
+        ),
+        payloads,
+        baseline,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Content-addressed on-disk store for sensor and cloud images.
+
+Images are stored once per distinct content under the hex SHA-256 of their
+bytes, sharded into nested directories (``ab/cd/abcd...``) so no directory
+grows too large. Identical frames are therefore deduplicated, and MongoDB
+documents only need to carry the hash, size and format.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "storage/blobs")
+
+
+class BlobStore:
+    """Stores byte blobs on disk keyed by their SHA-256 digest."""
+
+    def __init__(self, root=BLOB_STORE_DIR, shard_levels=2, shard_width=2):
+        """Create a store rooted at ``root``.
+
+        Args:
+            root (str | Path): Directory that holds the sharded blob tree.
+            shard_levels (int): Number of nested shard directories.
+            shard_width (int): Hex characters of the digest used per shard level.
+        """
+        self.root = Path(root)
+        self.shard_levels = shard_levels
+        self.shard_width = shard_width
+
+    def path_for(self, sha256: str) -> Path:
+        """Return the file path of a blob digest."""
+        shards = [
+            sha256[level * self.shard_width : (level + 1) * self.shard_width]
+            for level in range(self.shard_levels)
+        ]
+        return self.root.joinpath(*shards, sha256)
+
+    def put(self, data: bytes) -> tuple[str, int]:
+        """Store a blob unless identical content is already present.
+
+        The blob is written to a temporary file and renamed into place, so
+        readers never see a partially written blob.
+
+        Args:
+            data (bytes): Blob content.
+
+        Returns:
+            tuple[str, int]: Hex SHA-256 digest and size in bytes.
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.path_for(sha256)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    tmp_file.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        return sha256, len(data)
+
+    def exists(self, sha256: str) -> bool:
+        """Return True if a blob with this digest is stored."""
+        return self.path_for(sha256).exists()
+
+    def open(self, sha256: str):
+        """Open a stored blob for streaming reads.
+
+        Raises:
+            FileNotFoundError: If no blob has this digest.
+        """
+        return open(self.path_for(sha256), "rb")
+
+    def get(self, sha256: str) -> bytes:
+        """Read a stored blob fully into memory.
+
+        Raises:
+            FileNotFoundError: If no blob has this digest.
+        """
+        with self.open(sha256) as blob:
+            return blob.read()
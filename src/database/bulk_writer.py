@@ -0,0 +1,180 @@
+"""Buffered bulk writer for high-rate sensor inserts.
+
+Collects cleaned sensor documents in memory and writes them to MongoDB with
+unordered ``insert_many`` calls once the buffer reaches a size or age threshold,
+so many readings share a single database round trip. Every submitted document
+gets a ``Future`` that resolves to its inserted ``_id`` or raises the error
+reported for that document.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# MongoDB error code for a unique index (or ``_id``) violation
+DUPLICATE_KEY = 11000
+
+
+class BulkWriteFailure(Exception):
+    """Raised through a document's future when MongoDB rejected that document."""
+
+    def __init__(self, message, code=None):
+        """Store the server error message and code for the rejected document."""
+        super().__init__(message)
+        self.code = code
+
+
+def insert_many_unordered(collection, documents: list) -> list:
+    """Insert documents with one unordered ``insert_many`` and report each outcome.
+
+    Args:
+        collection: Target pymongo collection.
+        documents (list): Mongo-ready documents; pymongo assigns missing ``_id``s.
+
+    Returns:
+        list: One ``(inserted_id, error)`` pair per document, in input order, where
+        exactly one of the two is None.
+    """
+    if not documents:
+        return []
+    try:
+        collection.insert_many(documents, ordered=False)
+    except BulkWriteError as exc:
+        failures = {
+            error["index"]: BulkWriteFailure(
+                error.get("errmsg", "write failed"), code=error.get("code")
+            )
+            for error in exc.details.get("writeErrors", [])
+        }
+        return [
+            (None, failures[index]) if index in failures else (document["_id"], None)
+            for index, document in enumerate(documents)
+        ]
+    except Exception as exc:  # connection loss etc.: nothing is known to be stored
+        return [(None, exc) for _ in documents]
+    return [(document["_id"], None) for document in documents]
+
+
+class SensorBulkWriter:
+    """Buffers sensor documents and flushes them with unordered ``insert_many``.
+
+    A flush happens when the buffer holds ``max_batch_size`` documents, when the
+    oldest buffered document is ``max_age`` seconds old, or when ``close()`` is
+    called. Size-triggered flushes run on the submitting thread; age-triggered
+    flushes run on a background daemon thread.
+    """
+
+    def __init__(self, collection, max_batch_size=500, max_age=0.25, on_written=None):
+        """Start the writer for a pymongo collection.
+
+        Args:
+            collection: Target pymongo collection.
+            max_batch_size (int): Number of buffered documents that triggers a flush.
+            max_age (float): Seconds the oldest buffered document may wait.
+            on_written (Callable, optional): Called with the list of documents of
+                each flush that were stored successfully, after their futures
+                are resolved. Its errors are logged, not raised.
+        """
+        self.collection = collection
+        self.on_written = on_written
+        self.max_batch_size = max_batch_size
+        self.max_age = max_age
+        self._buffer = []
+        self._oldest = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sensor-bulk-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, document: dict) -> Future:
+        """Buffer a document for insertion.
+
+        Args:
+            document (dict): Mongo-ready sensor document.
+
+        Returns:
+            Future: Resolves to the inserted ``_id``, or raises ``BulkWriteFailure``
+            (or the driver error) if the document was not stored.
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SensorBulkWriter is closed")
+            if not self._buffer:
+                self._oldest = time.monotonic()
+                self._wakeup.set()
+            self._buffer.append((document, future))
+            full = len(self._buffer) >= self.max_batch_size
+        if full:
+            self.flush()
+        return future
+
+    def flush(self) -> int:
+        """Write every buffered document now.
+
+        Returns:
+            int: Number of documents handed to MongoDB.
+        """
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            self._oldest = None
+        if batch:
+            self._write(batch)
+        return len(batch)
+
+    def close(self):
+        """Stop the age-flush thread and write whatever is still buffered."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        """Flush the buffer whenever its oldest document exceeds ``max_age``."""
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                deadline = None if self._oldest is None else self._oldest + self.max_age
+            timeout = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            if deadline is not None and time.monotonic() >= deadline:
+                self.flush()
+
+    def _write(self, batch):
+        """Insert one batch and resolve the future of every document in it."""
+        outcomes = insert_many_unordered(
+            self.collection, [document for document, _ in batch]
+        )
+        for (_, future), (inserted_id, error) in zip(batch, outcomes):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(inserted_id)
+        if self.on_written is not None:
+            # The documents are stored; a failing hook must not fail them or
+            # stop the age-flush thread
+            try:
+                self.on_written(
+                    [
+                        doc
+                        for (doc, _), (_, error) in zip(batch, outcomes)
+                        if error is None
+                    ]
+                )
+            except Exception:
+                logger.exception("Post-write hook failed after a bulk flush")
@@ -0,0 +1,131 @@
+"""Process-wide MongoDB clients and named write profiles.
+
+A ``MongoClient`` owns a connection pool and monitoring threads, so every
+``WeatherDB`` in a process should share one client per server instead of
+opening its own. ``get_client`` keeps one client per URI, created with the
+pool limits and timeouts below (tunable through ``MONGO_*`` environment
+variables or per call). Clients are not fork-safe: a forked child that asks
+for a client gets a new one rather than its parent's.
+
+Write profiles are named read/write concern presets for the database handle:
+
+- ``durable``: majority write concern, journaled, primary reads. The
+  default for ingestion.
+- ``fast_ingest``: ``w=1`` without journaling, for high-rate ingest that
+  tolerates losing the last writes on failover.
+- ``replay``: unacknowledged writes (``w=0``), for replay and backfill jobs
+  whose source can be re-run. Write errors, including duplicates, are not
+  reported.
+- ``analytics_read``: secondary-preferred reads, keeping reports and
+  dashboards off the primary.
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+from pymongo import MongoClient, ReadPreference, WriteConcern
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URI = "mongodb://localhost:27017/"
+
+# Pool limits and timeouts of clients created by get_client
+CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+    "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000")),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+    "serverSelectionTimeoutMS": int(
+        os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000")
+    ),
+    "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000")),
+}
+
+WRITE_PROFILES = {
+    "durable": {
+        "write_concern": WriteConcern(w="majority", j=True),
+        "read_preference": ReadPreference.PRIMARY,
+    },
+    "fast_ingest": {
+        "write_concern": WriteConcern(w=1, j=False),
+        "read_preference": ReadPreference.PRIMARY,
+    },
+    "replay": {
+        "write_concern": WriteConcern(w=0),
+        "read_preference": ReadPreference.PRIMARY,
+    },
+    "analytics_read": {
+        "read_preference": ReadPreference.SECONDARY_PREFERRED,
+    },
+}
+
+_clients = {}
+_options = {}
+_owner_pid = os.getpid()
+_lock = threading.Lock()
+
+
+def get_client(uri=None, **options) -> MongoClient:
+    """Return the shared client for a URI, creating it on first use.
+
+    Args:
+        uri (str, optional): MongoDB URI; defaults to ``$MONGO_URI`` or localhost.
+        **options: ``MongoClient`` options overriding ``CLIENT_OPTIONS``. They
+            only apply when the client is created; a later call asking for
+            different options gets the existing client and a warning.
+
+    Returns:
+        MongoClient: A client that connects on its first operation.
+    """
+    global _owner_pid
+    uri = uri or os.getenv("MONGO_URI", DEFAULT_URI)
+    settings = CLIENT_OPTIONS | options
+    with _lock:
+        if os.getpid() != _owner_pid:
+            # Forked child: the parent's pools and monitor threads are unusable
+            _clients.clear()
+            _options.clear()
+            _owner_pid = os.getpid()
+        client = _clients.get(uri)
+        if client is None:
+            client = MongoClient(uri, connect=False, **settings)
+            _clients[uri] = client
+            _options[uri] = settings
+        elif options and settings != _options[uri]:
+            logger.warning(
+                "Shared MongoDB client already exists with other options",
+                extra={"data": {"requested": options, "in_use": _options[uri]}},
+            )
+    return client
+
+
+def close_clients():
+    """Close every shared client (at exit, or between tests)."""
+    with _lock:
+        clients = list(_clients.values()) if os.getpid() == _owner_pid else []
+        _clients.clear()
+        _options.clear()
+    for client in clients:
+        client.close()
+
+
+def profile_options(profile) -> dict:
+    """Return the ``get_database`` options of a write profile name (None for none).
+
+    Raises:
+        ValueError: If the profile is unknown.
+    """
+    if profile is None:
+        return {}
+    try:
+        return WRITE_PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"unknown write profile {profile!r}; expected one of {sorted(WRITE_PROFILES)}"
+        ) from None
+
+
+atexit.register(close_clients)
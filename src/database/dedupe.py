@@ -0,0 +1,185 @@
+"""Duplicate suppression for retried sensor readings.
+
+Devices resend a reading when an acknowledgement times out, so the same
+reading can arrive several times. A reading is identified by its
+``sensor_id``, ``timestamp`` and optional client ``message_id``;
+``WeatherDB.ensure_schema`` backs that key with a unique index on a regular
+``sensor_data`` collection, and ``RecentReadingFilter`` remembers the keys of
+recently stored readings in a Bloom filter.
+
+A Bloom filter never misses a key it has seen but may report an unseen key
+as seen (at about ``error_rate`` per generation). A hit is therefore only a
+hint that has to be confirmed with a ``reading_query`` lookup, so the filter
+saves no round trips for duplicates:
+
+- With the unique index, ``WeatherDB`` ignores the filter. A duplicate costs
+  the one insert that fails with a duplicate-key error, exactly what a
+  confirming lookup would cost.
+- Time-series collections cannot hold unique indexes. There the filter
+  decides which readings are looked up before the insert: a duplicate costs
+  one lookup instead of being stored twice, and a new reading (a filter miss,
+  the common case) costs no lookup at all. A false positive costs a lookup,
+  never a reading.
+"""
+
+import hashlib
+import math
+import threading
+from datetime import timezone
+
+from database.bulk_writer import DUPLICATE_KEY, BulkWriteFailure
+
+
+class DuplicateReading(BulkWriteFailure):
+    """Reported for a reading whose key is already stored."""
+
+    def __init__(self, message="already stored"):
+        """Mark the failure with MongoDB's duplicate-key code."""
+        super().__init__(message, code=DUPLICATE_KEY)
+
+
+def is_duplicate(error) -> bool:
+    """Return True if an insert error means the document was already stored."""
+    return isinstance(error, BulkWriteFailure) and error.code == DUPLICATE_KEY
+
+
+def reading_key(document: dict):
+    """Return the idempotency key of a sensor document, or None.
+
+    Timestamps are normalized to naive UTC at millisecond precision, the
+    form MongoDB stores, so keys match whatever the unique index compares.
+
+    Returns:
+        bytes or None: The key, or None without a ``sensor_id`` or a datetime
+        ``timestamp``.
+    """
+    query = reading_query(document)
+    if query is None:
+        return None
+    return "\x1f".join(
+        (
+            str(query["sensor_id"]),
+            query["timestamp"].isoformat(timespec="milliseconds"),
+            "" if query["message_id"] is None else str(query["message_id"]),
+        )
+    ).encode()
+
+
+def reading_query(document: dict):
+    """Return a MongoDB filter matching the stored copy of a reading, or None.
+
+    The filter covers the (sensor_id, timestamp, message_id) index fields;
+    ``message_id: None`` also matches documents without one.
+
+    Returns:
+        dict or None: The filter, or None without a ``sensor_id`` or a
+        datetime ``timestamp``.
+    """
+    sensor_id = document.get("sensor_id")
+    timestamp = document.get("timestamp")
+    if sensor_id is None or not hasattr(timestamp, "isoformat"):
+        return None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    timestamp = timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000)
+    return {
+        "sensor_id": sensor_id,
+        "timestamp": timestamp,
+        "message_id": document.get("message_id"),
+    }
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over byte keys."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        """Size the bit array for ``capacity`` keys at the given false-positive rate."""
+        self.capacity = capacity
+        self.bits = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.count = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key: bytes):
+        """Yield the bit positions of a key (double hashing of one digest)."""
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def add(self, key: bytes):
+        """Record a key."""
+        for position in self._positions(key):
+            self._array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        """Return True if the key may have been added."""
+        return all(
+            self._array[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class RecentReadingFilter:
+    """Thread-safe Bloom filter of recently stored reading keys.
+
+    Keys go into the current generation; once it holds ``capacity`` keys it
+    becomes the previous generation and a fresh one is started, so at least
+    the last ``capacity`` keys are always remembered and memory stays fixed.
+
+    Attributes:
+        hits (int): Lookups that found the key.
+        misses (int): Lookups that did not.
+    """
+
+    def __init__(self, capacity=100_000, error_rate=1e-6):
+        """Create an empty filter.
+
+        Args:
+            capacity (int): Keys per generation.
+            error_rate (float): False-positive rate of each generation.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.hits = 0
+        self.misses = 0
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def add(self, key: bytes):
+        """Remember a stored reading's key."""
+        with self._lock:
+            if self._current.count >= self.capacity:
+                self._previous = self._current
+                self._current = BloomFilter(self.capacity, self.error_rate)
+            self._current.add(key)
+
+    def __contains__(self, key: bytes) -> bool:
+        """Return True if the key was (probably) stored recently."""
+        with self._lock:
+            found = key in self._current or (
+                self._previous is not None and key in self._previous
+            )
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return found
+
+    def stats(self) -> dict:
+        """Return lookup counters and the memory used by the bit arrays."""
+        with self._lock:
+            generations = [self._current] + (
+                [self._previous] if self._previous is not None else []
+            )
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "keys": sum(generation.count for generation in generations),
+                "bytes": sum(len(generation._array) for generation in generations),
+            }
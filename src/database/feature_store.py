@@ -0,0 +1,329 @@
+"""Memory-mapped NumPy feature store of per-sensor numeric series.
+
+Training and backtesting slice the same fixed windows (say the last 24 hours
+of temperature, humidity and pressure per station) over and over. The store
+keeps every sensor's series in two append-only files that are memory-mapped
+on read, so a window is a view into the page cache rather than a fresh
+allocation::
+
+    <root>/index.json                  features, rows and last timestamp per sensor
+    <root>/<sensor_id>/timestamps.i8   int64 epoch milliseconds, ascending
+    <root>/<sensor_id>/values.f4       float32, one row of features per timestamp
+
+``index.json`` is the commit point: rows beyond a sensor's indexed row count
+(left by an interrupted append) are ignored and overwritten by the next
+append. Missing readings are stored as NaN. One process writes; any number
+may read.
+
+``sync`` appends the readings stored in ``WeatherDB`` since the previous
+sync. Series are append-only, so a reading that reaches MongoDB after a
+newer reading of the same sensor was synced is not picked up.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEATURES = (
+    "readings.temperature_c",
+    "readings.humidity_percent",
+    "readings.pressure_hpa",
+)
+FEATURE_SYNC_BATCH_SIZE = 10_000
+INDEX_FILE = "index.json"
+TIMESTAMPS_FILE = "timestamps.i8"
+VALUES_FILE = "values.f4"
+
+_EPOCH = datetime(1970, 1, 1)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def epoch_ms(timestamp: datetime) -> int:
+    """Return a datetime as epoch milliseconds (naive timestamps are UTC)."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // _MILLISECOND
+
+
+def _feature_value(document: dict, path: str) -> float:
+    """Return the numeric value at a dotted path, or NaN."""
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return np.nan
+        value = value.get(part)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return value
+
+
+@dataclass(frozen=True)
+class WindowBatch:
+    """Consecutive fixed-size windows of one sensor's series.
+
+    Both arrays are read-only views into the memory-mapped files.
+
+    Attributes:
+        sensor_id (str): Sensor the windows belong to.
+        timestamps (np.ndarray): int64 epoch ms, shape ``(batch, window)``.
+        values (np.ndarray): float32 features, shape ``(batch, window, features)``.
+    """
+
+    sensor_id: str
+    timestamps: np.ndarray
+    values: np.ndarray
+
+
+class FeatureStore:
+    """Append-only, memory-mapped per-sensor feature series.
+
+    Args:
+        root (str): Store directory; created if missing.
+        features (tuple[str], optional): Dotted document paths stored as value
+            columns. Fixed when the store is created; defaults to
+            temperature, humidity and pressure.
+
+    Raises:
+        ValueError: If ``features`` differs from those of an existing store.
+    """
+
+    def __init__(self, root: str, features=None):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        try:
+            with open(os.path.join(root, INDEX_FILE), encoding="utf-8") as index:
+                self.index = json.load(index)
+        except FileNotFoundError:
+            self.index = {"features": list(features or DEFAULT_FEATURES), "sensors": {}}
+        if features is not None and list(features) != self.index["features"]:
+            raise ValueError(
+                f"store at {root} holds features {self.index['features']}, "
+                f"not {list(features)}"
+            )
+        self.features = tuple(self.index["features"])
+        self._maps = {}
+
+    def _save_index(self):
+        path = os.path.join(self.root, INDEX_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as index:
+            json.dump(self.index, index)
+            index.flush()
+            os.fsync(index.fileno())
+        os.replace(path + ".tmp", path)
+
+    def sensor_ids(self) -> list:
+        """Return the IDs of all sensors in the store."""
+        return sorted(self.index["sensors"])
+
+    def __len__(self):
+        return sum(entry["rows"] for entry in self.index["sensors"].values())
+
+    def _append(self, sensor_id: str, timestamps: np.ndarray, values: np.ndarray):
+        """Append rows newer than the sensor's last row, without saving the index."""
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        values = values[order]
+        entry = self.index["sensors"].get(sensor_id)
+        last = entry["last"] if entry else None
+        keep = np.ones(len(timestamps), dtype=bool)
+        keep[1:] = timestamps[1:] > timestamps[:-1]
+        if last is not None:
+            keep &= timestamps > last
+        timestamps = timestamps[keep]
+        values = values[keep]
+        if not len(timestamps):
+            return 0
+
+        if entry is None:
+            entry = {"path": quote(sensor_id, safe=""), "rows": 0, "last": None}
+            self.index["sensors"][sensor_id] = entry
+        directory = os.path.join(self.root, entry["path"])
+        os.makedirs(directory, exist_ok=True)
+        for name, column in (
+            (TIMESTAMPS_FILE, timestamps.astype("<i8", copy=False)),
+            (VALUES_FILE, values.astype("<f4", copy=False)),
+        ):
+            with open(os.path.join(directory, name), "ab") as series:
+                # Drop a tail an interrupted append left beyond the indexed rows
+                series.truncate(entry["rows"] * column.itemsize * column[0].size)
+                series.write(np.ascontiguousarray(column).tobytes())
+                series.flush()
+                os.fsync(series.fileno())
+        entry["rows"] += len(timestamps)
+        entry["last"] = int(timestamps[-1])
+        self._maps.pop(sensor_id, None)
+        return len(timestamps)
+
+    def append(self, sensor_id: str, timestamps, values) -> int:
+        """Append rows to a sensor's series.
+
+        Args:
+            sensor_id (str): Sensor ID.
+            timestamps (array-like): Epoch milliseconds, shape ``(n,)``.
+            values (array-like): Feature values, shape ``(n, len(features))``.
+
+        Returns:
+            int: Rows appended. Rows not newer than the sensor's last row, and
+            repeated timestamps, are dropped.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float32).reshape(
+            len(timestamps), len(self.features)
+        )
+        appended = self._append(sensor_id, timestamps, values)
+        if appended:
+            self._save_index()
+        return appended
+
+    def sync(self, weather_db, batch_size=FEATURE_SYNC_BATCH_SIZE) -> int:
+        """Append the readings stored in ``weather_db`` since the last sync.
+
+        Each sensor is read from its own last stored timestamp on, through the
+        (sensor_id, timestamp) index.
+
+        Args:
+            weather_db (WeatherDB): Source of the sensor documents.
+            batch_size (int): Documents per cursor batch and per append.
+
+        Returns:
+            int: Rows appended.
+        """
+        appended = 0
+        for sensor_id in weather_db.sensor_collection.distinct("sensor_id"):
+            if not isinstance(sensor_id, str):
+                continue
+            entry = self.index["sensors"].get(sensor_id)
+            start = None
+            if entry is not None:
+                start = _EPOCH + (entry["last"] + 1) * _MILLISECOND
+            documents = []
+            for document in weather_db.find_readings(
+                sensor_id,
+                start=start,
+                fields=("timestamp",) + self.features,
+                batch_size=batch_size,
+            ):
+                if isinstance(document.get("timestamp"), datetime):
+                    documents.append(document)
+                if len(documents) >= batch_size:
+                    appended += self._append_documents(sensor_id, documents)
+                    documents = []
+            appended += self._append_documents(sensor_id, documents)
+        logger.info(
+            "Synced feature store",
+            extra={"data": {"appended": appended, "rows": len(self)}},
+        )
+        return appended
+
+    def _append_documents(self, sensor_id: str, documents: list) -> int:
+        """Append sensor documents to a series and save the index."""
+        if not documents:
+            return 0
+        timestamps = np.fromiter(
+            (epoch_ms(document["timestamp"]) for document in documents),
+            dtype=np.int64,
+            count=len(documents),
+        )
+        values = np.array(
+            [
+                [_feature_value(document, path) for path in self.features]
+                for document in documents
+            ],
+            dtype=np.float32,
+        ).reshape(len(documents), len(self.features))
+        appended = self._append(sensor_id, timestamps, values)
+        if appended:
+            self._save_index()
+        return appended
+
+    def series(self, sensor_id: str, start=None, end=None) -> tuple:
+        """Return a sensor's timestamps and values, optionally within a time range.
+
+        Args:
+            sensor_id (str): Sensor ID.
+            start (datetime, optional): Inclusive lower bound.
+            end (datetime, optional): Exclusive upper bound.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Read-only views of shape ``(n,)``
+            (int64 epoch ms) and ``(n, features)`` (float32).
+
+        Raises:
+            KeyError: If the sensor is not in the store.
+        """
+        entry = self.index["sensors"][sensor_id]
+        maps = self._maps.get(sensor_id)
+        if maps is None:
+            directory = os.path.join(self.root, entry["path"])
+            rows = entry["rows"]
+            maps = (
+                np.memmap(
+                    os.path.join(directory, TIMESTAMPS_FILE),
+                    dtype="<i8",
+                    mode="r",
+                    shape=(rows,),
+                ),
+                np.memmap(
+                    os.path.join(directory, VALUES_FILE),
+                    dtype="<f4",
+                    mode="r",
+                    shape=(rows, len(self.features)),
+                ),
+            )
+            self._maps[sensor_id] = maps
+        timestamps, values = maps
+        low = 0 if start is None else np.searchsorted(timestamps, epoch_ms(start))
+        high = (
+            len(timestamps)
+            if end is None
+            else np.searchsorted(timestamps, epoch_ms(end))
+        )
+        return timestamps[low:high], values[low:high]
+
+    def windows(
+        self,
+        sensor_ids=None,
+        window=24,
+        stride=1,
+        batch_size=256,
+        start=None,
+        end=None,
+    ):
+        """Yield batches of sliding windows over sensor series without copying.
+
+        Args:
+            sensor_ids (str | list[str], optional): Sensor ID or IDs; all if None.
+            window (int): Rows per window.
+            stride (int): Rows between the starts of consecutive windows.
+            batch_size (int): Windows per batch; batches never span sensors.
+            start (datetime, optional): Inclusive lower bound on timestamps.
+            end (datetime, optional): Exclusive upper bound on timestamps.
+
+        Yields:
+            WindowBatch: Views of up to ``batch_size`` windows of one sensor.
+        """
+        if isinstance(sensor_ids, str):
+            sensor_ids = [sensor_ids]
+        for sensor_id in self.sensor_ids() if sensor_ids is None else sensor_ids:
+            timestamps, values = self.series(sensor_id, start, end)
+            if len(timestamps) < window:
+                continue
+            timestamp_windows = sliding_window_view(timestamps, window)[::stride]
+            # (n, features, window) -> (n, window, features), still a view
+            value_windows = sliding_window_view(values, window, axis=0)[
+                ::stride
+            ].transpose(0, 2, 1)
+            for offset in range(0, len(timestamp_windows), batch_size):
+                yield WindowBatch(
+                    sensor_id,
+                    timestamp_windows[offset : offset + batch_size],
+                    value_windows[offset : offset + batch_size],
+                )
@@ -0,0 +1,113 @@
+"""In-process cache of the most recent reading per sensor.
+
+Status screens and alerting poll each station's latest reading constantly.
+``LatestReadingCache`` answers those polls from memory: ``WeatherDB`` writes
+every stored reading through to it, and reads fall back to MongoDB only on a
+miss. Entries expire after a TTL so readings stored by other processes show
+up within that bound, and the least recently used sensors are evicted once
+``maxsize`` is reached.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+
+class LatestReadingCache:
+    """Thread-safe LRU cache of the newest sensor document per ``sensor_id``.
+
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that found no live entry.
+        evictions (int): Entries dropped to stay within ``maxsize``.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0, clock=time.monotonic):
+        """Create an empty cache.
+
+        Args:
+            maxsize (int): Largest number of sensors kept.
+            ttl (float): Seconds an entry stays valid after it was stored.
+            clock (Callable[[], float]): Monotonic time source.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sensor_id: str):
+        """Return the cached latest document of a sensor, or None on a miss.
+
+        The returned document is shared with the cache and must not be modified.
+        """
+        with self._lock:
+            entry = self._entries.get(sensor_id)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[sensor_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sensor_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, document: dict):
+        """Store a document as its sensor's latest reading.
+
+        A document older than the live cached one is ignored, so late or
+        replayed readings never replace a newer one.
+        """
+        sensor_id = document.get("sensor_id")
+        if sensor_id is None:
+            return
+        timestamp = document.get("timestamp")
+        with self._lock:
+            entry = self._entries.get(sensor_id)
+            if entry is not None and entry[0] > self.clock():
+                cached = entry[1].get("timestamp")
+                if (
+                    isinstance(cached, datetime)
+                    and isinstance(timestamp, datetime)
+                    and _comparable(timestamp) < _comparable(cached)
+                ):
+                    return
+            self._entries[sensor_id] = (self.clock() + self.ttl, document)
+            self._entries.move_to_end(sensor_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, sensor_id: str):
+        """Drop a sensor's entry, if any."""
+        with self._lock:
+            self._entries.pop(sensor_id, None)
+
+    def clear(self):
+        """Drop all entries; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters, hit ratio and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def _comparable(timestamp: datetime) -> datetime:
+    """Normalize to naive UTC so naive and aware timestamps compare."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
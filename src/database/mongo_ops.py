@@ -1,24 +1,252 @@
 """MongoDB handler for weather sensor and image metadata."""
 
+import atexit
+import base64
+import binascii
+import logging
 import os
+import time
+from concurrent.futures import Future
 from datetime import datetime
 
-from pymongo import MongoClient
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import (
+    CollectionInvalid,
+    DuplicateKeyError,
+    OperationFailure,
+    PyMongoError,
+)
+
+from database.bulk_writer import SensorBulkWriter, insert_many_unordered
+from database.clients import DEFAULT_URI, get_client, profile_options
+from database.dedupe import (
+    DuplicateReading,
+    RecentReadingFilter,
+    is_duplicate,
+    reading_key,
+    reading_query,
+)
+from database.latest_cache import LatestReadingCache
+from database.spool import SpoolDrainer, WriteAheadSpool
+
+logger = logging.getLogger(__name__)
+
+# (sub-document, payload field, key prefix) of images moved to the blob store.
+# The payload field (base64 text or raw bytes) is replaced by "<prefix>sha256"
+# and "<prefix>size_bytes".
+IMAGE_FIELDS = (
+    ("image", "base64_data", ""),
+    ("image", "data", ""),
+    ("validation_image", "base64_data", ""),
+    ("validation_image", "data", ""),
+    ("metadata", "image_base64", "image_"),
+    ("cloud_snapshot", "image_base64", "image_"),
+)
+
+# Dotted paths of embedded image payloads, excluded from queries by default
+IMAGE_PAYLOAD_PATHS = tuple(
+    f"{container}.{field}" for container, field, _ in IMAGE_FIELDS
+)
+
+# Compound index serving per-sensor lookups and time-range queries
+SENSOR_TIME_INDEX = [("sensor_id", ASCENDING), ("timestamp", ASCENDING)]
+# Unique idempotency key of a reading (see database.dedupe)
+READING_KEY_INDEX = SENSOR_TIME_INDEX + [("message_id", ASCENDING)]
+MIGRATION_BATCH_SIZE = 1000
 
 
 class WeatherDB:
     """Handles MongoDB operations for sensor and image metadata."""
 
-    def __init__(self, uri=None, db_name="weather_station"):
-        """Initialize the WeatherDB client and define collections."""
-        self.uri = uri or os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-        self.client = MongoClient(self.uri)
-        self.db = self.client[db_name]
+    def __init__(
+        self,
+        uri=None,
+        db_name="weather_station",
+        client=None,
+        bulk_write=False,
+        bulk_batch_size=500,
+        bulk_max_age=0.25,
+        blob_store=None,
+        rollups=False,
+        latest_cache_size=1024,
+        latest_cache_ttl=60.0,
+        spool_dir=None,
+        dedupe_filter_size=100_000,
+        dedupe_error_rate=1e-6,
+        profile=None,
+        client_options=None,
+    ):
+        """Initialize the WeatherDB client and define collections.
+
+        Args:
+            uri (str, optional): MongoDB URI; defaults to ``$MONGO_URI`` or localhost.
+            db_name (str): Database name.
+            client (MongoClient, optional): Client to use instead of the shared
+                process-wide client for ``uri`` (see ``database.clients``).
+            bulk_write (bool): Buffer sensor inserts and write them with ``insert_many``.
+            bulk_batch_size (int): Buffered documents that trigger a bulk flush.
+            bulk_max_age (float): Seconds a buffered document may wait before a flush.
+            blob_store (BlobStore, optional): Store that receives embedded base64
+                images; documents then keep only the image hash, size and format.
+            rollups (bool): Maintain hourly/daily rollups as readings are inserted.
+            latest_cache_size (int): Sensors kept in the latest-reading cache;
+                0 disables the cache.
+            latest_cache_ttl (float): Seconds a cached latest reading stays valid.
+            spool_dir (str, optional): Directory of a local write-ahead spool.
+                Sensor inserts are then acknowledged once on local disk and
+                drained to MongoDB in the background (replayed on restart).
+                Cannot be combined with ``bulk_write``.
+            dedupe_filter_size (int): Recently stored reading keys remembered
+                to reject retried readings without a database round trip;
+                0 disables the filter.
+            dedupe_error_rate (float): Chance that the filter reports a new
+                reading as already stored.
+            profile (str, optional): Write profile of the database handle:
+                "durable", "fast_ingest", "replay" or "analytics_read"; None
+                keeps the client's defaults.
+            client_options (dict, optional): Pool and timeout options used if
+                the shared client for ``uri`` does not exist yet.
+        """
+        self.uri = uri or os.getenv("MONGO_URI", DEFAULT_URI)
+        self.client = client or get_client(self.uri, **(client_options or {}))
+        self.profile = profile
+        self.db = self.client.get_database(db_name, **profile_options(profile))
         self.sensor_collection = self.db["sensor_data"]
         self.image_collection = self.db["cloud_images"]
+        self.blob_store = blob_store
+        self.rollups = None
+        if rollups:
+            # Imported on demand: rollups pull in the pydantic schema graph
+            from database.rollups import RollupEngine
 
-    def insert_sensor_data(self, data: dict):
-        """Insert a full weather sensor document (including image, validation, logs, etc.)."""
+            self.rollups = RollupEngine(self.db)
+        self.latest_cache = None
+        if latest_cache_size > 0:
+            self.latest_cache = LatestReadingCache(
+                maxsize=latest_cache_size, ttl=latest_cache_ttl
+            )
+        self.recent_readings = None
+        # Whether sensor_data has the unique reading key index; None until checked
+        self._unique_reading_key = None
+        if dedupe_filter_size > 0:
+            self.recent_readings = RecentReadingFilter(
+                capacity=dedupe_filter_size, error_rate=dedupe_error_rate
+            )
+        self.bulk_writer = None
+        self.spool = None
+        self.spool_drainer = None
+        if bulk_write and spool_dir:
+            raise ValueError("bulk_write and spool_dir cannot be combined")
+        if spool_dir:
+            self.spool = WriteAheadSpool(spool_dir)
+            self.spool_drainer = SpoolDrainer(self.spool, self)
+            self.spool_drainer.start()
+            atexit.register(self.close)
+        if bulk_write:
+            self.bulk_writer = SensorBulkWriter(
+                self.sensor_collection,
+                max_batch_size=bulk_batch_size,
+                max_age=bulk_max_age,
+                on_written=self._after_insert,
+            )
+            atexit.register(self.close)
+
+    def ensure_schema(self, timeseries=False, granularity="seconds", migrate=False):
+        """Create the collections layout and indexes that queries rely on.
+
+        Safe to run at every startup: existing indexes and collections are
+        left untouched. A regular ``sensor_data`` collection also gets the
+        unique (sensor_id, timestamp, message_id) index that makes retried
+        inserts fail as duplicates; time-series collections cannot hold unique
+        indexes and rely on the in-memory duplicate filter alone.
+
+        Args:
+            timeseries (bool): Keep ``sensor_data`` as a native time-series
+                collection (MongoDB 5.0+) with ``sensor_id`` as the metaField.
+            granularity (str): Time-series granularity: "seconds", "minutes" or "hours".
+            migrate (bool): Convert an existing regular ``sensor_data`` collection
+                into a time-series collection. The old collection is kept,
+                renamed to ``sensor_data_legacy_<epoch>``.
+
+        Returns:
+            dict: The ``sensor_data`` layout ("regular", "created", "exists" or
+            "migrated") and the names of the ensured indexes.
+        """
+        layout = "regular"
+        if timeseries:
+            layout = self._ensure_timeseries_collection(granularity, migrate)
+        indexes = [
+            collection.create_index(SENSOR_TIME_INDEX, name="sensor_id_timestamp")
+            for collection in (self.sensor_collection, self.image_collection)
+        ]
+        self._unique_reading_key = False
+        if layout == "regular":
+            try:
+                indexes.append(
+                    self.sensor_collection.create_index(
+                        READING_KEY_INDEX, name="reading_key", unique=True
+                    )
+                )
+                self._unique_reading_key = True
+            except OperationFailure as exc:
+                logger.warning(
+                    "Unique reading key index not created; remove duplicates first",
+                    extra={"data": {"error": str(exc)}},
+                )
+        if self.rollups is not None:
+            self.rollups.ensure_indexes()
+        return {"sensor_data": layout, "indexes": indexes}
+
+    def _ensure_timeseries_collection(self, granularity: str, migrate: bool) -> str:
+        """Create ``sensor_data`` as a time-series collection if needed."""
+        options = {
+            "timeField": "timestamp",
+            "metaField": "sensor_id",
+            "granularity": granularity,
+        }
+        name = self.sensor_collection.name
+        info = next(iter(self.db.list_collections(filter={"name": name})), None)
+        if info is None:
+            try:
+                self.db.create_collection(name, timeseries=options)
+            except (CollectionInvalid, OperationFailure):
+                return "exists"  # created concurrently by another process
+            return "created"
+        if info.get("type") == "timeseries" or "timeseries" in info.get("options", {}):
+            return "exists"
+        if not migrate:
+            return "regular"
+        self._migrate_to_timeseries(options)
+        return "migrated"
+
+    def _migrate_to_timeseries(self, options: dict):
+        """Copy ``sensor_data`` into a new time-series collection and swap names.
+
+        Documents without a datetime ``timestamp`` cannot live in a time-series
+        collection; they stay behind in the legacy collection.
+        """
+        name = self.sensor_collection.name
+        staging = self.db[f"{name}_timeseries_migration"]
+        staging.drop()  # leftovers of an interrupted migration
+        self.db.create_collection(staging.name, timeseries=options)
+
+        batch = []
+        cursor = self.sensor_collection.find({"timestamp": {"$type": "date"}})
+        for document in cursor.batch_size(MIGRATION_BATCH_SIZE):
+            batch.append(document)
+            if len(batch) >= MIGRATION_BATCH_SIZE:
+                staging.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            staging.insert_many(batch, ordered=False)
+
+        self.sensor_collection.rename(f"{name}_legacy_{int(time.time())}")
+        staging.rename(name)
+
+    @staticmethod
+    def _prepare_sensor_document(data: dict) -> dict:
+        """Parse ISO timestamp strings in a sensor document into datetimes."""
         # Ensure datetime parsing if timestamp is a string
         if isinstance(data.get("timestamp"), str):
             try:
@@ -32,12 +260,354 @@ class WeatherDB:
                 )
             except (ValueError, KeyError, TypeError):
                 pass
-        self.sensor_collection.insert_one(data)
+        return data
+
+    def _externalize_images(self, data: dict) -> dict:
+        """Move embedded images into the blob store, leaving references.
+
+        Images are base64 text or raw bytes; text that is not valid base64 is
+        left inline.
+        """
+        if self.blob_store is None:
+            return data
+        for container, field, prefix in IMAGE_FIELDS:
+            image = data.get(container)
+            if not isinstance(image, dict):
+                continue
+            payload = image.get(field)
+            if isinstance(payload, bytes):
+                raw = payload
+            elif isinstance(payload, str):
+                try:
+                    raw = base64.b64decode(payload, validate=True)
+                except (binascii.Error, ValueError):
+                    continue
+            else:
+                continue
+            sha256, size = self.blob_store.put(raw)
+            del image[field]
+            image[f"{prefix}sha256"] = sha256
+            image[f"{prefix}size_bytes"] = size
+        return data
+
+    def open_image(self, sha256: str):
+        """Open a stored image for streaming reads by its SHA-256 reference.
+
+        Raises:
+            RuntimeError: If this WeatherDB has no blob store.
+            FileNotFoundError: If the image is not stored.
+        """
+        if self.blob_store is None:
+            raise RuntimeError("WeatherDB was created without a blob_store")
+        return self.blob_store.open(sha256)
+
+    def get_image(self, sha256: str) -> bytes:
+        """Read a stored image's bytes by its SHA-256 reference."""
+        with self.open_image(sha256) as image:
+            return image.read()
+
+    def _is_recent(self, key) -> bool:
+        """Return True if the duplicate filter has seen a reading key."""
+        return (
+            key is not None
+            and self.recent_readings is not None
+            and key in self.recent_readings
+        )
+
+    def _has_unique_reading_key(self) -> bool:
+        """Return True if ``sensor_data`` has the unique reading key index.
+
+        Checked once per ``WeatherDB`` (``ensure_schema`` sets it directly);
+        while MongoDB cannot be asked, the answer is False.
+        """
+        if self._unique_reading_key is None:
+            try:
+                indexes = self.sensor_collection.index_information()
+            except PyMongoError:
+                return False
+            self._unique_reading_key = any(
+                index.get("unique")
+                and [tuple(field) for field in index["key"]] == READING_KEY_INDEX
+                for index in indexes.values()
+            )
+        return self._unique_reading_key
+
+    def _already_stored(self, document: dict, key) -> bool:
+        """Return True if a reading is known to be stored.
+
+        Only used without the unique index (time-series ``sensor_data``); with
+        it, the insert itself fails with a duplicate-key error for no more
+        round trips than a lookup would cost. A duplicate filter hit may be a
+        false positive, so it is confirmed with a lookup on the (sensor_id,
+        timestamp, message_id) index fields.
+        """
+        if not self._is_recent(key) or self._has_unique_reading_key():
+            return False
+        return (
+            self.sensor_collection.find_one(reading_query(document), {"_id": 1})
+            is not None
+        )
+
+    def _remember(self, documents: list):
+        """Add the reading keys of stored documents to the duplicate filter."""
+        if self.recent_readings is None:
+            return
+        for document in documents:
+            key = reading_key(document)
+            if key is not None:
+                self.recent_readings.add(key)
+
+    def _after_insert(self, documents: list):
+        """Run write-side hooks for documents that were stored successfully.
+
+        The documents are stored whatever happens here, so a failing hook (say
+        a rollup upsert hitting a database error) is logged, not raised; the
+        affected rollups can be repaired with ``RollupEngine.rebuild``.
+        """
+        try:
+            self._remember(documents)
+            if self.rollups is not None and documents:
+                self.rollups.apply(documents)
+            if self.latest_cache is not None:
+                for document in documents:
+                    self.latest_cache.put(_without_image_payloads(document))
+        except Exception:
+            logger.exception(
+                "Post-insert hooks failed for stored sensor documents",
+                extra={"data": {"documents": len(documents)}},
+            )
+
+    def insert_sensor_data(self, data: dict):
+        """Insert a full weather sensor document (including image, validation, logs, etc.).
+
+        In bulk mode the document joins the current batch and this call blocks
+        until that batch has been written. With a spool it returns as soon as
+        the document is durable on local disk.
+
+        Returns:
+            ObjectId: The inserted document's ``_id``.
+
+        Raises:
+            DuplicateReading: If the reading is already stored (in bulk mode,
+                a ``BulkWriteFailure`` with the duplicate-key code; see
+                ``database.dedupe.is_duplicate``).
+            BulkWriteFailure: In bulk mode, if MongoDB rejected this document.
+        """
+        return self.submit_sensor_data(data).result()
+
+    def submit_sensor_data(self, data: dict) -> Future:
+        """Queue a sensor document for insertion without waiting for the write.
+
+        Without bulk mode the document is inserted immediately and the returned
+        future is already resolved. With a spool the document gets a client-side
+        ``_id`` and is appended to the spool; the future resolves to that ``_id``.
+        Without the unique reading key index, a reading the duplicate filter
+        has seen, and that is found in MongoDB, is not written at all.
+
+        Returns:
+            Future: Resolves to the inserted ``_id`` or raises the write error.
+        """
+        data = self._prepare_sensor_document(data)
+        if self._already_stored(data, reading_key(data)):
+            future = Future()
+            future.set_exception(DuplicateReading())
+            return future
+        data = self._externalize_images(data)
+        if self.spool is not None:
+            data.setdefault("_id", ObjectId())
+            future = Future()
+            try:
+                self.spool.append(data)
+            except Exception as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(data["_id"])
+            return future
+        if self.bulk_writer is not None:
+            return self.bulk_writer.submit(data)
+        future = Future()
+        try:
+            inserted_id = self.sensor_collection.insert_one(data).inserted_id
+        except DuplicateKeyError:
+            self._remember([data])
+            future.set_exception(DuplicateReading())
+            return future
+        except Exception as exc:
+            future.set_exception(exc)
+            return future
+        self._after_insert([data])
+        future.set_result(inserted_id)
+        return future
+
+    def insert_sensor_data_many(self, documents: list, check_recent=True) -> list:
+        """Insert many sensor documents with one unordered ``insert_many``.
+
+        Bypasses the bulk writer buffer; the caller already holds a batch.
+        Repeats of a reading within the batch are not sent to MongoDB, and
+        neither are readings the duplicate filter has seen and MongoDB confirms
+        as stored (only without the unique reading key index).
+
+        Args:
+            documents (list): Sensor documents to insert.
+            check_recent (bool): Consult the duplicate filter. Callers that
+                replay documents already checked on the way in (the spool
+                drainer) pass False and rely on the unique indexes.
+
+        Returns:
+            list: One ``(inserted_id, error)`` pair per document, in input order;
+            duplicates carry an error for which ``is_duplicate`` is true.
+        """
+        outcomes = [None] * len(documents)
+        pending, indices, batch_keys = [], [], set()
+        for index, document in enumerate(documents):
+            document = self._prepare_sensor_document(document)
+            key = reading_key(document)
+            if key is not None and (
+                key in batch_keys
+                or (check_recent and self._already_stored(document, key))
+            ):
+                outcomes[index] = (None, DuplicateReading())
+                continue
+            batch_keys.add(key)
+            pending.append(self._externalize_images(document))
+            indices.append(index)
+        written = insert_many_unordered(self.sensor_collection, pending)
+        for index, outcome in zip(indices, written):
+            outcomes[index] = outcome
+        self._after_insert(
+            [doc for doc, (_, error) in zip(pending, written) if error is None]
+        )
+        self._remember(
+            [doc for doc, (_, error) in zip(pending, written) if is_duplicate(error)]
+        )
+        return outcomes
+
+    def flush(self):
+        """Write any buffered sensor documents now (no-op without bulk mode)."""
+        if self.bulk_writer is not None:
+            self.bulk_writer.flush()
+
+    def close(self):
+        """Flush buffered writes and stop the bulk writer and spool drainer."""
+        if self.bulk_writer is not None:
+            self.bulk_writer.close()
+        if self.spool_drainer is not None:
+            self.spool_drainer.stop()
+            self.spool.close()
+            self.spool_drainer = None
 
     def find_by_sensor_id(self, sensor_id: str):
         """Find a sensor document by its sensor_id."""
         return self.sensor_collection.find_one({"sensor_id": sensor_id})
 
+    def get_latest_reading(self, sensor_id: str):
+        """Return the newest sensor document of a sensor, without image payloads.
+
+        Served from the latest-reading cache when possible; a miss queries
+        MongoDB and fills the cache. The result must not be modified.
+
+        Returns:
+            dict or None: The latest document, or None if the sensor has none.
+        """
+        if self.latest_cache is not None:
+            document = self.latest_cache.get(sensor_id)
+            if document is not None:
+                return document
+        document = self.sensor_collection.find_one(
+            {"sensor_id": sensor_id},
+            dict.fromkeys(IMAGE_PAYLOAD_PATHS, 0),
+            sort=[("timestamp", DESCENDING)],
+        )
+        if document is not None and self.latest_cache is not None:
+            self.latest_cache.put(document)
+        return document
+
+    def find_readings(
+        self,
+        sensor_ids=None,
+        start=None,
+        end=None,
+        fields=None,
+        sort=(("timestamp", ASCENDING),),
+        batch_size=1000,
+        limit=0,
+        include_images=False,
+    ):
+        """Stream sensor documents for one or more sensors over a time window.
+
+        Documents are fetched from the server ``batch_size`` at a time, so long
+        windows can be consumed without materializing the result list.
+
+        Args:
+            sensor_ids (str | list[str], optional): Sensor ID or IDs; all sensors if None.
+            start (datetime, optional): Inclusive lower bound on ``timestamp``.
+            end (datetime, optional): Exclusive upper bound on ``timestamp``.
+            fields (list[str], optional): Fields (dotted paths allowed) to return;
+                all fields if None.
+            sort (list[tuple[str, int]], optional): Sort specification; None for
+                natural order.
+            batch_size (int): Documents per server round trip.
+            limit (int): Maximum number of documents; 0 for no limit.
+            include_images (bool): Return embedded base64 image payloads.
+
+        Yields:
+            dict: Matching sensor documents.
+        """
+        query = {}
+        if isinstance(sensor_ids, str):
+            query["sensor_id"] = sensor_ids
+        elif sensor_ids is not None:
+            query["sensor_id"] = {"$in": list(sensor_ids)}
+        window = {}
+        if start is not None:
+            window["$gte"] = start
+        if end is not None:
+            window["$lt"] = end
+        if window:
+            query["timestamp"] = window
+
+        strip_images = []
+        if fields is not None:
+            projection = dict.fromkeys(fields, 1)
+            if not include_images:
+                # Inclusion projections cannot exclude sub-paths; strip explicitly
+                # requested image sub-documents client-side instead.
+                strip_images = [
+                    (container, field)
+                    for container, field, _ in IMAGE_FIELDS
+                    if container in projection
+                ]
+        elif include_images:
+            projection = None
+        else:
+            projection = dict.fromkeys(IMAGE_PAYLOAD_PATHS, 0)
+
+        cursor = self.sensor_collection.find(
+            query,
+            projection,
+            sort=list(sort) if sort else None,
+            batch_size=batch_size,
+            limit=limit,
+        )
+        try:
+            for document in cursor:
+                for container, field in strip_images:
+                    if isinstance(document.get(container), dict):
+                        document[container].pop(field, None)
+                yield document
+        finally:
+            cursor.close()
+
     def insert_cloud_image_metadata(self, metadata: dict):
         """Insert metadata for a cloud image."""
-        self.image_collection.insert_one(metadata)
+        self.image_collection.insert_one(self._externalize_images(metadata))
+
+
+def _without_image_payloads(document: dict) -> dict:
+    """Return a shallow copy of a document with embedded image payloads removed."""
+    document = dict(document)
+    for container, field, _ in IMAGE_FIELDS:
+        image = document.get(container)
+        if isinstance(image, dict) and field in image:
+            document[container] = {k: v for k, v in image.items() if k != field}
+    return document
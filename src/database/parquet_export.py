@@ -0,0 +1,307 @@
+"""Partitioned Parquet export of sensor history for model training.
+
+Streams ``sensor_data`` one UTC day at a time through a server cursor and
+writes the readings as typed columns into a Hive-partitioned dataset::
+
+    <root>/date=2025-06-29/sensor_id=esp32_01/part-0.parquet
+
+The nested ``readings``, ``device_info`` and ``location`` sub-documents are
+flattened into one column per schema field (``readings.temperature_c`` ->
+``readings_temperature_c``), typed from the Pydantic models. Image payloads
+and other fields are never fetched. ``date`` and ``sensor_id`` live in the
+directory names; ``pyarrow.dataset.dataset(root, partitioning="hive")``
+turns them back into columns.
+
+Only complete days are exported. ``_export_state.json`` in the dataset root
+records the first day not yet exported, so a later run picks up from there
+and leaves existing partitions alone. Readings that arrive late for an
+already exported day are not picked up by later runs; re-export such days
+with an explicit ``start`` and ``overwrite=True``.
+"""
+
+import json
+import logging
+import os
+import typing
+from datetime import date, datetime, time, timedelta, timezone
+from urllib.parse import quote
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pymongo import ASCENDING
+
+from validation.schemas.device_metadata import DeviceMetadata
+from validation.schemas.geo_location import GeoLocation
+from validation.schemas.sensor_reading import SensorReading
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 10_000
+STATE_FILE = "_export_state.json"
+PART_FILE = "part-0.parquet"
+
+# Flattened sub-documents: (document field, Pydantic model)
+FLATTENED = (
+    ("readings", SensorReading),
+    ("device_info", DeviceMetadata),
+    ("location", GeoLocation),
+)
+
+# Top-level fields written as columns besides the flattened ones
+TOP_LEVEL = (
+    ("timestamp", datetime),
+    ("message_id", str),
+    ("processing_time", float),
+    ("data_quality", bool),
+)
+
+ARROW_TYPES = {
+    float: pa.float64(),
+    int: pa.int64(),
+    bool: pa.bool_(),
+    str: pa.string(),
+    datetime: pa.timestamp("ms", tz="UTC"),
+}
+
+
+def _python_type(annotation):
+    """Return the type of an ``Optional[...]`` annotation (or the annotation itself)."""
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    return args[0] if len(args) == 1 else annotation
+
+
+def _build_columns() -> tuple:
+    """Return ``(dotted path, column name, python type)`` for every exported column."""
+    columns = [(path, path, kind) for path, kind in TOP_LEVEL]
+    for container, model in FLATTENED:
+        for name, info in model.model_fields.items():
+            columns.append(
+                (
+                    f"{container}.{name}",
+                    f"{container}_{name}",
+                    _python_type(info.annotation),
+                )
+            )
+    return tuple(columns)
+
+
+COLUMNS = _build_columns()
+
+SCHEMA = pa.schema([(column, ARROW_TYPES[kind]) for _, column, kind in COLUMNS])
+
+
+def _coerce(value, kind):
+    """Return a value if it fits its column type, else None (legacy documents vary)."""
+    if value is None:
+        return None
+    if kind is float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return float(value)
+    if kind is int:
+        return value if isinstance(value, int) and not isinstance(value, bool) else None
+    if kind is datetime:
+        if not isinstance(value, datetime):
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+    return value if isinstance(value, kind) else None
+
+
+def _field_value(document: dict, path: str):
+    """Return the value at a dotted path, or None."""
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def partition_path(root: str, day: date, sensor_id: str) -> str:
+    """Return the Parquet file of one (day, sensor) partition."""
+    return os.path.join(
+        root,
+        f"date={day.isoformat()}",
+        f"sensor_id={quote(sensor_id, safe='')}",
+        PART_FILE,
+    )
+
+
+class _PartitionWriter:
+    """Writes one partition in row groups, renaming it into place when complete."""
+
+    def __init__(self, path: str, compression: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.partial_path = path + ".tmp"
+        self.writer = pq.ParquetWriter(
+            self.partial_path, SCHEMA, compression=compression
+        )
+        self.rows = 0
+
+    def write(self, documents: list):
+        """Write documents as one row group."""
+        data = {
+            column: [
+                _coerce(_field_value(document, path), kind) for document in documents
+            ]
+            for path, column, kind in COLUMNS
+        }
+        self.writer.write_table(pa.Table.from_pydict(data, schema=SCHEMA))
+        self.rows += len(documents)
+
+    def close(self):
+        """Finish the file and move it to its final name."""
+        self.writer.close()
+        os.replace(self.partial_path, self.path)
+
+    def abort(self):
+        """Discard the unfinished file."""
+        self.writer.close()
+        os.remove(self.partial_path)
+
+
+class ParquetExporter:
+    """Exports ``sensor_data`` to a date/sensor partitioned Parquet dataset.
+
+    Args:
+        weather_db (WeatherDB): Source of the sensor documents.
+        root (str): Dataset directory.
+        chunk_size (int): Documents per cursor batch and per Parquet row group.
+        compression (str): Parquet compression codec.
+    """
+
+    def __init__(
+        self, weather_db, root: str, chunk_size=EXPORT_CHUNK_SIZE, compression="zstd"
+    ):
+        self.weather_db = weather_db
+        self.root = root
+        self.chunk_size = chunk_size
+        self.compression = compression
+
+    def load_state(self) -> dict:
+        """Return the export state of the dataset (empty before the first run)."""
+        try:
+            with open(os.path.join(self.root, STATE_FILE), encoding="utf-8") as state:
+                return json.load(state)
+        except FileNotFoundError:
+            return {}
+
+    def _save_state(self, exported_through: date):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, STATE_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as state:
+            json.dump({"exported_through": exported_through.isoformat()}, state)
+        os.replace(path + ".tmp", path)
+
+    def _next_day(self, start, end, sensor_ids):
+        """Return the day of the oldest sensor document in a window, or None."""
+        for document in self.weather_db.find_readings(
+            sensor_ids,
+            start=start,
+            end=end,
+            fields=("timestamp",),
+            limit=1,
+            batch_size=1,
+        ):
+            return document["timestamp"].date()
+        return None
+
+    def export(self, start=None, end=None, sensor_ids=None, overwrite=False) -> dict:
+        """Export every complete day in ``[start, end)`` not exported yet.
+
+        Args:
+            start (date, optional): First day to export. Defaults to the day
+                after the last export, or the oldest document on the first run.
+            end (date, optional): Day to stop before; clamped to today (UTC),
+                since the current day is still receiving readings.
+            sensor_ids (str | list[str], optional): Restrict to these sensors.
+                A restricted export does not move the export state forward.
+            overwrite (bool): Rewrite partitions that already exist.
+
+        Returns:
+            dict: ``days`` with readings, ``partitions`` and ``rows`` written, and
+            ``skipped`` partitions that already existed.
+        """
+        state = self.load_state()
+        if start is None and "exported_through" in state:
+            start = date.fromisoformat(state["exported_through"])
+        today = datetime.now(timezone.utc).date()
+        end = min(end or today, today)
+
+        report = {"days": 0, "partitions": 0, "rows": 0, "skipped": 0}
+        exported_through = date.fromisoformat(
+            state.get("exported_through", "0001-01-01")
+        )
+        day = start
+        while True:
+            # Jump over days without readings
+            day = self._next_day(
+                datetime.combine(day, time()) if day else None,
+                datetime.combine(end, time()),
+                sensor_ids,
+            )
+            if day is None:
+                break
+            self._export_day(day, sensor_ids, overwrite, report)
+            report["days"] += 1
+            day += timedelta(days=1)
+            if sensor_ids is None and day > exported_through:
+                self._save_state(day)
+        if sensor_ids is None and end > exported_through:
+            self._save_state(end)
+        return report
+
+    def _export_day(self, day: date, sensor_ids, overwrite: bool, report: dict):
+        """Write the partitions of one day, one sensor at a time."""
+        day_start = datetime.combine(day, time())
+        writer = None
+        sensor_id = None
+        skip = False
+        chunk = []
+        try:
+            for document in self.weather_db.find_readings(
+                sensor_ids,
+                start=day_start,
+                end=day_start + timedelta(days=1),
+                fields=("sensor_id",) + tuple(path for path, _, _ in COLUMNS),
+                sort=(("sensor_id", ASCENDING), ("timestamp", ASCENDING)),
+                batch_size=self.chunk_size,
+            ):
+                if document.get("sensor_id") != sensor_id:
+                    if chunk:
+                        writer.write(chunk)
+                        chunk = []
+                    if writer is not None:
+                        writer.close()
+                        report["rows"] += writer.rows
+                        writer = None
+                    sensor_id = document.get("sensor_id")
+                    path = partition_path(self.root, day, str(sensor_id))
+                    skip = os.path.exists(path) and not overwrite
+                    if skip:
+                        report["skipped"] += 1
+                    else:
+                        writer = _PartitionWriter(path, self.compression)
+                        report["partitions"] += 1
+                if skip:
+                    continue
+                chunk.append(document)
+                if len(chunk) >= self.chunk_size:
+                    writer.write(chunk)
+                    chunk = []
+            if chunk:
+                writer.write(chunk)
+            if writer is not None:
+                writer.close()
+                report["rows"] += writer.rows
+                writer = None
+        finally:
+            if writer is not None:
+                writer.abort()
+        logger.info(
+            "Exported sensor data to Parquet",
+            extra={"data": {"day": day.isoformat(), **report}},
+        )
@@ -0,0 +1,229 @@
+"""Incremental hourly and daily rollups of numeric sensor readings.
+
+Keeps one document per sensor per hour and per day holding min, max, sum,
+count and the latest value of every numeric ``WeatherSensorData`` field, so
+dashboards and reports read a few hundred rollup rows instead of scanning raw
+``sensor_data``. Rollups are updated as readings are inserted through
+``WeatherDB`` and can be rebuilt for a time range from the raw documents.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING
+
+from validation.schemas.sensor_reading import SensorReading
+
+# Numeric document fields that are rolled up (dotted paths)
+ROLLUP_FIELDS = tuple(f"readings.{name}" for name in SensorReading.model_fields) + (
+    "device_info.battery_level",
+    "device_info.signal_strength",
+    "processing_time",
+)
+
+PERIODS = {
+    "hour": lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    "day": lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0),
+}
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def stat_key(path: str) -> str:
+    """Return the flattened stats key of a field path (``readings.rain_mm`` -> ``readings_rain_mm``)."""
+    return path.replace(".", "_")
+
+
+def _field_value(document: dict, path: str):
+    """Return the numeric value at a dotted path, or None."""
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def _utc_naive(timestamp: datetime) -> datetime:
+    """Normalize a timestamp to naive UTC, the form MongoDB returns."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+class RollupEngine:
+    """Maintains per-sensor hourly and daily rollups in MongoDB.
+
+    Rollups live in ``sensor_rollups_hour`` and ``sensor_rollups_day``. Each
+    document has ``sensor_id``, ``start`` (bucket start, naive UTC), ``count``,
+    ``stats.<field>.{min,max,sum,count}``, and ``last`` / ``last_timestamp`` for
+    the newest reading in the bucket. Field names are flattened with
+    ``stat_key`` (``readings.temperature_c`` -> ``readings_temperature_c``).
+    """
+
+    def __init__(self, db):
+        """Bind the rollup collections of a pymongo database."""
+        self.db = db
+        self.collections = {
+            period: db[f"sensor_rollups_{period}"] for period in PERIODS
+        }
+
+    def ensure_indexes(self):
+        """Create the (sensor_id, start) index used by rollup queries."""
+        for collection in self.collections.values():
+            collection.create_index(
+                [("sensor_id", ASCENDING), ("start", ASCENDING)], name="sensor_id_start"
+            )
+
+    def apply(self, documents: list):
+        """Fold newly stored sensor documents into the rollups.
+
+        Documents without a ``sensor_id`` or a datetime ``timestamp`` are skipped.
+        Each affected bucket costs two updates, however many documents of the
+        batch fall into it.
+        """
+        buckets = {}
+        for document in documents:
+            timestamp = document.get("timestamp")
+            sensor_id = document.get("sensor_id")
+            if sensor_id is None or not isinstance(timestamp, datetime):
+                continue
+            timestamp = _utc_naive(timestamp)
+            values = {}
+            for path in ROLLUP_FIELDS:
+                value = _field_value(document, path)
+                if value is not None:
+                    values[stat_key(path)] = value
+            for period, floor in PERIODS.items():
+                key = (period, sensor_id, floor(timestamp))
+                bucket = buckets.setdefault(
+                    key, {"count": 0, "stats": {}, "last_timestamp": None}
+                )
+                bucket["count"] += 1
+                for name, value in values.items():
+                    stats = bucket["stats"].setdefault(
+                        name, {"min": value, "max": value, "sum": 0, "count": 0}
+                    )
+                    stats["min"] = min(stats["min"], value)
+                    stats["max"] = max(stats["max"], value)
+                    stats["sum"] += value
+                    stats["count"] += 1
+                if (
+                    bucket["last_timestamp"] is None
+                    or timestamp >= bucket["last_timestamp"]
+                ):
+                    bucket["last_timestamp"] = timestamp
+                    bucket["last"] = values
+
+        for (period, sensor_id, start), bucket in buckets.items():
+            self._update_bucket(self.collections[period], sensor_id, start, bucket)
+
+    @staticmethod
+    def _update_bucket(collection, sensor_id, start, bucket):
+        """Merge a bucket's partial stats, then move "last" forward if newer."""
+        bucket_id = {"sensor_id": sensor_id, "start": start}
+        minimums, maximums, increments = {}, {}, {"count": bucket["count"]}
+        for key, stats in bucket["stats"].items():
+            minimums[f"stats.{key}.min"] = stats["min"]
+            maximums[f"stats.{key}.max"] = stats["max"]
+            increments[f"stats.{key}.sum"] = stats["sum"]
+            increments[f"stats.{key}.count"] = stats["count"]
+        merge = {"$inc": increments, "$setOnInsert": dict(bucket_id)}
+        if minimums:
+            merge["$min"] = minimums
+            merge["$max"] = maximums
+        last_timestamp = bucket["last_timestamp"]
+        collection.update_one({"_id": bucket_id}, merge, upsert=True)
+        collection.update_one(
+            {
+                "_id": bucket_id,
+                "$or": [
+                    {"last_timestamp": {"$lte": last_timestamp}},
+                    {"last_timestamp": {"$exists": False}},
+                ],
+            },
+            {"$set": {"last_timestamp": last_timestamp, "last": bucket["last"]}},
+        )
+
+    def get(self, period: str, sensor_ids=None, start=None, end=None) -> list:
+        """Return rollup rows for a period, with a ``mean`` added per field.
+
+        Args:
+            period (str): "hour" or "day".
+            sensor_ids (str | list[str], optional): Sensor ID or IDs; all if None.
+            start (datetime, optional): Inclusive lower bound on the bucket start.
+            end (datetime, optional): Exclusive upper bound on the bucket start.
+
+        Returns:
+            list[dict]: Rollup documents sorted by sensor and bucket start.
+        """
+        query = {}
+        if isinstance(sensor_ids, str):
+            query["sensor_id"] = sensor_ids
+        elif sensor_ids is not None:
+            query["sensor_id"] = {"$in": list(sensor_ids)}
+        window = {}
+        if start is not None:
+            window["$gte"] = _utc_naive(start)
+        if end is not None:
+            window["$lt"] = _utc_naive(end)
+        if window:
+            query["start"] = window
+        rows = list(
+            self.collections[period].find(
+                query, sort=[("sensor_id", ASCENDING), ("start", ASCENDING)]
+            )
+        )
+        for row in rows:
+            for stats in row.get("stats", {}).values():
+                stats["mean"] = stats["sum"] / stats["count"]
+        return rows
+
+    def rebuild(
+        self, weather_db, start: datetime, end: datetime, sensor_ids=None
+    ) -> int:
+        """Recompute rollups for a time range from the raw sensor documents.
+
+        The range is widened to whole days so no hourly or daily bucket is
+        left half-counted.
+
+        Args:
+            weather_db (WeatherDB): Source of the raw documents.
+            start (datetime): Start of the range.
+            end (datetime): End of the range.
+            sensor_ids (str | list[str], optional): Restrict to these sensors.
+
+        Returns:
+            int: Number of raw documents folded into the rebuilt rollups.
+        """
+        start = PERIODS["day"](_utc_naive(start))
+        end = _utc_naive(end)
+        if PERIODS["day"](end) != end:
+            end = PERIODS["day"](end) + timedelta(days=1)
+
+        query = {"start": {"$gte": start, "$lt": end}}
+        if isinstance(sensor_ids, str):
+            query["sensor_id"] = sensor_ids
+        elif sensor_ids is not None:
+            query["sensor_id"] = {"$in": list(sensor_ids)}
+        for collection in self.collections.values():
+            collection.delete_many(query)
+
+        processed = 0
+        batch = []
+        for document in weather_db.find_readings(
+            sensor_ids,
+            start=start,
+            end=end,
+            fields=("sensor_id", "timestamp") + ROLLUP_FIELDS,
+            sort=None,
+            batch_size=REBUILD_BATCH_SIZE,
+        ):
+            batch.append(document)
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                self.apply(batch)
+                processed += len(batch)
+                batch = []
+        self.apply(batch)
+        return processed + len(batch)
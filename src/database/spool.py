@@ -0,0 +1,374 @@
+"""Durable local write-ahead spool in front of MongoDB.
+
+Readings are appended to segmented files on local disk and acknowledged as
+soon as they are on disk; a background ``SpoolDrainer`` later writes them to
+MongoDB in bulk. Ingest latency therefore no longer depends on database
+latency, and readings survive MongoDB outages and maintenance windows.
+
+On disk, every record is a frame ``<length:uint32><crc32:uint32><BSON>`` in
+``segment-<seq>.log`` files that roll over at ``segment_bytes``. Appenders
+are group-committed: one background ``fsync`` every ``sync_interval``
+seconds makes all records written since the previous one durable at once.
+``checkpoint.json`` records how far the drainer has written to MongoDB;
+fully drained segments are deleted. On restart, a torn frame at the end of
+the last segment is truncated and draining resumes from the checkpoint.
+Delivery is at-least-once: documents carry a client-side ``_id``, and the
+drainer looks those up before each ``insert_many``, so a record replayed
+after a crash is counted as already stored rather than written twice. The
+lookup matters for a time-series ``sensor_data`` (see
+``WeatherDB.ensure_schema``), which has no unique ``_id`` index to reject
+the replay; on a regular collection the index is a second line of defence.
+
+A spool directory belongs to one process. ``WriteAheadSpool`` holds an
+exclusive lock on ``spool.lock`` while open and raises ``SpoolLocked`` if
+another process has it, since two writers would interleave frames in the
+same segment and two drainers would delete each other's segments. Give every
+worker process of a multi-process server its own ``MONGO_SPOOL_DIR``.
+"""
+
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import bson
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks; keep to one process per spool
+    fcntl = None
+
+from database.bulk_writer import DUPLICATE_KEY, BulkWriteFailure
+from database.dedupe import DuplicateReading
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct("<II")
+LOCK_FILE = "spool.lock"
+
+
+class SpoolLocked(RuntimeError):
+    """Raised when another process already has the spool directory open."""
+
+
+class WriteAheadSpool:
+    """Append-only, segmented, fsync-batched log of sensor documents."""
+
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024, sync_interval=0.01):
+        """Open (or recover) a spool directory and start the sync thread.
+
+        Args:
+            directory (str | Path): Directory holding segments and the checkpoint.
+            segment_bytes (int): Size at which a new segment file is started.
+            sync_interval (float): Seconds between group-commit fsyncs.
+
+        Raises:
+            SpoolLocked: If another process has the directory open.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock_file = open(self.directory / LOCK_FILE, "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._lock_file.close()
+                raise SpoolLocked(
+                    f"spool {self.directory} is in use by another process"
+                ) from None
+        self.segment_bytes = segment_bytes
+        self.sync_interval = sync_interval
+        self.checkpoint = self._load_checkpoint()
+
+        self._lock = threading.Lock()
+        self._synced_cond = threading.Condition(self._lock)
+        segments = self._segments()
+        self._seq = segments[-1] if segments else self.checkpoint[0]
+        self._offset = self._recover(self._seq)
+        self._file = open(self._segment_path(self._seq), "ab")
+        self._written = (self._seq, self._offset)
+        self.synced = self._written
+        self._closed = False
+        self._sync_thread = threading.Thread(
+            target=self._sync_loop, name="spool-sync", daemon=True
+        )
+        self._sync_thread.start()
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.directory / f"segment-{seq:012d}.log"
+
+    def _segments(self) -> list:
+        """Return the sequence numbers of the segment files on disk, ascending."""
+        return sorted(
+            int(path.stem.split("-")[1])
+            for path in self.directory.glob("segment-*.log")
+        )
+
+    def _load_checkpoint(self) -> tuple:
+        """Return the drained position, or the start of the oldest segment."""
+        path = self.directory / "checkpoint.json"
+        if path.exists():
+            data = json.loads(path.read_text())
+            return data["segment"], data["offset"]
+        segments = self._segments()
+        return (segments[0] if segments else 0), 0
+
+    def _recover(self, seq: int) -> int:
+        """Truncate a torn frame at the end of a segment; return its valid length."""
+        path = self._segment_path(seq)
+        if not path.exists():
+            return 0
+        valid = 0
+        with open(path, "rb") as segment:
+            for _, end in self._frames(segment, 0, None):
+                valid = end
+        if valid != path.stat().st_size:
+            logger.warning(
+                "Truncating torn spool segment",
+                extra={"data": {"segment": path.name, "valid_bytes": valid}},
+            )
+            with open(path, "r+b") as segment:
+                segment.truncate(valid)
+                os.fsync(segment.fileno())
+        return valid
+
+    @staticmethod
+    def _frames(segment, offset: int, limit):
+        """Yield ``(payload, end_offset)`` for intact frames from ``offset``."""
+        segment.seek(offset)
+        while limit is None or offset < limit:
+            header = segment.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            length, crc = FRAME_HEADER.unpack(header)
+            payload = segment.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                return
+            offset += FRAME_HEADER.size + length
+            yield payload, offset
+
+    def append(self, document: dict, wait=True):
+        """Append a document; by default return once it is fsynced.
+
+        Args:
+            document (dict): BSON-encodable document.
+            wait (bool): Block until the next group commit made it durable.
+        """
+        payload = bson.encode(document)
+        frame = FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("spool is closed")
+            if self._offset and self._offset + len(frame) > self.segment_bytes:
+                self._roll_segment()
+            self._file.write(frame)
+            self._offset += len(frame)
+            self._written = position = (self._seq, self._offset)
+            if wait:
+                while self.synced < position:
+                    self._synced_cond.wait()
+
+    def _roll_segment(self):
+        """Close the current segment durably and start the next (lock held)."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._seq += 1
+        self._offset = 0
+        self._file = open(self._segment_path(self._seq), "ab")
+
+    def _sync(self):
+        """Flush and fsync everything written so far, then wake waiting appenders."""
+        with self._lock:
+            position = self._written
+            if position == self.synced or self._file.closed:
+                return
+            self._file.flush()
+            # A duplicate descriptor stays valid if the segment is rolled meanwhile
+            fileno = os.dup(self._file.fileno())
+        try:
+            os.fsync(fileno)
+        finally:
+            os.close(fileno)
+        with self._lock:
+            self.synced = max(self.synced, position)
+            self._synced_cond.notify_all()
+
+    def _sync_loop(self):
+        while not self._closed:
+            time.sleep(self.sync_interval)
+            self._sync()
+
+    def read(self, position: tuple, limit: int):
+        """Read up to ``limit`` durable documents starting at ``position``.
+
+        Returns:
+            tuple: ``(documents, next_position)``.
+        """
+        documents = []
+        seq, offset = position
+        synced_seq, synced_offset = self.synced
+        while len(documents) < limit and (seq, offset) < (synced_seq, synced_offset):
+            path = self._segment_path(seq)
+            if not path.exists():
+                seq, offset = seq + 1, 0
+                continue
+            bound = synced_offset if seq == synced_seq else None
+            with open(path, "rb") as segment:
+                for payload, offset in self._frames(segment, offset, bound):
+                    documents.append(bson.decode(payload))
+                    if len(documents) >= limit:
+                        break
+            if len(documents) < limit and seq < synced_seq:
+                seq, offset = seq + 1, 0
+            else:
+                break
+        return documents, (seq, offset)
+
+    def commit(self, position: tuple):
+        """Persist the drained position and delete fully drained segments."""
+        path = self.directory / "checkpoint.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as checkpoint:
+            json.dump({"segment": position[0], "offset": position[1]}, checkpoint)
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        os.replace(tmp_path, path)
+        self.checkpoint = position
+        for seq in self._segments():
+            if seq < position[0]:
+                self._segment_path(seq).unlink(missing_ok=True)
+
+    def pending(self) -> bool:
+        """Return True if durable records are waiting to be drained."""
+        return self.checkpoint < self.synced
+
+    def close(self):
+        """Fsync outstanding records and close the current segment."""
+        self._sync()
+        with self._lock:
+            self._closed = True
+            self._file.close()
+            self._synced_cond.notify_all()
+        self._sync_thread.join()
+        self._lock_file.close()  # releases the directory lock
+
+
+class SpoolDrainer:
+    """Background thread writing spooled documents to MongoDB in bulk.
+
+    A batch is committed to the checkpoint once every document in it is
+    stored, already stored (duplicate ``_id``), or permanently rejected
+    (logged and skipped). If MongoDB is unreachable nothing is committed and
+    the batch is retried with exponential backoff.
+    """
+
+    def __init__(
+        self, spool, weather_db, batch_size=500, idle_wait=0.05, max_backoff=30.0
+    ):
+        """Configure the drainer; call ``start()`` to run it in the background.
+
+        Args:
+            spool (WriteAheadSpool): Spool to drain.
+            weather_db (WeatherDB): Database whose ``insert_sensor_data_many`` is used.
+            batch_size (int): Documents per ``insert_many``.
+            idle_wait (float): Seconds to wait when the spool is empty.
+            max_backoff (float): Longest wait between retries while MongoDB is down.
+        """
+        self.spool = spool
+        self.weather_db = weather_db
+        self.batch_size = batch_size
+        self.idle_wait = idle_wait
+        self.max_backoff = max_backoff
+        self.stats = dict.fromkeys(("stored", "duplicates", "rejected", "retries"), 0)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def drain_once(self) -> int:
+        """Write one batch to MongoDB, skipping documents already stored by ``_id``.
+
+        Returns:
+            int: Documents committed, 0 if the spool was empty.
+
+        Raises:
+            Exception: The connection error, if MongoDB could not be reached.
+        """
+        documents, next_position = self.spool.read(
+            self.spool.checkpoint, self.batch_size
+        )
+        if not documents:
+            return 0
+        stored = {
+            document["_id"]
+            for document in self.weather_db.sensor_collection.find(
+                {"_id": {"$in": [document["_id"] for document in documents]}},
+                {"_id": 1},
+            )
+        }
+        outcomes = [(None, None)] * len(documents)
+        replayed = [i for i, doc in enumerate(documents) if doc["_id"] in stored]
+        for index in replayed:
+            outcomes[index] = (documents[index]["_id"], DuplicateReading())
+        fresh = [i for i, doc in enumerate(documents) if doc["_id"] not in stored]
+        # Checked against the duplicate filter when spooled; a second check
+        # would only add false positives
+        written = self.weather_db.insert_sensor_data_many(
+            [documents[index] for index in fresh], check_recent=False
+        )
+        for index, outcome in zip(fresh, written):
+            outcomes[index] = outcome
+        for _, error in outcomes:
+            if error is not None and not isinstance(error, BulkWriteFailure):
+                raise error  # nothing known to be stored; retry the batch
+        for document, (_, error) in zip(documents, outcomes):
+            if error is None:
+                self.stats["stored"] += 1
+            elif error.code == DUPLICATE_KEY:
+                self.stats["duplicates"] += 1
+            else:
+                self.stats["rejected"] += 1
+                logger.error(
+                    "Spooled document rejected by MongoDB",
+                    extra={"data": {"_id": document.get("_id"), "error": str(error)}},
+                )
+        self.spool.commit(next_position)
+        return len(documents)
+
+    def _run(self):
+        backoff = self.idle_wait
+        while not self._stop.is_set():
+            try:
+                drained = self.drain_once()
+            except Exception as exc:
+                self.stats["retries"] += 1
+                logger.warning(
+                    "Spool drain failed; retrying",
+                    extra={"data": {"error": str(exc), "retry_in": backoff}},
+                )
+                self._stop.wait(backoff)
+                backoff = min(self.max_backoff, max(backoff * 2, 0.5))
+                continue
+            backoff = self.idle_wait
+            if not drained:
+                self._stop.wait(self.idle_wait)
+
+    def start(self):
+        """Start draining on a daemon thread (replays anything left from before)."""
+        self._thread = threading.Thread(
+            target=self._run, name="spool-drainer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Try to drain what is spooled within ``timeout`` seconds, then stop."""
+        deadline = time.monotonic() + timeout
+        running = self._thread is not None and self._thread.is_alive()
+        while running and self.spool.pending() and time.monotonic() < deadline:
+            time.sleep(self.idle_wait)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
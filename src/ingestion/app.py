@@ -1,32 +1,110 @@
-"""Flask application for handling file uploads and storing raw sensor images."""
+"""Flask application for handling file uploads and storing raw sensor images.
 
+Build the app with ``create_app()``. Startup stays cheap: the MongoDB client,
+the pydantic schema graph and numpy are only loaded when a request first needs
+them, so imports in tests and cold starts during rolling restarts are fast.
+Call ``warm_up()`` (or ``create_app(warm=True)``) before taking traffic to
+pay those costs up front instead of on the first request; it also creates the
+MongoDB collections and indexes unless ``MONGO_ENSURE_SCHEMA`` is off.
+
+Usage:
+    PYTHONPATH=src python -m ingestion.app
+"""
+
+import logging
 import os
+import threading
+import time
+from datetime import datetime
 
-from flask import Flask, jsonify, request
-from pydantic import ValidationError
+from flask import Blueprint, Flask, Response, current_app, jsonify, request
 from werkzeug.utils import secure_filename
 
-from database.mongo_ops import WeatherDB, insert_sensor_data
-from validation.schemas.weather_sensor_data import WeatherSensorData
-
-app = Flask(__name__)
+from database.blob_store import BlobStore
+from ingestion import binary_codec
+from ingestion.chunked_upload import ChunkedUploadManager, UploadError
+from ingestion.config import (
+    BULK_INGEST_BATCH_SIZE,
+    BULK_INGEST_MAX_FRAME_BYTES,
+    BULK_INGEST_MAX_RECORD_BYTES,
+    DEDUPE_ERROR_RATE,
+    DEDUPE_FILTER_SIZE,
+    LATEST_CACHE_SIZE,
+    LATEST_CACHE_TTL,
+    MONGO_BULK_BATCH_SIZE,
+    MONGO_BULK_MAX_AGE,
+    MONGO_BULK_WRITE,
+    MONGO_ENSURE_SCHEMA,
+    MONGO_ROLLUPS,
+    MONGO_SPOOL_DIR,
+    MONGO_TIMESERIES,
+    MONGO_TIMESERIES_GRANULARITY,
+    MONGO_WRITE_PROFILE,
+)
+from ingestion.image_jobs import ImageJobQueue, new_job_id
+from ingestion.stream_parser import iter_json_array, iter_ndjson
+from observability import metrics
+from observability.structured_logging import configure_logging, ensure_logging
+
+bp = Blueprint("ingestion", __name__)
 UPLOAD_FOLDER = "storage/images_raw"
-app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+upload_manager = ChunkedUploadManager(upload_dir=UPLOAD_FOLDER)
+# Uploaded frames are processed by a separate ingestion.image_pipeline process
+image_jobs = ImageJobQueue()
+NDJSON_MIMETYPES = {"application/x-ndjson", "application/jsonl", "application/json-seq"}
+
+
+logger = logging.getLogger(__name__)
+# Per-record events; sample them with LOG_SAMPLE="ingestion.app.records=N"
+record_logger = logging.getLogger(f"{__name__}.records")
 
 
 def log_event(event, **kwargs):
-    """Log an event with optional keyword arguments (placeholder implementation)."""
-    print(f"{event}: {kwargs}")
+    """Log an event with its keyword arguments as a structured ``data`` field."""
+    logger.info(event, extra={"data": kwargs})
 
 
-weather_db = WeatherDB()
+# Each app keeps its WeatherDB in app.extensions under this key: the one passed
+# to create_app(), or one created from the config by get_weather_db()
+WEATHER_DB_EXTENSION = "weather_db"
+_weather_db_lock = threading.Lock()
+
+
+def get_weather_db(app=None):
+    """Return the app's ``WeatherDB``, creating it from the config on first use.
+
+    Args:
+        app (Flask, optional): The app; the current app by default.
+    """
+    extensions = (app or current_app).extensions
+    weather_db = extensions.get(WEATHER_DB_EXTENSION)
+    if weather_db is None:
+        with _weather_db_lock:
+            weather_db = extensions.get(WEATHER_DB_EXTENSION)
+            if weather_db is None:
+                from database.mongo_ops import WeatherDB
+
+                weather_db = extensions[WEATHER_DB_EXTENSION] = WeatherDB(
+                    bulk_write=MONGO_BULK_WRITE,
+                    bulk_batch_size=MONGO_BULK_BATCH_SIZE,
+                    bulk_max_age=MONGO_BULK_MAX_AGE,
+                    blob_store=BlobStore(),
+                    latest_cache_size=LATEST_CACHE_SIZE,
+                    latest_cache_ttl=LATEST_CACHE_TTL,
+                    spool_dir=MONGO_SPOOL_DIR or None,
+                    dedupe_filter_size=DEDUPE_FILTER_SIZE,
+                    dedupe_error_rate=DEDUPE_ERROR_RATE,
+                    profile=MONGO_WRITE_PROFILE,
+                    rollups=MONGO_ROLLUPS,
+                )
+    return weather_db
 
 
 def process_and_store_weather_data(payload: dict):
     """Validate and insert weather sensor data into the database.
 
     Parses and validates the incoming sensor data against the WeatherSensorData schema.
-    If validation succeeds, stores the cleaned record using the weather_db interface.
+    If validation succeeds, stores the cleaned record using the app's WeatherDB.
     Otherwise, prints the validation errors.
 
     Args:
@@ -35,13 +113,33 @@ def process_and_store_weather_data(payload: dict):
     Returns:
         None
     """
+    from pydantic import ValidationError
+
+    from database.bulk_writer import BulkWriteFailure
+    from database.dedupe import is_duplicate
+    from validation.schemas.weather_sensor_data import WeatherSensorData
+
     try:
-        validated = WeatherSensorData(**payload)
-        record = validated.dict(exclude_none=True)
-        weather_db.insert_sensor_data(record)
-        print("Sensor data inserted successfully.")
+        with metrics.stage("validate", invalid=ValidationError):
+            validated = WeatherSensorData(**payload)
+            record = validated.dict(exclude_none=True)
+        with metrics.stage("insert"):
+            get_weather_db().insert_sensor_data(record)
+        record_logger.info(
+            "Sensor data inserted", extra={"data": {"sensor_id": record["sensor_id"]}}
+        )
+    except BulkWriteFailure as e:
+        if not is_duplicate(e):
+            raise
+        record_logger.info(
+            "Sensor data already stored",
+            extra={"data": {"sensor_id": record["sensor_id"]}},
+        )
     except ValidationError as e:
-        print("Validation failed:", e)
+        record_logger.warning(
+            "Validation failed",
+            extra={"data": {"error": format_validation_error(e.errors())}},
+        )
 
 
 def validate_and_store(payload: dict):
@@ -58,16 +156,35 @@ def validate_and_store(payload: dict):
 
     Returns:
         str or None: The inserted record's ID as a string if successful;
-            `None` if validation fails.
+            `None` if validation fails or the reading is already stored.
     """
+    from pydantic import ValidationError
+
+    from database.bulk_writer import BulkWriteFailure
+    from database.dedupe import is_duplicate
+    from validation.schemas.weather_sensor_data import WeatherSensorData
+
     try:
-        validated = WeatherSensorData(**payload)
-        record = validated.dict(exclude_none=True)
-        record_id = insert_sensor_data(record)
-        print(f"Inserted with ID: {record_id}")
+        with metrics.stage("validate", invalid=ValidationError):
+            validated = WeatherSensorData(**payload)
+            record = validated.dict(exclude_none=True)
+        with metrics.stage("insert"):
+            record_id = str(get_weather_db().insert_sensor_data(record))
+        record_logger.info("Sensor data inserted", extra={"data": {"id": record_id}})
         return record_id
+    except BulkWriteFailure as e:
+        if not is_duplicate(e):
+            raise
+        record_logger.info(
+            "Sensor data already stored",
+            extra={"data": {"sensor_id": record["sensor_id"]}},
+        )
+        return None
     except ValidationError as e:
-        print(f"Validation error: {e}")
+        record_logger.warning(
+            "Validation failed",
+            extra={"data": {"error": format_validation_error(e.errors())}},
+        )
         return None
 
 
@@ -82,16 +199,21 @@ def validate_upload(file, metadata):
         bool: True if the upload is valid, else False.
     """
     # Basic validation: check file extension and required metadata fields
-    allowed_extensions = {"jpg", "jpeg", "png", "bmp"}
-    filename = file.filename.lower()
-    if "." not in filename or filename.rsplit(".", 1)[1] not in allowed_extensions:
+    if not allowed_image(file.filename):
         return False
     if not metadata.get("sensor_id") or not metadata.get("timestamp"):
         return False
     return True
 
 
-@app.route("/upload", methods=["POST"])
+def allowed_image(filename: str) -> bool:
+    """Return True if the file name has an accepted image extension."""
+    allowed_extensions = {"jpg", "jpeg", "png", "bmp"}
+    filename = filename.lower()
+    return "." in filename and filename.rsplit(".", 1)[1] in allowed_extensions
+
+
+@bp.route("/upload", methods=["POST"])
 def upload_files():
     """Handle POST requests to upload a file with sensor metadata.
 
@@ -99,27 +221,349 @@ def upload_files():
         - 'file' in request.files
         - Metadata fields like 'sensor_id' and 'timestamp' in request.form
 
+    The image is only saved and queued here; thumbnails, the archival copy
+    and metadata are produced in the background by ``ingestion.image_pipeline``.
+
     Returns:
-        JSON response with success message or error, along with HTTP status.
+        JSON response with success message and image 'job_id', or error,
+        along with HTTP status.
     """
     if "file" not in request.files:
         return jsonify({"error": "No file part in the request"}), 400
 
-    file = request.files["files"]
+    file = request.files["file"]
     metadata = request.form.to_dict()
 
     if not file or file.filename == "":
         return jsonify({"error": "No file selected"}), 400
 
     if not validate_upload(file, metadata):
+        metrics.RECORDS.labels("upload", "rejected").inc()
         return jsonify({"error": "invalid file or metadata"}), 400
 
-    filename = secure_filename(file.filename or "")
-    file.save(os.path.join(app.config["UPLOAD_FOLDER"], filename))
+    # Cameras resend the same file name; prefix the job ID like chunked uploads do
+    job_id = new_job_id()
+    filename = f"{job_id}_{secure_filename(file.filename or '')}"
+    path = os.path.join(current_app.config["UPLOAD_FOLDER"], filename)
+    with metrics.stage("file_save"):
+        os.makedirs(current_app.config["UPLOAD_FOLDER"], exist_ok=True)
+        file.save(path)
+        image_jobs.enqueue(path, metadata, job_id=job_id)
+
+    metrics.RECORDS.labels("upload", "accepted").inc()
+    log_event("File uploaded", filename=filename, metadata=metadata, job_id=job_id)
+    return jsonify({"message": "Upload Successful", "job_id": job_id}), 200
+
+
+@bp.errorhandler(UploadError)
+def handle_upload_error(error: UploadError):
+    """Return chunked upload errors as JSON with their HTTP status."""
+    return jsonify({"error": str(error)}), error.status
+
+
+@bp.route("/uploads", methods=["POST"])
+def init_chunked_upload():
+    """Open a resumable chunked upload.
+
+    Expects:
+        JSON body with 'filename', 'sensor_id' and 'timestamp', and optionally
+        'total_size' (bytes) and 'sha256' (hex digest of the whole file).
+
+    Returns:
+        JSON response with the new 'upload_id' and HTTP 201.
+    """
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "request body must be a JSON object"}), 400
+    metadata = {k: v for k, v in body.items() if k not in ("total_size", "sha256")}
+    filename = str(body.get("filename", ""))
+    if (
+        not allowed_image(filename)
+        or not body.get("sensor_id")
+        or not body.get("timestamp")
+    ):
+        return jsonify({"error": "invalid file or metadata"}), 400
+    upload_id = upload_manager.init_upload(
+        filename, metadata, total_size=body.get("total_size"), sha256=body.get("sha256")
+    )
+    return jsonify({"upload_id": upload_id}), 201
+
+
+@bp.route("/uploads/<upload_id>/parts/<int:part_number>", methods=["PUT"])
+def put_upload_part(upload_id, part_number):
+    """Stream one numbered part of an upload to disk.
+
+    Parts may arrive in any order or concurrently; re-sending a part replaces it.
+    An optional 'X-Part-SHA256' header is checked against the received bytes.
+    """
+    with metrics.stage("file_save", invalid=UploadError):
+        part = upload_manager.write_part(
+            upload_id,
+            part_number,
+            request.stream,
+            sha256=request.headers.get("X-Part-SHA256"),
+        )
+    return jsonify(part), 200
+
+
+@bp.route("/uploads/<upload_id>", methods=["GET"])
+def get_upload_status(upload_id):
+    """List the parts received so far, so a client can resend only missing ones."""
+    return jsonify(upload_manager.status(upload_id)), 200
+
+
+@bp.route("/uploads/<upload_id>/commit", methods=["POST"])
+def commit_chunked_upload(upload_id):
+    """Assemble an upload's parts into the final file and queue it for processing.
+
+    Expects:
+        JSON body with 'parts' (number of parts) and optionally 'sha256'.
+    """
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "request body must be a JSON object"}), 400
+    if not isinstance(body.get("parts"), int) or body["parts"] < 1:
+        return jsonify({"error": "'parts' must be a positive integer"}), 400
+    with metrics.stage("file_save", invalid=UploadError):
+        result = upload_manager.commit(
+            upload_id, body["parts"], sha256=body.get("sha256")
+        )
+        result["job_id"] = image_jobs.enqueue(
+            upload_manager.upload_dir / result["filename"], result["metadata"]
+        )
+    log_event("File uploaded", **result)
+    return jsonify(result), 200
+
+
+def format_validation_error(errors: list) -> str:
+    """Summarize pydantic error dicts as ``field: message`` pairs."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in errors
+    )
+
+
+def _write_bulk_batch(batch):
+    """Validate a batch of payloads, insert the valid ones and fill in each result."""
+    from database.dedupe import is_duplicate
+    from validation.batch import validate_sensor_batch
+
+    with metrics.stage("validate") as timer:
+        validation = validate_sensor_batch([payload for _, payload in batch])
+        if validation.errors:
+            timer.outcome = "invalid"
+    for index, errors in validation.errors.items():
+        batch[index][0].update(status="rejected", error=format_validation_error(errors))
+    with metrics.stage("insert") as timer:
+        outcomes = get_weather_db().insert_sensor_data_many(validation.records)
+        if any(error is not None and not is_duplicate(error) for _, error in outcomes):
+            timer.outcome = "error"
+    for index, (inserted_id, error) in zip(validation.indices, outcomes):
+        if error is None:
+            batch[index][0].update(status="accepted", id=str(inserted_id))
+        elif is_duplicate(error):
+            batch[index][0].update(status="duplicate", message="already stored")
+        else:
+            batch[index][0].update(status="rejected", error=str(error))
+
+
+@bp.route("/ingest/bulk", methods=["POST"])
+def ingest_bulk():
+    """Ingest many sensor readings from one JSON, NDJSON or binary request body.
+
+    The body is parsed record by record as it streams in; every batch of
+    records is validated in one call and written with one ``insert_many``.
+
+    Expects:
+        - Content-Type ``application/json`` with a top-level array, or
+          ``application/x-ndjson`` with one JSON object per line (may be chunked)
+        - or a compact binary body (see ``ingestion.binary_codec``):
+          ``application/x-weather-frame`` struct frames, ``application/msgpack``
+          or ``application/cbor``
+
+    Returns:
+        JSON response with accepted/duplicate/rejected counts and a per-line
+        result list. Readings that are already stored are reported with status
+        "duplicate" rather than as errors, so device retries are harmless.
+    """
+    mimetype = request.mimetype
+    if mimetype in NDJSON_MIMETYPES:
+        records = iter_ndjson(
+            request.stream,
+            max_record_bytes=BULK_INGEST_MAX_RECORD_BYTES,
+            json_seq=mimetype == "application/json-seq",
+        )
+    elif mimetype == "application/json":
+        records = iter_json_array(
+            request.stream, max_record_bytes=BULK_INGEST_MAX_RECORD_BYTES
+        )
+    elif mimetype == binary_codec.FRAME_MIMETYPE:
+        records = binary_codec.iter_frame(request.stream, BULK_INGEST_MAX_FRAME_BYTES)
+    elif mimetype in binary_codec.MSGPACK_MIMETYPES and binary_codec.msgpack:
+        records = binary_codec.iter_msgpack(
+            request.stream, BULK_INGEST_MAX_RECORD_BYTES
+        )
+    elif mimetype == binary_codec.CBOR_MIMETYPE and binary_codec.cbor2:
+        records = binary_codec.iter_cbor(request.stream, BULK_INGEST_MAX_RECORD_BYTES)
+    else:
+        return (
+            jsonify({"error": f"unsupported content type: {mimetype or 'none'}"}),
+            415,
+        )
+
+    results = []
+    batch = []
+    for line, payload, error in metrics.timed_iter("decode", records):
+        result = {"line": line}
+        results.append(result)
+        if error is not None:
+            result.update(status="rejected", error=error)
+            continue
+        batch.append((result, payload))
+        if len(batch) >= BULK_INGEST_BATCH_SIZE:
+            _write_bulk_batch(batch)
+            batch = []
+    if batch:
+        _write_bulk_batch(batch)
+
+    accepted = sum(1 for result in results if result["status"] == "accepted")
+    duplicates = sum(1 for result in results if result["status"] == "duplicate")
+    rejected = len(results) - accepted - duplicates
+    metrics.RECORDS.labels("bulk", "accepted").inc(accepted)
+    metrics.RECORDS.labels("bulk", "duplicate").inc(duplicates)
+    metrics.RECORDS.labels("bulk", "rejected").inc(rejected)
+    log_event(
+        "Bulk ingest", accepted=accepted, duplicates=duplicates, rejected=rejected
+    )
+    return (
+        jsonify(
+            {
+                "accepted": accepted,
+                "duplicates": duplicates,
+                "rejected": rejected,
+                "results": results,
+            }
+        ),
+        200,
+    )
+
+
+def _jsonable(value):
+    """Convert ObjectIds and datetimes in a document to JSON-friendly strings."""
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+@bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Expose ingest counters and stage latency histograms for Prometheus."""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@bp.route("/sensors/<sensor_id>/latest", methods=["GET"])
+def get_latest_reading(sensor_id):
+    """Return a sensor's most recent reading, served from the in-process cache.
+
+    Returns:
+        JSON sensor document, or an error with HTTP 404 if the sensor is unknown.
+    """
+    document = get_weather_db().get_latest_reading(sensor_id)
+    if document is None:
+        return jsonify({"error": "no readings for sensor"}), 404
+    return jsonify(_jsonable(document)), 200
+
+
+@bp.route("/sensors/latest/cache", methods=["GET"])
+def get_latest_cache_stats():
+    """Report hit/miss counters of the latest-reading cache."""
+    latest_cache = get_weather_db().latest_cache
+    if latest_cache is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True} | latest_cache.stats()), 200
+
+
+def warm_up(app=None) -> dict:
+    """Load everything requests need, so the first request is not slow.
+
+    Imports the schema graph and builds the batch validators, loads numpy for
+    binary frames, creates the ``WeatherDB`` and checks that MongoDB answers.
+    With ``MONGO_ENSURE_SCHEMA`` it then runs ``WeatherDB.ensure_schema``, so
+    every deployment gets the indexes (including the unique reading key).
+    An unreachable MongoDB is logged, not raised: the app still starts and
+    connects once the server is back.
+
+    Args:
+        app (Flask, optional): The app to warm up; the current app by default.
+
+    Returns:
+        dict: Seconds spent per warm-up step.
+    """
+    timings = {}
+
+    started = time.perf_counter()
+    from validation.batch import validate_sensor_batch  # noqa: F401
+    from validation.schemas.weather_sensor_data import WeatherSensorData  # noqa: F401
+
+    timings["schemas"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    binary_codec.frame_dtype(binary_codec.FRAME_VERSION)
+    timings["binary_codec"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    try:
+        weather_db = get_weather_db(app)
+        weather_db.client.admin.command("ping")
+        if MONGO_ENSURE_SCHEMA:
+            weather_db.ensure_schema(
+                timeseries=MONGO_TIMESERIES, granularity=MONGO_TIMESERIES_GRANULARITY
+            )
+    except Exception as exc:
+        logger.warning(
+            "MongoDB not ready during warm-up", extra={"data": {"error": str(exc)}}
+        )
+    timings["database"] = time.perf_counter() - started
+
+    log_event("Warm-up finished", **timings)
+    return timings
+
+
+def create_app(weather_db=None, warm=False) -> Flask:
+    """Build the ingestion Flask app.
+
+    Args:
+        weather_db (WeatherDB, optional): Database to use; by default one is
+            created from the config on first use.
+        warm (bool): Run ``warm_up()`` before returning.
+
+    Structured logging to ``LOG_FILE`` is set up here unless the process
+    already has logging configured (see ``ensure_logging``).
+
+    Returns:
+        Flask: The app with all ingestion routes registered.
+    """
+    ensure_logging()
+    app = Flask(__name__)
+    app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+    app.register_blueprint(bp)
+    if weather_db is not None:
+        app.extensions[WEATHER_DB_EXTENSION] = weather_db
+    if warm:
+        warm_up(app)
+    return app
+
 
-    log_event("File uploaded", filename=filename, metadata=metadata)
-    return jsonify({"message": "Upload Successful"}), 200
+app = create_app()
 
 
 if __name__ == "__main__":
+    configure_logging()
+    app = create_app(warm=True)
     app.run(port=5000, debug=True)
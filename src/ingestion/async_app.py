@@ -0,0 +1,355 @@
+"""Asyncio ingestion server with a bounded queue and explicit backpressure.
+
+Runs next to the Flask app in ``ingestion/app.py``. Request handlers only put
+readings on a bounded in-process queue and answer ``202 Accepted``; consumer
+tasks drain the queue in batches, validate each batch in one call and
+write them with ``insert_many`` on a thread pool, so a slow MongoDB never
+blocks the event loop. When the queue is full the server answers ``429`` with
+a ``Retry-After`` header instead of letting latency grow. A request with more
+readings than the whole queue holds could never be accepted, so it gets
+``413`` instead.
+
+Validation is CPU-bound, so under the GIL the thread pool uses one core. With
+``processes`` (``ASYNC_PROCESSES``) set, batches are validated and written by
+a pool of worker processes instead, each with its own ``WeatherDB``
+connection, and throughput scales with the cores available.
+
+Usage:
+    PYTHONPATH=src python -m ingestion.async_app
+    ASYNC_PROCESSES=8 PYTHONPATH=src python -m ingestion.async_app
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from aiohttp import web
+
+from database.blob_store import BlobStore
+from database.dedupe import is_duplicate
+from database.mongo_ops import WeatherDB
+from ingestion.config import (
+    ASYNC_BATCH_SIZE,
+    ASYNC_BATCH_WAIT,
+    ASYNC_CONSUMERS,
+    ASYNC_PROCESSES,
+    ASYNC_QUEUE_SIZE,
+    ASYNC_RETRY_AFTER,
+    MONGO_ROLLUPS,
+    MONGO_TIMESERIES,
+    MONGO_TIMESERIES_GRANULARITY,
+    MONGO_WRITE_PROFILE,
+)
+from observability import metrics
+from observability.structured_logging import configure_logging, ensure_logging
+from validation.batch import validate_sensor_batch
+
+SERVICE_KEY = web.AppKey("ingest_service", object)
+logger = logging.getLogger(__name__)
+
+# WeatherDB of a worker process (process mode), created by _init_worker
+_worker_db = None
+
+
+def default_worker_db():
+    """Create the ``WeatherDB`` batches are written with (one per worker process)."""
+    return WeatherDB(
+        blob_store=BlobStore(), profile=MONGO_WRITE_PROFILE, rollups=MONGO_ROLLUPS
+    )
+
+
+def store_batch(weather_db, batch: list) -> tuple:
+    """Validate a batch and write the valid records.
+
+    Runs on the writer thread pool, or inside a worker process in process mode.
+
+    Returns:
+        tuple: Number of invalid, stored, duplicate and failed readings in the
+        batch, and the validation errors by batch index.
+    """
+    with metrics.stage("validate") as timer:
+        validation = validate_sensor_batch(batch)
+        if validation.errors:
+            timer.outcome = "invalid"
+    with metrics.stage("insert") as timer:
+        outcomes = weather_db.insert_sensor_data_many(validation.records)
+        duplicates = sum(1 for _, error in outcomes if is_duplicate(error))
+        failed = sum(1 for _, error in outcomes if error is not None) - duplicates
+        if failed:
+            timer.outcome = "error"
+    counts = {
+        "invalid": len(validation.errors),
+        "stored": len(outcomes) - duplicates - failed,
+        "duplicates": duplicates,
+        "failed": failed,
+    }
+    return counts, validation.errors
+
+
+def _init_worker(worker_db):
+    """Set up a worker process: its own database connection and stage capture."""
+    global _worker_db
+    # Ctrl-C reaches the whole process group; the parent drains and stops us
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_db = worker_db()
+    metrics.capture_stages()
+
+
+def _store_in_worker(batch: list) -> tuple:
+    """Store a batch in a worker process and return its stage timings too."""
+    counts, errors = store_batch(_worker_db, batch)
+    return counts, errors, metrics.take_captured_stages()
+
+
+class AsyncIngestService:
+    """Bounded reading queue drained by batching consumer tasks.
+
+    Attributes:
+        stats (dict): Counters for queued, rejected (queue full), invalid,
+            stored, duplicate (already stored) and failed readings.
+    """
+
+    def __init__(
+        self,
+        weather_db,
+        maxsize=ASYNC_QUEUE_SIZE,
+        batch_size=ASYNC_BATCH_SIZE,
+        batch_wait=ASYNC_BATCH_WAIT,
+        consumers=ASYNC_CONSUMERS,
+        processes=0,
+        worker_db=default_worker_db,
+    ):
+        """Configure the service; call ``start()`` from a running event loop.
+
+        Args:
+            weather_db (WeatherDB): Database used for the batch writes.
+            maxsize (int): Readings the queue holds before rejecting requests.
+            batch_size (int): Largest batch a consumer validates and writes.
+            batch_wait (float): Seconds a consumer waits to fill a batch.
+            consumers (int): Number of consumer tasks (and writer threads).
+            processes (int): Worker processes that validate and write batches;
+                0 keeps the work on threads of this process.
+            worker_db (Callable[[], WeatherDB]): Picklable factory called once in
+                every worker process for its own database connection.
+        """
+        self.weather_db = weather_db
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.consumers = max(consumers, processes)
+        self.processes = processes
+        self.worker_db = worker_db
+        self.queue = None
+        self.stats = dict.fromkeys(
+            ("queued", "rejected", "invalid", "stored", "duplicates", "failed"), 0
+        )
+        self._tasks = []
+        self._executor = None
+
+    def _start_executor(self):
+        if self.processes:
+            # spawn, not fork: this process already runs an event loop and threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.worker_db,),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.consumers, thread_name_prefix="ingest-writer"
+            )
+
+    async def start(self):
+        """Create the queue, the writer pool and the consumer tasks."""
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self._start_executor()
+        self._tasks = [
+            asyncio.create_task(self._consume()) for _ in range(self.consumers)
+        ]
+
+    async def stop(self):
+        """Drain the queue, stop the consumers and shut the writer pool down.
+
+        Every queued reading, including batches in flight in worker
+        processes, is stored before this returns.
+        """
+        await self.queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
+    def offer(self, payloads: list) -> bool:
+        """Queue all payloads, or none of them if they do not fit.
+
+        Returns:
+            bool: False when the queue lacks room and the caller should back off.
+        """
+        if self.maxsize - self.queue.qsize() < len(payloads):
+            self.stats["rejected"] += len(payloads)
+            return False
+        for payload in payloads:
+            self.queue.put_nowait(payload)
+        self.stats["queued"] += len(payloads)
+        return True
+
+    async def _next_batch(self) -> list:
+        """Wait for one reading, then gather more for up to ``batch_wait`` seconds."""
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _consume(self):
+        """Validate and store queued readings batch by batch."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            try:
+                if self.processes:
+                    counts, errors, stages = await self._store_in_process(batch)
+                    metrics.observe_stages(stages)
+                else:
+                    counts, errors = await loop.run_in_executor(
+                        self._executor, store_batch, self.weather_db, batch
+                    )
+                self._record(counts, errors)
+            except Exception:  # e.g. a worker process died; keep draining
+                logger.exception(
+                    "Storing batch failed", extra={"data": {"size": len(batch)}}
+                )
+                self.stats["failed"] += len(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _store_in_process(self, batch: list) -> tuple:
+        """Store a batch in a worker process, once more on a fresh pool if one died.
+
+        A dead worker breaks the whole pool, failing every batch in flight on
+        it; only the first of those failures replaces the pool.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            return await loop.run_in_executor(executor, _store_in_worker, batch)
+        except BrokenProcessPool:
+            if executor is self._executor:
+                logger.error("Ingest worker process died; restarting the pool")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._start_executor()
+        return await loop.run_in_executor(self._executor, _store_in_worker, batch)
+
+    def _record(self, counts: dict, errors: dict):
+        """Update the counters and log validation failures of a stored batch."""
+        for index, batch_errors in errors.items():
+            logger.warning(
+                "Validation failed",
+                extra={"data": {"index": index, "errors": batch_errors}},
+            )
+        for key, count in counts.items():
+            self.stats[key] += count
+        metrics.RECORDS.labels("readings", "stored").inc(counts["stored"])
+        metrics.RECORDS.labels("readings", "duplicate").inc(counts["duplicates"])
+        metrics.RECORDS.labels("readings", "rejected").inc(
+            counts["invalid"] + counts["failed"]
+        )
+
+
+async def post_readings(request: web.Request) -> web.Response:
+    """Accept one reading (JSON object) or many (JSON array) for async storage."""
+    service = request.app[SERVICE_KEY]
+    try:
+        body = await request.json()
+    except ValueError:
+        return web.json_response({"error": "invalid JSON body"}, status=400)
+    payloads = body if isinstance(body, list) else [body]
+    if not all(isinstance(payload, dict) for payload in payloads):
+        return web.json_response({"error": "expected JSON objects"}, status=400)
+
+    if len(payloads) > service.maxsize:
+        # Retrying would never help; the client has to split the batch
+        metrics.RECORDS.labels("readings", "rejected").inc(len(payloads))
+        return web.json_response(
+            {
+                "error": f"{len(payloads)} readings exceed the ingest queue size "
+                f"of {service.maxsize}; send smaller batches"
+            },
+            status=413,
+        )
+    if not service.offer(payloads):
+        metrics.RECORDS.labels("readings", "throttled").inc(len(payloads))
+        return web.json_response(
+            {"error": "ingest queue is full"},
+            status=429,
+            headers={"Retry-After": str(ASYNC_RETRY_AFTER)},
+        )
+    return web.json_response({"queued": len(payloads)}, status=202)
+
+
+async def get_health(request: web.Request) -> web.Response:
+    """Report queue depth and ingest counters."""
+    service = request.app[SERVICE_KEY]
+    return web.json_response(
+        {"queue_depth": service.queue.qsize(), "queue_size": service.maxsize}
+        | service.stats
+    )
+
+
+async def get_metrics(request: web.Request) -> web.Response:
+    """Expose ingest counters and stage latency histograms for Prometheus."""
+    return web.Response(
+        body=metrics.REGISTRY.render().encode(),
+        headers={"Content-Type": metrics.CONTENT_TYPE},
+    )
+
+
+def create_app(service: AsyncIngestService = None) -> web.Application:
+    """Build the aiohttp application around an ingest service.
+
+    Args:
+        service (AsyncIngestService, optional): Service to use; by default one
+            backed by a new ``WeatherDB`` is created.
+
+    Returns:
+        web.Application: App whose startup/cleanup hooks start and drain the service.
+    """
+    ensure_logging()  # unless the process already has logging configured
+    app = web.Application()
+    app[SERVICE_KEY] = service or AsyncIngestService(default_worker_db())
+
+    async def start_service(app):
+        await app[SERVICE_KEY].start()
+
+    async def stop_service(app):
+        await app[SERVICE_KEY].stop()
+
+    app.on_startup.append(start_service)
+    app.on_cleanup.append(stop_service)
+    app.router.add_post("/readings", post_readings)
+    app.router.add_get("/health", get_health)
+    app.router.add_get("/metrics", get_metrics)
+    return app
+
+
+if __name__ == "__main__":
+    configure_logging()
+    weather_db = default_worker_db()
+    weather_db.ensure_schema(
+        timeseries=MONGO_TIMESERIES, granularity=MONGO_TIMESERIES_GRANULARITY
+    )
+    web.run_app(
+        create_app(AsyncIngestService(weather_db, processes=ASYNC_PROCESSES)),
+        port=5001,
+    )
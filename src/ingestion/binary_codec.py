@@ -0,0 +1,278 @@
+"""Compact binary encodings of sensor readings for constrained devices.
+
+Two alternatives to JSON are accepted by ``/ingest/bulk``:
+
+``application/x-weather-frame`` -- a versioned, fixed-layout struct frame
+    carrying only the numeric fields. A frame is an 8-byte header
+    ``<magic "WXF1"><version:uint8><reserved:uint8><count:uint16>`` followed
+    by ``count`` little-endian records of ``FRAME_LAYOUTS[version]``. Absent
+    readings are sent as NaN. Version 1 records are 92 bytes, against
+    roughly 400 bytes for the equivalent JSON, and a whole batch is decoded
+    with a single ``numpy.frombuffer`` call.
+
+``application/msgpack`` / ``application/cbor`` -- the full nested record as
+    MessagePack or CBOR, one map per reading (concatenated) or one array of
+    maps. Images travel as raw bytes in ``image.data``, with no base64
+    overhead. Both formats need their optional packages (``msgpack``,
+    ``cbor2``); without them the content type is rejected.
+
+All decoders yield the ``(position, record, error)`` tuples of
+``ingestion.stream_parser``, so decoded records take the same validation
+and storage path as JSON.
+"""
+
+import io
+import math
+import struct
+from datetime import datetime, timezone
+from functools import lru_cache
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional dependency
+    cbor2 = None
+
+FRAME_MIMETYPE = "application/x-weather-frame"
+MSGPACK_MIMETYPES = {
+    "application/msgpack",
+    "application/x-msgpack",
+    "application/vnd.msgpack",
+}
+CBOR_MIMETYPE = "application/cbor"
+
+FRAME_MAGIC = b"WXF1"
+FRAME_HEADER = struct.Struct("<4sBBH")
+READING_FIELDS = (
+    "temperature_c",
+    "humidity_percent",
+    "pressure_hpa",
+    "wind_speed_mps",
+    "wind_direction_deg",
+    "rain_mm",
+    "sunlight_lux",
+    "dew_point_c",
+    "heat_index_c",
+)
+DEVICE_FIELDS = ("battery_level", "signal_strength")
+
+# (field, numpy type) of each record, per frame version
+FRAME_LAYOUTS = {
+    1: [("timestamp_ms", "<i8"), ("sensor_id", "S24"), ("lat", "<f8"), ("lon", "<f8")]
+    + [(name, "<f4") for name in DEVICE_FIELDS + READING_FIELDS],
+}
+FRAME_VERSION = max(FRAME_LAYOUTS)
+
+# float32 carries ~7 significant digits; round decoded values back to what was sent
+FLOAT32_DECIMALS = 3
+
+
+@lru_cache(maxsize=None)
+def frame_dtype(version: int):
+    """Return the numpy record dtype of a frame version, or None if unknown.
+
+    numpy is imported here rather than at module import, so JSON-only
+    processes do not pay for it at startup.
+    """
+    import numpy as np
+
+    layout = FRAME_LAYOUTS.get(version)
+    return None if layout is None else np.dtype(layout)
+
+
+def encode_frame(records: list, version: int = FRAME_VERSION) -> bytes:
+    """Pack nested sensor records into a struct frame (device/test side).
+
+    Args:
+        records (list[dict]): Records with ``timestamp`` (datetime), ``sensor_id``,
+            ``location`` and optional ``readings`` / ``device_info`` values.
+        version (int): Frame layout version.
+
+    Returns:
+        bytes: Header plus fixed-size records.
+    """
+    import numpy as np
+
+    frame = np.zeros(len(records), dtype=frame_dtype(version))
+    for index, record in enumerate(records):
+        row = frame[index]
+        timestamp = record["timestamp"]
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        row["timestamp_ms"] = round(timestamp.timestamp() * 1000)
+        row["sensor_id"] = record["sensor_id"].encode("ascii")
+        row["lat"] = record["location"]["lat"]
+        row["lon"] = record["location"]["lon"]
+        for group, names in (
+            ("device_info", DEVICE_FIELDS),
+            ("readings", READING_FIELDS),
+        ):
+            values = record.get(group) or {}
+            for name in names:
+                value = values.get(name)
+                row[name] = math.nan if value is None else value
+    header = FRAME_HEADER.pack(FRAME_MAGIC, version, 0, len(records))
+    return header + frame.tobytes()
+
+
+def decode_frame(body: bytes) -> list:
+    """Unpack a struct frame into nested sensor records.
+
+    Raises:
+        ValueError: If the header, version or length is invalid.
+    """
+    import numpy as np
+
+    if len(body) < FRAME_HEADER.size:
+        raise ValueError("frame header truncated")
+    magic, version, _, count = FRAME_HEADER.unpack_from(body)
+    if magic != FRAME_MAGIC:
+        raise ValueError("not a weather frame")
+    dtype = frame_dtype(version)
+    if dtype is None:
+        raise ValueError(f"unsupported frame version {version}")
+    if len(body) != FRAME_HEADER.size + count * dtype.itemsize:
+        raise ValueError("frame length does not match record count")
+    rows = np.frombuffer(body, dtype=dtype, count=count, offset=FRAME_HEADER.size)
+
+    # Decode column-wise, then assemble the nested dicts
+    columns = {}
+    for name in DEVICE_FIELDS + READING_FIELDS:
+        values = np.round(rows[name].astype(np.float64), FLOAT32_DECIMALS)
+        columns[name] = [None if math.isnan(v) else v for v in values.tolist()]
+    timestamps = [
+        datetime.fromtimestamp(ms / 1000, timezone.utc)
+        for ms in rows["timestamp_ms"].tolist()
+    ]
+    sensor_ids = [raw.decode("ascii", "replace") for raw in rows["sensor_id"].tolist()]
+    lats, lons = rows["lat"].tolist(), rows["lon"].tolist()
+
+    records = []
+    for index in range(count):
+        records.append(
+            {
+                "timestamp": timestamps[index],
+                "sensor_id": sensor_ids[index],
+                "location": {"lat": lats[index], "lon": lons[index]},
+                "readings": {
+                    name: columns[name][index]
+                    for name in READING_FIELDS
+                    if columns[name][index] is not None
+                },
+                "device_info": {
+                    name: columns[name][index]
+                    for name in DEVICE_FIELDS
+                    if columns[name][index] is not None
+                },
+            }
+        )
+    return records
+
+
+def iter_frame(stream, max_bytes: int):
+    """Yield ``(position, record, error)`` for a struct frame request body."""
+    body = stream.read(max_bytes + 1)
+    if len(body) > max_bytes:
+        yield 1, None, "frame too large"
+        return
+    try:
+        records = decode_frame(body)
+    except ValueError as exc:
+        yield 1, None, str(exc)
+        return
+    for position, record in enumerate(records, start=1):
+        yield position, record, None
+
+
+def _records(obj):
+    """Yield ``(record, error)`` for a decoded map or array of maps."""
+    for record in obj if isinstance(obj, list) else [obj]:
+        if isinstance(record, dict):
+            yield record, None
+        else:
+            yield None, "expected a map"
+
+
+def iter_msgpack(stream, max_record_bytes: int):
+    """Yield ``(position, record, error)`` for concatenated MessagePack items.
+
+    Raises:
+        RuntimeError: If the ``msgpack`` package is not installed.
+    """
+    if msgpack is None:
+        raise RuntimeError("msgpack is not installed")
+    unpacker = msgpack.Unpacker(
+        stream, raw=False, timestamp=3, max_buffer_size=max_record_bytes
+    )
+    position = 0
+    while True:
+        try:
+            obj = unpacker.unpack()
+        except msgpack.OutOfData:
+            return
+        except msgpack.BufferFull:
+            yield position + 1, None, "record too large"
+            return
+        except (ValueError, msgpack.UnpackException) as exc:
+            yield position + 1, None, f"invalid MessagePack: {str(exc) or type(exc).__name__}"
+            return
+        for record, error in _records(obj):
+            position += 1
+            yield position, record, error
+
+
+def iter_cbor(stream, max_record_bytes: int):
+    """Yield ``(position, record, error)`` for concatenated CBOR items.
+
+    Raises:
+        RuntimeError: If the ``cbor2`` package is not installed.
+    """
+    if cbor2 is None:
+        raise RuntimeError("cbor2 is not installed")
+    reader = _BoundedReader(stream, max_record_bytes)
+    decoder = cbor2.CBORDecoder(reader)
+    position = 0
+    while True:
+        reader.start_item()
+        try:
+            obj = decoder.decode()
+        except cbor2.CBORDecodeEOF:
+            if reader.item_bytes:
+                yield position + 1, None, "invalid CBOR: truncated item"
+            return
+        except (cbor2.CBORDecodeError, ValueError) as exc:
+            if reader.item_bytes > reader.limit:
+                yield position + 1, None, "record too large"
+            else:
+                yield position + 1, None, f"invalid CBOR: {exc}"
+            return
+        for record, error in _records(obj):
+            position += 1
+            yield position, record, error
+
+
+class _BoundedReader(io.RawIOBase):
+    """File wrapper that fails a single CBOR item larger than ``limit`` bytes."""
+
+    def __init__(self, stream, limit: int):
+        super().__init__()
+        self.stream = stream
+        self.limit = limit
+        self.item_bytes = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def start_item(self):
+        self.item_bytes = 0
+
+    def read(self, size: int) -> bytes:
+        data = self.stream.read(size)
+        self.item_bytes += len(data)
+        if self.item_bytes > self.limit:
+            raise ValueError("record too large")
+        return data
@@ -0,0 +1,277 @@
+"""Resumable chunked uploads for large or flaky image transfers.
+
+An upload is opened with ``init_upload``, receives numbered parts (in any
+order, possibly concurrently) and is assembled by ``commit``. Every part is
+streamed straight to disk while its SHA-256 is computed, so memory use per
+connection stays constant and a client only has to resend the parts that
+were lost. Uploads that are never committed are removed by
+``cleanup_abandoned``.
+
+Usage (cleanup job, e.g. from cron):
+    PYTHONPATH=src python -m ingestion.chunked_upload --cleanup
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from werkzeug.utils import secure_filename
+
+from ingestion.config import (
+    MAX_PART_BYTES,
+    MAX_UPLOAD_BYTES,
+    UPLOAD_DIR,
+    UPLOAD_STAGING_DIR,
+    UPLOAD_STALE_SECONDS,
+)
+
+COPY_BUFFER_SIZE = 64 * 1024
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+# Staging directories cleanup may remove: uploads and claims left by a crashed commit
+_STAGED = re.compile(r"^[0-9a-f]{32}(\.committing)?$")
+
+
+class UploadError(Exception):
+    """Raised for a rejected upload operation, carrying the HTTP status to return."""
+
+    def __init__(self, message, status=400):
+        """Store the error message and HTTP status."""
+        super().__init__(message)
+        self.status = status
+
+
+class ChunkedUploadManager:
+    """Stages upload parts on disk and assembles them on commit."""
+
+    def __init__(
+        self,
+        staging_dir=UPLOAD_STAGING_DIR,
+        upload_dir=UPLOAD_DIR,
+        max_upload_bytes=MAX_UPLOAD_BYTES,
+        max_part_bytes=MAX_PART_BYTES,
+        stale_after=UPLOAD_STALE_SECONDS,
+    ):
+        """Configure directories and size limits.
+
+        Args:
+            staging_dir (str | Path): Where in-progress uploads keep their parts.
+            upload_dir (str | Path): Where committed files are placed.
+            max_upload_bytes (int): Largest accepted assembled file.
+            max_part_bytes (int): Largest accepted single part.
+            stale_after (float): Seconds without activity before an upload is abandoned.
+        """
+        self.staging_dir = Path(staging_dir)
+        self.upload_dir = Path(upload_dir)
+        self.max_upload_bytes = max_upload_bytes
+        self.max_part_bytes = max_part_bytes
+        self.stale_after = stale_after
+
+    def _upload_path(self, upload_id: str) -> Path:
+        """Return the staging directory of an upload, rejecting unknown IDs."""
+        path = self.staging_dir / upload_id
+        if not _UPLOAD_ID.match(upload_id) or not path.is_dir():
+            raise UploadError("unknown upload", status=404)
+        return path
+
+    def _manifest(self, path: Path) -> dict:
+        """Load the manifest written by ``init_upload``."""
+        return json.loads((path / "manifest.json").read_text())
+
+    def _parts(self, path: Path) -> dict:
+        """Map part number to size for every completely received part."""
+        return {
+            int(part.name.split("-")[1]): part.stat().st_size
+            for part in path.glob("part-*")
+            if not part.name.endswith(".tmp")
+        }
+
+    def init_upload(self, filename: str, metadata: dict, total_size=None, sha256=None):
+        """Open a new upload.
+
+        Args:
+            filename (str): Client file name; sanitized before use.
+            metadata (dict): Sensor metadata (e.g. ``sensor_id``, ``timestamp``).
+            total_size (int, optional): Announced size of the whole file.
+            sha256 (str, optional): Expected hex digest of the whole file.
+
+        Returns:
+            str: The new upload ID.
+
+        Raises:
+            UploadError: If ``total_size`` is not a non-negative integer or
+                exceeds the limit, or ``sha256`` is not a string.
+        """
+        if total_size is not None and (
+            not isinstance(total_size, int)
+            or isinstance(total_size, bool)
+            or total_size < 0
+        ):
+            raise UploadError("'total_size' must be a non-negative integer")
+        if sha256 is not None and not isinstance(sha256, str):
+            raise UploadError("'sha256' must be a hex string")
+        if total_size is not None and total_size > self.max_upload_bytes:
+            raise UploadError("upload exceeds maximum size", status=413)
+        upload_id = uuid.uuid4().hex
+        path = self.staging_dir / upload_id
+        path.mkdir(parents=True)
+        manifest = {
+            "filename": secure_filename(filename),
+            "metadata": metadata,
+            "total_size": total_size,
+            "sha256": sha256,
+            "created": time.time(),
+        }
+        (path / "manifest.json").write_text(json.dumps(manifest))
+        return upload_id
+
+    def write_part(self, upload_id: str, part_number: int, stream, sha256=None):
+        """Stream one part to disk, hashing it as it is written.
+
+        Re-sending a part replaces the earlier copy.
+
+        Args:
+            upload_id (str): Upload returned by ``init_upload``.
+            part_number (int): 1-based part index.
+            stream: Binary file-like object holding the part body.
+            sha256 (str, optional): Expected hex digest of this part.
+
+        Returns:
+            dict: Part number, size and SHA-256 digest.
+        """
+        path = self._upload_path(upload_id)
+        if part_number < 1:
+            raise UploadError("part numbers start at 1")
+        received = sum(
+            size for number, size in self._parts(path).items() if number != part_number
+        )
+        budget = min(self.max_part_bytes, self.max_upload_bytes - received)
+
+        digest = hashlib.sha256()
+        size = 0
+        part_path = path / f"part-{part_number:06d}"
+        tmp_path = path / f"part-{part_number:06d}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as part_file:
+                while chunk := stream.read(COPY_BUFFER_SIZE):
+                    size += len(chunk)
+                    if size > budget:
+                        raise UploadError("part exceeds maximum size", status=413)
+                    digest.update(chunk)
+                    part_file.write(chunk)
+            if sha256 is not None and digest.hexdigest() != sha256.lower():
+                raise UploadError("part checksum mismatch")
+            os.replace(tmp_path, part_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        os.utime(path)
+        return {"part": part_number, "size": size, "sha256": digest.hexdigest()}
+
+    def status(self, upload_id: str) -> dict:
+        """Report which parts of an upload have been received."""
+        path = self._upload_path(upload_id)
+        parts = self._parts(path)
+        return {
+            "upload_id": upload_id,
+            "parts": sorted(parts),
+            "received_bytes": sum(parts.values()),
+        }
+
+    def commit(self, upload_id: str, part_count: int, sha256=None) -> dict:
+        """Assemble parts ``1..part_count`` into the final file.
+
+        Args:
+            upload_id (str): Upload returned by ``init_upload``.
+            part_count (int): Number of parts the client sent.
+            sha256 (str, optional): Expected digest; overrides the one given at init.
+
+        Returns:
+            dict: Final file name, size, SHA-256 digest and the upload metadata.
+        """
+        path = self._upload_path(upload_id)
+        parts = self._parts(path)
+        missing = sorted(set(range(1, part_count + 1)) - set(parts))
+        if missing:
+            raise UploadError(f"missing parts: {missing}", status=409)
+        if (
+            sum(parts[number] for number in range(1, part_count + 1))
+            > self.max_upload_bytes
+        ):
+            raise UploadError("upload exceeds maximum size", status=413)
+
+        # Claim the upload so concurrent commits or cleanup cannot touch it
+        claimed = path.with_name(f"{upload_id}.committing")
+        try:
+            path.rename(claimed)
+        except OSError:
+            raise UploadError("upload is already being committed", status=409)
+
+        assembled = claimed / "assembled"
+        try:
+            manifest = self._manifest(claimed)
+            expected = (sha256 or manifest["sha256"] or "").lower() or None
+            digest = hashlib.sha256()
+            self.upload_dir.mkdir(parents=True, exist_ok=True)
+            with open(assembled, "wb") as out:
+                for number in range(1, part_count + 1):
+                    with open(claimed / f"part-{number:06d}", "rb") as part_file:
+                        while chunk := part_file.read(COPY_BUFFER_SIZE):
+                            digest.update(chunk)
+                            out.write(chunk)
+                size = out.tell()
+
+            if expected is not None and digest.hexdigest() != expected:
+                raise UploadError("file checksum mismatch")
+
+            filename = f"{upload_id}_{manifest['filename']}"
+            os.replace(assembled, self.upload_dir / filename)
+        except Exception:
+            # Release the claim so the client can retry the commit
+            assembled.unlink(missing_ok=True)
+            claimed.rename(path)
+            raise
+        shutil.rmtree(claimed)
+        return {
+            "filename": filename,
+            "size": size,
+            "sha256": digest.hexdigest(),
+            "metadata": manifest["metadata"],
+        }
+
+    def cleanup_abandoned(self, now=None) -> int:
+        """Delete uploads with no activity for ``stale_after`` seconds.
+
+        Also removes the claimed ``<id>.committing`` directory of a commit
+        whose process died before finishing it.
+
+        Returns:
+            int: Number of uploads removed.
+        """
+        if not self.staging_dir.is_dir():
+            return 0
+        now = time.time() if now is None else now
+        removed = 0
+        for path in self.staging_dir.iterdir():
+            if (
+                _STAGED.match(path.name)
+                and now - path.stat().st_mtime > self.stale_after
+            ):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chunked upload maintenance")
+    parser.add_argument(
+        "--cleanup", action="store_true", help="remove abandoned uploads"
+    )
+    args = parser.parse_args()
+    if args.cleanup:
+        print(f"Removed {ChunkedUploadManager().cleanup_abandoned()} abandoned uploads")
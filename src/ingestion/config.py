@@ -1,8 +1,80 @@
 """Configuration settings for the ingestion pipeline.
 
 Defines upload and logging paths, along with allowed file extensions.
+MongoDB write batching can be tuned through environment variables.
 """
 
+import os
+
 UPLOAD_DIR = "storage/images_raw"
 LOG_FILE = "logs/system.log"
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "json"}
+
+# Buffered bulk inserts for sensor documents (see database.bulk_writer)
+MONGO_BULK_WRITE = os.getenv("MONGO_BULK_WRITE", "0") == "1"
+MONGO_BULK_BATCH_SIZE = int(os.getenv("MONGO_BULK_BATCH_SIZE", "500"))
+MONGO_BULK_MAX_AGE = float(os.getenv("MONGO_BULK_MAX_AGE", "0.25"))
+
+# Write profile of the ingest database handle (see database.clients); empty for
+# the server defaults. Pool sizes and timeouts are read there from MONGO_* too.
+MONGO_WRITE_PROFILE = os.getenv("MONGO_WRITE_PROFILE", "durable") or None
+
+# Bulk ingest endpoint (/ingest/bulk): records per insert_many and per-record size cap
+BULK_INGEST_BATCH_SIZE = int(os.getenv("BULK_INGEST_BATCH_SIZE", "500"))
+BULK_INGEST_MAX_RECORD_BYTES = 1024 * 1024
+# Whole-body cap for binary struct frames (see ingestion.binary_codec)
+BULK_INGEST_MAX_FRAME_BYTES = int(
+    os.getenv("BULK_INGEST_MAX_FRAME_BYTES", str(8 * 1024 * 1024))
+)
+
+# Asyncio ingestion server (ingestion.async_app)
+ASYNC_QUEUE_SIZE = int(os.getenv("ASYNC_QUEUE_SIZE", "10000"))
+ASYNC_BATCH_SIZE = int(os.getenv("ASYNC_BATCH_SIZE", "500"))
+ASYNC_BATCH_WAIT = float(os.getenv("ASYNC_BATCH_WAIT", "0.05"))
+ASYNC_CONSUMERS = int(os.getenv("ASYNC_CONSUMERS", "4"))
+ASYNC_RETRY_AFTER = int(os.getenv("ASYNC_RETRY_AFTER", "1"))
+# Worker processes validating and writing batches; 0 uses threads in one process
+ASYNC_PROCESSES = int(os.getenv("ASYNC_PROCESSES", "0"))
+
+# Chunked, resumable uploads (ingestion.chunked_upload)
+UPLOAD_STAGING_DIR = "storage/uploads_staging"
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+MAX_PART_BYTES = int(os.getenv("MAX_PART_BYTES", str(1024 * 1024)))
+UPLOAD_STALE_SECONDS = int(os.getenv("UPLOAD_STALE_SECONDS", "3600"))
+
+# Background processing of uploaded images (ingestion.image_jobs, ingestion.image_pipeline)
+IMAGE_JOB_DIR = os.getenv("IMAGE_JOB_DIR", "storage/image_jobs")
+# Worker processes of the image pipeline process; 0 decodes in its dispatcher thread
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+IMAGE_MAX_ATTEMPTS = int(os.getenv("IMAGE_MAX_ATTEMPTS", "5"))
+IMAGE_THUMBNAIL_SIZE = int(os.getenv("IMAGE_THUMBNAIL_SIZE", "256"))
+IMAGE_ARCHIVE_FORMAT = os.getenv("IMAGE_ARCHIVE_FORMAT", "WEBP")
+IMAGE_ARCHIVE_QUALITY = int(os.getenv("IMAGE_ARCHIVE_QUALITY", "90"))
+
+# Update hourly/daily rollups as readings are inserted (see database.rollups)
+MONGO_ROLLUPS = os.getenv("MONGO_ROLLUPS", "0") == "1"
+# Create collections and indexes (WeatherDB.ensure_schema) during the app's warm-up
+MONGO_ENSURE_SCHEMA = os.getenv("MONGO_ENSURE_SCHEMA", "1") == "1"
+# Store sensor_data as a MongoDB time-series collection (see WeatherDB.ensure_schema)
+MONGO_TIMESERIES = os.getenv("MONGO_TIMESERIES", "0") == "1"
+MONGO_TIMESERIES_GRANULARITY = os.getenv("MONGO_TIMESERIES_GRANULARITY", "seconds")
+
+# Per-process cache of each sensor's latest reading (see WeatherDB.get_latest_reading)
+LATEST_CACHE_SIZE = int(os.getenv("LATEST_CACHE_SIZE", "1024"))
+LATEST_CACHE_TTL = float(os.getenv("LATEST_CACHE_TTL", "60"))
+
+# Structured JSON logging to LOG_FILE (see observability.structured_logging)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")  # e.g. "transform.clean_sensor=WARNING"
+LOG_SAMPLE = os.getenv("LOG_SAMPLE", "")  # e.g. "ingestion.app.records=100"
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Local write-ahead spool for sensor inserts; empty disables it (see database.spool).
+# One process per directory: give each server worker process its own.
+MONGO_SPOOL_DIR = os.getenv("MONGO_SPOOL_DIR", "")
+
+# In-memory filter of recently stored reading keys (see database.dedupe); 0 disables
+DEDUPE_FILTER_SIZE = int(os.getenv("DEDUPE_FILTER_SIZE", "100000"))
+DEDUPE_ERROR_RATE = float(os.getenv("DEDUPE_ERROR_RATE", "1e-6"))
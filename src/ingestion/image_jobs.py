@@ -0,0 +1,185 @@
+"""Persistent queue of image processing jobs for uploaded frames.
+
+Upload routes only save the raw file and enqueue a job here, so their latency
+never depends on decoding the image; ``ingestion.image_pipeline`` works the
+queue off in the background.
+
+Every job is a small JSON file, written to a temporary name, fsynced and
+renamed into place. Its state is the directory it sits in:
+
+- ``pending/``: waiting. File names start with the time (ns) the job becomes
+  due, so a sorted listing is the processing order and retried jobs wait out
+  their backoff.
+- ``running/``: claimed by a worker (an atomic rename, so one claim wins).
+  ``recover()`` moves jobs left here by a crashed pipeline back to pending.
+- ``failed/``: gave up after ``max_attempts`` or on an unreadable image.
+
+A finished job's file is deleted. Jobs are delivered at least once.
+"""
+
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+
+from ingestion.config import IMAGE_JOB_DIR, IMAGE_MAX_ATTEMPTS
+
+logger = logging.getLogger(__name__)
+
+STATES = ("pending", "running", "failed")
+
+
+def new_job_id() -> str:
+    """Return a fresh job ID (also used to name the raw file uniquely)."""
+    return uuid.uuid4().hex
+
+
+class ImageJobQueue:
+    """Directory-backed queue of image jobs with retries and backoff."""
+
+    def __init__(
+        self,
+        directory=IMAGE_JOB_DIR,
+        max_attempts=IMAGE_MAX_ATTEMPTS,
+        retry_delay=2.0,
+        max_retry_delay=300.0,
+    ):
+        """Configure the queue; directories are created on first use.
+
+        Args:
+            directory (str | Path): Root of the pending/running/failed directories.
+            max_attempts (int): Attempts before a job is moved to ``failed/``.
+            retry_delay (float): Seconds before the first retry; doubles per attempt.
+            max_retry_delay (float): Longest wait between attempts.
+        """
+        self.directory = Path(directory)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+    def _dir(self, state: str) -> Path:
+        path = self.directory / state
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _write(self, state: str, name: str, job: dict):
+        """Durably write a job file into a state directory."""
+        directory = self._dir(state)
+        tmp_path = directory / f".{name}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as job_file:
+            json.dump(job, job_file)
+            job_file.flush()
+            os.fsync(job_file.fileno())
+        os.replace(tmp_path, directory / name)
+
+    def enqueue(self, path, metadata: dict, job_id=None) -> str:
+        """Queue an uploaded image for processing.
+
+        Args:
+            path (str | Path): Raw image file.
+            metadata (dict): Upload metadata (sensor_id, timestamp, ...).
+            job_id (str, optional): Job ID to use; see ``new_job_id()``.
+
+        Returns:
+            str: Job ID.
+        """
+        job_id = job_id or new_job_id()
+        job = {
+            "id": job_id,
+            "path": str(path),
+            "metadata": metadata,
+            "attempts": 0,
+            "enqueued_at": time.time(),
+        }
+        self._write("pending", f"{time.time_ns():020d}-{job_id}.json", job)
+        return job_id
+
+    def claim(self, limit: int) -> list:
+        """Move up to ``limit`` due jobs to ``running/`` and return them.
+
+        Each returned job dict carries its file name under ``"_name"``.
+        """
+        pending = self._dir("pending")
+        running = self._dir("running")
+        now = time.time_ns()
+        jobs = []
+        for name in sorted(os.listdir(pending)):
+            if len(jobs) >= limit:
+                break
+            if not name.endswith(".json") or name.startswith("."):
+                continue
+            if int(name.split("-", 1)[0]) > now:
+                break  # later names are due even later
+            try:
+                os.replace(pending / name, running / name)
+            except FileNotFoundError:
+                continue  # claimed by another worker
+            with open(running / name, encoding="utf-8") as job_file:
+                job = json.load(job_file)
+            job["_name"] = name
+            jobs.append(job)
+        return jobs
+
+    def complete(self, job: dict):
+        """Remove a finished job."""
+        (self._dir("running") / job["_name"]).unlink(missing_ok=True)
+
+    def fail(self, job: dict, error, permanent=False) -> bool:
+        """Record a failed attempt; retry later or give up.
+
+        Args:
+            job (dict): Job returned by ``claim``.
+            error (Exception | str): What went wrong.
+            permanent (bool): Give up now (the image can never be processed).
+
+        Returns:
+            bool: True if the job will be retried.
+        """
+        name = job.pop("_name")
+        job["attempts"] += 1
+        job["error"] = str(error)
+        retry = not permanent and job["attempts"] < self.max_attempts
+        if retry:
+            delay = min(
+                self.max_retry_delay, self.retry_delay * 2 ** (job["attempts"] - 1)
+            )
+            due = time.time_ns() + int(delay * 1e9)
+            self._write("pending", f"{due:020d}-{job['id']}.json", job)
+        else:
+            self._write("failed", name, job)
+            logger.error(
+                "Image job failed permanently",
+                extra={
+                    "data": {"job": job["id"], "path": job["path"], "error": str(error)}
+                },
+            )
+        (self._dir("running") / name).unlink(missing_ok=True)
+        return retry
+
+    def recover(self) -> int:
+        """Return jobs left in ``running/`` by a stopped pipeline to ``pending/``.
+
+        Only call this while no pipeline is working the queue.
+
+        Returns:
+            int: Jobs recovered.
+        """
+        running = self._dir("running")
+        pending = self._dir("pending")
+        names = [name for name in os.listdir(running) if name.endswith(".json")]
+        for name in names:
+            os.replace(running / name, pending / name)
+        return len(names)
+
+    def counts(self) -> dict:
+        """Return the number of jobs in each state."""
+        return {
+            state: sum(
+                1
+                for name in os.listdir(self._dir(state))
+                if name.endswith(".json") and not name.startswith(".")
+            )
+            for state in STATES
+        }
@@ -0,0 +1,377 @@
+"""Background processing of uploaded images.
+
+Works off the ``ImageJobQueue`` that the upload routes fill. Each frame is
+decoded once in a worker process, which produces:
+
+- a JPEG thumbnail (longest side ``IMAGE_THUMBNAIL_SIZE``),
+- a recompressed archival copy (WebP at ``IMAGE_ARCHIVE_QUALITY`` by default),
+- metadata: format, dimensions, mode, SHA-256 of the raw file and the EXIF
+  capture time.
+
+Thumbnail and archive go to the content-addressed ``BlobStore``; the metadata
+document is written with ``WeatherDB.insert_cloud_image_metadata`` under the
+job ID, so a job retried after its insert (at-least-once delivery) is
+recognised as done. At most ``max_in_flight`` jobs are claimed at a time, so
+a backlog waits on disk rather than in memory.
+
+The ingestion app only enqueues. Run exactly one pipeline process per job
+directory: on start it requeues the jobs left in ``running/``, which would
+include the jobs of any other pipeline working the same queue.
+
+Usage:
+    PYTHONPATH=src python -m ingestion.image_pipeline [--processes N] [--once]
+"""
+
+import argparse
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+from database.blob_store import BlobStore
+from ingestion.config import (
+    IMAGE_ARCHIVE_FORMAT,
+    IMAGE_ARCHIVE_QUALITY,
+    IMAGE_THUMBNAIL_SIZE,
+    IMAGE_WORKERS,
+)
+from ingestion.image_jobs import ImageJobQueue
+from observability import metrics
+
+logger = logging.getLogger(__name__)
+
+EXIF_IFD = 0x8769
+EXIF_DATETIME_ORIGINAL = 0x9003
+EXIF_DATETIME = 0x0132
+
+
+class InvalidImage(ValueError):
+    """Raised for a file that can never be processed (missing, not an image, too large)."""
+
+
+def _capture_time(exif):
+    """Return the EXIF capture time (camera local time, naive), or None."""
+    value = exif.get_ifd(EXIF_IFD).get(EXIF_DATETIME_ORIGINAL) or exif.get(
+        EXIF_DATETIME
+    )
+    try:
+        return datetime.strptime(str(value).strip("\x00 "), "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+def _upload_timestamp(value):
+    """Parse an ISO upload timestamp like ``_prepare_sensor_document``; keep others."""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _encode(image, image_format: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def process_image(
+    path,
+    blob_store: BlobStore,
+    thumbnail_size=IMAGE_THUMBNAIL_SIZE,
+    archive_format=IMAGE_ARCHIVE_FORMAT,
+    archive_quality=IMAGE_ARCHIVE_QUALITY,
+) -> dict:
+    """Decode an image once and store its thumbnail and archival copy.
+
+    Args:
+        path (str): Raw image file.
+        blob_store (BlobStore): Receives the thumbnail and archive.
+        thumbnail_size (int): Longest side of the thumbnail in pixels.
+        archive_format (str): Pillow format of the archival copy.
+        archive_quality (int): Encoder quality of the archival copy.
+
+    Returns:
+        dict: ``image`` (raw file facts), ``thumbnail`` and ``archive`` (blob
+        references) and ``captured_at``.
+
+    Raises:
+        InvalidImage: If the file is missing or cannot be decoded as an image.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    with metrics.stage("image_process", invalid=InvalidImage):
+        try:
+            with open(path, "rb") as raw_file:
+                raw = raw_file.read()
+            image = Image.open(io.BytesIO(raw))
+            image.load()
+        except (
+            FileNotFoundError,
+            UnidentifiedImageError,
+            Image.DecompressionBombError,
+        ) as exc:
+            raise InvalidImage(f"{os.path.basename(path)}: {exc}") from None
+
+        info = {
+            "format": (image.format or "").lower(),
+            "width": image.width,
+            "height": image.height,
+            "mode": image.mode,
+            "sha256": hashlib.sha256(raw).hexdigest(),
+            "size_bytes": len(raw),
+        }
+        captured_at = _capture_time(image.getexif())
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        outputs = {}
+        thumbnail = image.convert("RGB")
+        thumbnail.thumbnail((thumbnail_size, thumbnail_size))
+        archive_options = {"quality": archive_quality}
+        if archive_format.upper() == "JPEG":
+            image = image.convert("RGB")
+            archive_options["optimize"] = True
+        for name, encoded, variant in (
+            ("thumbnail", _encode(thumbnail, "JPEG", quality=85), thumbnail),
+            ("archive", _encode(image, archive_format, **archive_options), image),
+        ):
+            sha256, size = blob_store.put(encoded)
+            outputs[name] = {
+                "sha256": sha256,
+                "size_bytes": size,
+                "format": ("jpeg" if name == "thumbnail" else archive_format.lower()),
+                "width": variant.width,
+                "height": variant.height,
+            }
+    return {"image": info, "captured_at": captured_at, **outputs}
+
+
+# Per-worker-process state, set by _init_worker
+_worker_blob_store = None
+_worker_options = None
+
+
+def _init_worker(blob_root, options: dict):
+    """Set up a worker process: its blob store, encoder options and stage capture."""
+    global _worker_blob_store, _worker_options
+    # Ctrl-C reaches the whole process group; the parent drains and stops us
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_blob_store = BlobStore(blob_root)
+    _worker_options = options
+    metrics.capture_stages()
+
+
+def _process_in_worker(path: str) -> tuple:
+    """Process an image in a worker process and return its stage timings too."""
+    result = process_image(path, _worker_blob_store, **_worker_options)
+    return result, metrics.take_captured_stages()
+
+
+class ImagePipeline:
+    """Dispatches queued image jobs to a bounded pool of worker processes.
+
+    Attributes:
+        stats (dict): Jobs processed, retried and failed (given up on).
+    """
+
+    def __init__(
+        self,
+        queue: ImageJobQueue,
+        weather_db,
+        blob_store=None,
+        processes=IMAGE_WORKERS,
+        max_in_flight=None,
+        poll_interval=0.5,
+        options=None,
+    ):
+        """Configure the pipeline; call ``start()`` or ``run_until_idle()``.
+
+        Args:
+            queue (ImageJobQueue): Jobs to work off.
+            weather_db (WeatherDB): Receives the image metadata documents.
+            blob_store (BlobStore, optional): Receives thumbnails and archives;
+                the WeatherDB's blob store or the default store if None.
+            processes (int): Worker processes; 0 decodes in the dispatching thread.
+            max_in_flight (int, optional): Jobs claimed but not finished at
+                once; twice the worker count by default.
+            poll_interval (float): Seconds between polls of an empty queue.
+            options (dict, optional): ``process_image`` encoder options.
+        """
+        self.queue = queue
+        self.weather_db = weather_db
+        self.blob_store = blob_store or weather_db.blob_store or BlobStore()
+        self.processes = processes
+        self.max_in_flight = max_in_flight or max(1, 2 * processes)
+        self.poll_interval = poll_interval
+        self.options = options or {}
+        self.stats = dict.fromkeys(("processed", "retried", "failed"), 0)
+        self._in_flight = {}
+        self._executor = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _start_executor(self):
+        if self.processes > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(str(self.blob_store.root), self.options),
+            )
+
+    def _submit(self, job: dict):
+        if self._executor is not None:
+            future = self._executor.submit(_process_in_worker, job["path"])
+        else:
+            future = Future()
+            try:
+                future.set_result(
+                    (process_image(job["path"], self.blob_store, **self.options), [])
+                )
+            except Exception as exc:
+                future.set_exception(exc)
+        # Remember the pool, so only a failure of the current one restarts it
+        self._in_flight[future] = (job, self._executor)
+
+    def _finish(self, job: dict, future: Future, executor):
+        """Store a finished job's metadata, or schedule its retry."""
+        try:
+            result, stages = future.result()
+            metrics.observe_stages(stages)
+            upload = job["metadata"]
+            document = {
+                "_id": job["id"],
+                "sensor_id": upload.get("sensor_id"),
+                "timestamp": _upload_timestamp(upload.get("timestamp")),
+                "filename": os.path.basename(job["path"]),
+                "upload": upload,
+                **result,
+                "processed_at": datetime.now(timezone.utc),
+            }
+            try:
+                self.weather_db.insert_cloud_image_metadata(document)
+            except DuplicateKeyError:
+                pass  # stored by an earlier attempt of this job
+        except Exception as exc:
+            if isinstance(exc, BrokenProcessPool) and executor is self._executor:
+                logger.error("Image worker process died; restarting the pool")
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._start_executor()
+            retried = self.queue.fail(job, exc, permanent=isinstance(exc, InvalidImage))
+            outcome = "retried" if retried else "failed"
+            self.stats[outcome] += 1
+            metrics.RECORDS.labels("image_pipeline", outcome).inc()
+            logger.warning(
+                "Image job failed",
+                extra={
+                    "data": {"job": job["id"], "error": str(exc), "outcome": outcome}
+                },
+            )
+            return
+        self.queue.complete(job)
+        self.stats["processed"] += 1
+        metrics.RECORDS.labels("image_pipeline", "processed").inc()
+        logger.info(
+            "Image processed",
+            extra={"data": {"job": job["id"], "filename": document["filename"]}},
+        )
+
+    def step(self, timeout) -> bool:
+        """Claim due jobs up to the in-flight limit and finish completed ones.
+
+        Args:
+            timeout (float | None): Longest wait for a job to complete.
+
+        Returns:
+            bool: False if there was nothing to do.
+        """
+        free = self.max_in_flight - len(self._in_flight)
+        if free > 0:
+            for job in self.queue.claim(free):
+                self._submit(job)
+        if not self._in_flight:
+            return False
+        done, _ = wait(
+            list(self._in_flight), timeout=timeout, return_when=FIRST_COMPLETED
+        )
+        for future in done:
+            job, executor = self._in_flight.pop(future)
+            self._finish(job, future, executor)
+        return True
+
+    def run_until_idle(self) -> dict:
+        """Process every due job, then return ``stats`` (for batch runs and tests)."""
+        self.queue.recover()
+        self._start_executor()
+        try:
+            while self.step(None):
+                pass
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        return self.stats
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self.step(self.poll_interval):
+                self._stop.wait(self.poll_interval)
+        while self._in_flight:
+            self.step(None)
+
+    def start(self):
+        """Requeue jobs interrupted by a previous run and start the dispatcher thread."""
+        recovered = self.queue.recover()
+        if recovered:
+            logger.info(
+                "Requeued interrupted image jobs", extra={"data": {"jobs": recovered}}
+            )
+        self._start_executor()
+        self._thread = threading.Thread(
+            target=self._run, name="image-pipeline", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Finish the jobs in flight, then stop the dispatcher and the workers."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+if __name__ == "__main__":
+    from database.mongo_ops import WeatherDB
+    from observability.structured_logging import configure_logging
+
+    parser = argparse.ArgumentParser(description="Process queued image uploads.")
+    parser.add_argument("--processes", type=int, default=IMAGE_WORKERS)
+    parser.add_argument(
+        "--once", action="store_true", help="exit when the queue is empty"
+    )
+    args = parser.parse_args()
+
+    configure_logging()
+    pipeline = ImagePipeline(
+        ImageJobQueue(), WeatherDB(blob_store=BlobStore()), processes=args.processes
+    )
+    if args.once:
+        print(pipeline.run_until_idle())
+    else:
+        pipeline.start()
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pipeline.stop()
@@ -0,0 +1,176 @@
+"""Incremental parsers for bulk sensor uploads.
+
+Reads NDJSON or JSON-array request bodies from a binary stream in fixed-size
+chunks and yields one record at a time, so a gateway can post thousands of
+readings without the whole body being held in memory.
+
+Each parser yields ``(line, record, error)`` tuples. ``line`` is the 1-based
+line number (NDJSON) or array position (JSON array); exactly one of ``record``
+and ``error`` is None.
+"""
+
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+MAX_RECORD_BYTES = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+# RFC 7464 (application/json-seq) record separator
+RECORD_SEPARATOR = b"\x1e"
+# Longest token prefix a decode error can stop in ("-Infinit"); an error further
+# from the end of the buffer cannot be cured by reading more
+_MAX_PARTIAL_TOKEN = len("-Infinity") - 1
+
+
+def _parse_line(line_no, raw_line):
+    """Decode one NDJSON line into a ``(line, record, error)`` tuple."""
+    try:
+        record = json.loads(raw_line)
+    except ValueError as exc:
+        return line_no, None, f"invalid JSON: {exc}"
+    if not isinstance(record, dict):
+        return line_no, None, "expected a JSON object"
+    return line_no, record, None
+
+
+def iter_ndjson(
+    stream, chunk_size=CHUNK_SIZE, max_record_bytes=MAX_RECORD_BYTES, json_seq=False
+):
+    """Yield records from a newline-delimited JSON stream.
+
+    Blank lines are skipped but still counted. A line longer than
+    ``max_record_bytes`` is rejected and skipped without being buffered.
+
+    Args:
+        stream: Binary file-like object with a ``read(size)`` method.
+        chunk_size (int): Bytes read per call.
+        max_record_bytes (int): Longest accepted line.
+        json_seq (bool): Lines are RFC 7464 JSON text sequence records,
+            each prefixed with the ``RECORD_SEPARATOR`` byte.
+
+    Yields:
+        tuple: ``(line, record, error)`` for every non-blank line.
+    """
+    buffer = b""
+    line_no = 0
+    oversized = False
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for raw_line in lines:
+            line_no += 1
+            if json_seq:
+                raw_line = raw_line.lstrip(RECORD_SEPARATOR)
+            if oversized:
+                oversized = False
+                yield line_no, None, "record too large"
+            elif raw_line.strip():
+                yield _parse_line(line_no, raw_line)
+        if len(buffer) > max_record_bytes:
+            oversized = True
+            buffer = b""
+    if json_seq:
+        buffer = buffer.lstrip(RECORD_SEPARATOR)
+    if oversized:
+        yield line_no + 1, None, "record too large"
+    elif buffer.strip():
+        yield _parse_line(line_no + 1, buffer)
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE, max_record_bytes=MAX_RECORD_BYTES):
+    """Yield the elements of a top-level JSON array as they are read.
+
+    Only the unparsed tail of the body is buffered. A syntax error breaks the
+    array framing, so it is reported once, as soon as it is read, and parsing
+    stops. An element cut off by the end of the buffer is decoded again once
+    the buffer has doubled, so large elements are parsed in linear time.
+
+    Args:
+        stream: Binary file-like object with a ``read(size)`` method.
+        chunk_size (int): Bytes read per call.
+        max_record_bytes (int): Largest accepted array element.
+
+    Yields:
+        tuple: ``(position, record, error)`` for every array element.
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    eof = False
+    started = False
+    expect_separator = False
+    position = 0
+
+    def fill():
+        nonlocal buffer, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            buffer += text_decoder.decode(b"", final=True)
+        else:
+            buffer += text_decoder.decode(chunk)
+
+    while True:
+        buffer = buffer.lstrip(_WHITESPACE)
+        if not buffer:
+            if eof:
+                if started:
+                    yield position + 1, None, "unterminated JSON array"
+                return
+            fill()
+            continue
+
+        if not started:
+            if buffer[0] != "[":
+                yield 1, None, "expected a JSON array"
+                return
+            started = True
+            buffer = buffer[1:]
+            continue
+
+        if expect_separator:
+            if buffer[0] == "]":
+                return
+            if buffer[0] != ",":
+                yield position + 1, None, "expected ',' or ']' in JSON array"
+                return
+            expect_separator = False
+            buffer = buffer[1:]
+            continue
+        if buffer[0] == "]" and position == 0:
+            return
+
+        try:
+            record, end = _decoder.raw_decode(buffer)
+        except json.JSONDecodeError as exc:
+            truncated = (
+                exc.msg.startswith("Unterminated string")
+                or len(buffer) - exc.pos <= _MAX_PARTIAL_TOKEN
+            )
+            if eof or not truncated:
+                yield position + 1, None, f"invalid JSON: {exc}"
+                return
+            if len(buffer) > max_record_bytes:
+                yield position + 1, None, "record too large"
+                return
+            wanted = min(2 * len(buffer), max_record_bytes + 1)
+            while not eof and len(buffer) < wanted:
+                fill()
+            continue
+        if end == len(buffer) and not eof:
+            # A scalar may continue in the next chunk; re-parse once more is read
+            fill()
+            continue
+
+        position += 1
+        expect_separator = True
+        buffer = buffer[end:]
+        if isinstance(record, dict):
+            yield position, record, None
+        else:
+            yield position, None, "expected a JSON object"
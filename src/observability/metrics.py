@@ -0,0 +1,297 @@
+"""In-process counters and latency histograms in Prometheus text format.
+
+A small, dependency-free subset of the Prometheus client model: metrics are
+registered once at import time, label sets resolve to children that are
+cached, and ``render()`` produces the text exposition format (version 0.0.4)
+served at ``/metrics``. Recording an observation costs one dict lookup, a
+bisect over the bucket bounds and a short critical section, so the ingest
+stages can stay instrumented in production (see
+``benchmarks/bench_metrics.py``).
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+# Latency buckets in seconds, from 50 us (cleaning one record) to 5 s (slow writes)
+LATENCY_BUCKETS = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    """Render a ``{name="value",...}`` label block."""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class holding the name, help text and labelled children."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        """Define a metric; use ``labels(...)`` to get a child per label set."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Return the child for a label-value tuple, creating it on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        """Return the exposition lines of this metric."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class _CounterChild:
+    """One labelled counter value."""
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        """Add ``amount`` (must not be negative)."""
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. records by outcome."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def _render_child(self, values, child):
+        yield f"{self.name}_total{_format_labels(self.labelnames, values)} {child.value}"
+
+
+class _HistogramChild:
+    """Bucket counts, sum and count of one labelled histogram."""
+
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Record one observation."""
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets, e.g. latencies."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        """Define a histogram with sorted upper bucket bounds (``+Inf`` is implicit)."""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def _render_child(self, values, child):
+        with child._lock:
+            counts, total, count = list(child.counts), child.sum, child.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            labels = _format_labels(self.labelnames, values, f'le="{le}"')
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = _format_labels(self.labelnames, values)
+        yield f"{self.name}_sum{labels} {total}"
+        yield f"{self.name}_count{labels} {count}"
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        """Create an empty registry."""
+        self._metrics = {}
+
+    def register(self, metric):
+        """Add a metric and return it; names must be unique."""
+        if metric.name in self._metrics:
+            raise ValueError(f"duplicate metric {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "weather_ingest_stage_seconds",
+        "Latency of one ingest pipeline stage call (a record or a batch).",
+        ("stage", "outcome"),
+    )
+)
+RECORDS = REGISTRY.register(
+    Counter(
+        "weather_ingest_records",
+        "Sensor records handled by an ingest endpoint, by outcome.",
+        ("endpoint", "outcome"),
+    )
+)
+
+# Stage observations kept for shipping to the parent process (worker processes only)
+_captured = None
+
+
+def capture_stages():
+    """Also keep this process's stage observations for ``take_captured_stages``.
+
+    Worker processes have their own registry, which nobody scrapes; they hand
+    their observations back with each result and the parent replays them
+    with ``observe_stages``.
+    """
+    global _captured
+    _captured = []
+
+
+def take_captured_stages() -> list:
+    """Return and clear the ``(stage, outcome, seconds)`` observations kept so far."""
+    global _captured
+    if _captured is None:
+        return []
+    observations, _captured = _captured, []
+    return observations
+
+
+def observe_stages(observations: list):
+    """Record ``(stage, outcome, seconds)`` observations made in another process."""
+    for name, outcome, seconds in observations:
+        STAGE_SECONDS.labels(name, outcome).observe(seconds)
+
+
+class stage:  # noqa: N801 - used like a function: ``with metrics.stage(...)``
+    """Time a pipeline stage into ``weather_ingest_stage_seconds``.
+
+    The outcome label is "ok"; "invalid" if the block raised one of the
+    ``invalid`` exception types; "error" for any other exception; or whatever
+    the block assigned to ``outcome`` on the object bound by ``as``.
+
+    A plain class rather than ``@contextmanager``: it is entered on every
+    record, and avoiding the generator machinery keeps the overhead near 1 us.
+    """
+
+    __slots__ = ("name", "invalid", "outcome", "started")
+
+    def __init__(self, name: str, invalid=()):
+        """Name the stage and the exception types that mean bad input."""
+        self.name = name
+        self.invalid = invalid
+        self.outcome = "ok"
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        elapsed = time.perf_counter() - self.started
+        if exc_type is not None:
+            self.outcome = "invalid" if issubclass(exc_type, self.invalid) else "error"
+        STAGE_SECONDS.labels(self.name, self.outcome).observe(elapsed)
+        if _captured is not None:
+            _captured.append((self.name, self.outcome, elapsed))
+        return False
+
+
+def timed(name: str, invalid=()):
+    """Decorate a function so each call is timed as stage ``name``."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name, invalid):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_iter(name: str, iterable):
+    """Yield from ``iterable``, timing each step as stage ``name``.
+
+    Used for streaming decoders, where parsing happens inside ``next()``.
+    """
+    iterator = iter(iterable)
+    histogram = STAGE_SECONDS.labels(name, "ok")
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        except BaseException:
+            STAGE_SECONDS.labels(name, "error").observe(time.perf_counter() - started)
+            raise
+        histogram.observe(time.perf_counter() - started)
+        yield item
@@ -0,0 +1,228 @@
+"""Non-blocking structured logging to ``LOG_FILE``.
+
+Request threads only put log records on a bounded in-memory queue; a single
+background ``QueueListener`` thread serializes them as JSON lines and writes
+them to a size-rotated file. If the queue is full the record is dropped and
+counted rather than blocking the caller.
+
+High-frequency loggers can be sampled (keep every Nth record) and levels can
+be set per logger, both from ``ingestion.config``:
+
+    LOG_LEVEL=INFO
+    LOG_LEVELS="transform.clean_sensor=WARNING,pymongo=WARNING"
+    LOG_SAMPLE="ingestion.app.records=100"
+
+Call ``configure_logging()`` once at process start; the app factories call
+``ensure_logging()``, which does so unless logging is already set up. Modules
+just use ``logging.getLogger(__name__)`` and pass structured fields via
+``extra``.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+
+from ingestion.config import (
+    LOG_BACKUP_COUNT,
+    LOG_FILE,
+    LOG_LEVEL,
+    LOG_LEVELS,
+    LOG_MAX_BYTES,
+    LOG_QUEUE_SIZE,
+    LOG_SAMPLE,
+)
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None))
+) | {"message", "asctime", "taskName"}
+
+_listener = None
+_configure_lock = threading.Lock()
+
+
+def parse_mapping(spec: str) -> dict:
+    """Parse ``"name=value,name=value"`` into a dict of strings."""
+    mapping = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        mapping[name.strip()] = value.strip()
+    return mapping
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line.
+
+    Standard keys are ``ts`` (UTC ISO 8601), ``level``, ``logger`` and
+    ``message``; ``extra`` fields are added as top-level keys, and an
+    exception, if any, under ``exc``.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Serialize the record; values JSON cannot encode are stringified."""
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps every Nth record of the configured loggers (and their children)."""
+
+    def __init__(self, every: dict):
+        """Map logger name prefixes to N; records of other loggers all pass."""
+        super().__init__()
+        self.every = {name: int(n) for name, n in every.items() if int(n) > 1}
+        self._seen = dict.fromkeys(self.every, 0)
+        self._lock = threading.Lock()
+
+    def _rule(self, name: str):
+        """Return the most specific configured prefix of a logger name."""
+        while name:
+            if name in self.every:
+                return name
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Return True for the records that are kept."""
+        rule = self._rule(record.name) if self.every else None
+        if rule is None:
+            return True
+        with self._lock:
+            self._seen[rule] += 1
+            return self._seen[rule] % self.every[rule] == 1
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: records are dropped when the queue is full.
+
+    Attributes:
+        dropped (int): Records discarded because the queue was full.
+    """
+
+    def __init__(self, log_queue):
+        """Wrap a bounded queue."""
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the message arguments now; JSON formatting happens on the listener."""
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        """Put the record on the queue without waiting."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(
+    log_file=LOG_FILE,
+    level=LOG_LEVEL,
+    levels=LOG_LEVELS,
+    sample=LOG_SAMPLE,
+    max_bytes=LOG_MAX_BYTES,
+    backup_count=LOG_BACKUP_COUNT,
+    queue_size=LOG_QUEUE_SIZE,
+) -> DroppingQueueHandler:
+    """Route the root logger through a background JSON file writer.
+
+    Replaces any handlers on the root logger. Calling it again reconfigures
+    the pipeline; the previous listener is flushed and stopped first.
+
+    Args:
+        log_file (str): File the JSON lines are written to.
+        level (str): Root log level.
+        levels (str | dict): Per-logger levels, ``"name=LEVEL,..."`` or a dict.
+        sample (str | dict): Per-logger sampling, ``"name=N,..."`` (keep every Nth).
+        max_bytes (int): Size at which the file is rotated.
+        backup_count (int): Rotated files kept.
+        queue_size (int): Records buffered before new ones are dropped.
+
+    Returns:
+        DroppingQueueHandler: The handler installed on the root logger.
+    """
+    global _listener
+    shutdown_logging()
+
+    if os.path.dirname(log_file):
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    file_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    handler = DroppingQueueHandler(log_queue)
+    if isinstance(sample, str):
+        sample = parse_mapping(sample)
+    if sample:
+        handler.addFilter(SamplingFilter(sample))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    if isinstance(levels, str):
+        levels = parse_mapping(levels)
+    for name, logger_level in levels.items():
+        logging.getLogger(name).setLevel(logger_level.upper())
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, respect_handler_level=True
+    )
+    _listener.start()
+    return handler
+
+
+def ensure_logging() -> bool:
+    """Configure logging from the config unless this process already has it.
+
+    Safe to call repeatedly. Does nothing if ``configure_logging()`` already
+    ran or the root logger has handlers (installed by the host, e.g. a WSGI
+    server's logging config or pytest).
+
+    Returns:
+        bool: True if this call configured the pipeline.
+    """
+    with _configure_lock:
+        if _listener is not None or logging.getLogger().handlers:
+            return False
+        configure_logging()
+        return True
+
+
+def shutdown_logging():
+    """Write out queued records and stop the background writer, if running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,24 @@
+"""Create MongoDB indexes and optionally convert sensor_data to a time-series collection.
+
+Usage:
+    PYTHONPATH=src python -m scripts.ensure_schema [--timeseries] [--migrate]
+"""
+
+import argparse
+
+from database.mongo_ops import WeatherDB
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--timeseries", action="store_true")
+    parser.add_argument(
+        "--granularity", default="seconds", choices=["seconds", "minutes", "hours"]
+    )
+    parser.add_argument("--migrate", action="store_true")
+    args = parser.parse_args()
+
+    db = WeatherDB()
+    report = db.ensure_schema(
+        timeseries=args.timeseries, granularity=args.granularity, migrate=args.migrate
+    )
+    print(f"sensor_data: {report['sensor_data']}, indexes: {report['indexes']}")
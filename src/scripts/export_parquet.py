@@ -0,0 +1,39 @@
+"""Export sensor history to a date/sensor partitioned Parquet dataset for training.
+
+Each run exports the complete (UTC) days since the previous run; pass
+--start to re-export older days and --overwrite to replace their partitions.
+
+Usage:
+    PYTHONPATH=src python -m scripts.export_parquet [--out data/parquet] [--start 2025-06-01]
+"""
+
+import argparse
+from datetime import date
+
+from database.mongo_ops import WeatherDB
+from database.parquet_export import EXPORT_CHUNK_SIZE, ParquetExporter
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="data/parquet", help="dataset directory")
+    parser.add_argument("--start", type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat, help="exclusive")
+    parser.add_argument("--sensor", action="append", help="sensor_id (repeatable)")
+    parser.add_argument("--overwrite", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    parser.add_argument(
+        "--compression", default="zstd", choices=["zstd", "snappy", "gzip", "none"]
+    )
+    args = parser.parse_args()
+
+    db = WeatherDB(profile="analytics_read")
+    exporter = ParquetExporter(
+        db, args.out, chunk_size=args.chunk_size, compression=args.compression
+    )
+    report = exporter.export(
+        start=args.start, end=args.end, sensor_ids=args.sensor, overwrite=args.overwrite
+    )
+    print(
+        f"Exported {report['rows']} readings into {report['partitions']} partitions "
+        f"over {report['days']} days ({report['skipped']} partitions already present)."
+    )
@@ -0,0 +1,352 @@
+"""Generate synthetic sensor load from many simulated weather stations.
+
+Each station produces a realistic diurnal series: temperature peaks in the
+afternoon, relative humidity moves opposite to it, and pressure follows a
+slow random drift plus the semi-diurnal atmospheric tide. Gaussian noise,
+outages (runs of missing readings), anomalies (spikes, stuck sensors, drop
+outs) and an optional image attachment rate are configurable.
+
+Readings are emitted at a target rate (readings per second, wall clock) by
+several worker processes, each owning a share of the stations. Timestamps
+advance by ``--interval`` simulated seconds per station reading, so days of
+station data can be replayed in minutes. Records go to one of three sinks:
+
+- ``http``: NDJSON batches posted to the ingestion app's ``/ingest/bulk``
+- ``db``: straight into MongoDB with ``WeatherDB.insert_sensor_data_many``
+  (``--db-profile``, default ``fast_ingest``)
+- ``ndjson``: one ``load-<worker>.ndjson`` file per worker
+
+Usage:
+    PYTHONPATH=src python -m scripts.load_generator --stations 500 --rate 2000 \\
+        --duration 60 --sink http --url http://localhost:5000/ingest/bulk
+    PYTHONPATH=src python -m scripts.load_generator --sink ndjson --out load/ --count 100000
+"""
+
+import argparse
+import base64
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+import urllib.request
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+IMAGE_POOL_SIZE = 8
+HTTP_TIMEOUT = 30
+
+
+@dataclass
+class Station:
+    """Fixed climate parameters of one simulated station."""
+
+    sensor_id: str
+    lat: float
+    lon: float
+    mean_temperature_c: float
+    diurnal_range_c: float
+    mean_humidity: float
+    mean_pressure_hpa: float
+
+
+def make_station(index: int, rng: random.Random) -> Station:
+    """Create a station with randomized but plausible climate parameters."""
+    lat = rng.uniform(-60, 60)
+    return Station(
+        sensor_id=f"sim_{index:05d}",
+        lat=round(lat, 4),
+        lon=round(rng.uniform(-180, 180), 4),
+        mean_temperature_c=28 - abs(lat) * 0.4 + rng.uniform(-3, 3),
+        diurnal_range_c=rng.uniform(6, 14),
+        mean_humidity=rng.uniform(35, 85),
+        mean_pressure_hpa=rng.uniform(1005, 1020),
+    )
+
+
+class StationSimulator:
+    """Produces successive readings of one station, with noise, outages and anomalies."""
+
+    def __init__(self, station, rng, noise=1.0, outage_rate=0.001, anomaly_rate=0.002):
+        """Bind a station to a random source and the fault rates.
+
+        Args:
+            station (Station): Station parameters.
+            rng (random.Random): Random source (seeded per worker).
+            noise (float): Scale of the Gaussian measurement noise.
+            outage_rate (float): Chance per reading that an outage starts.
+            anomaly_rate (float): Chance per reading of an anomalous value.
+        """
+        self.station = station
+        self.rng = rng
+        self.noise = noise
+        self.outage_rate = outage_rate
+        self.anomaly_rate = anomaly_rate
+        self.outage_left = 0
+        self.pressure_drift = 0.0
+        self.stuck = None
+        self.battery = rng.uniform(60, 100)
+
+    def reading(self, at: datetime):
+        """Return the reading at ``at``, or None while the station is offline."""
+        if self.outage_left:
+            self.outage_left -= 1
+            return None
+        if self.rng.random() < self.outage_rate:
+            self.outage_left = self.rng.randint(5, 120)
+            return None
+
+        station, rng = self.station, self.rng
+        # Local solar hour: temperature peaks around 15:00, bottoms out at dawn
+        hour = (at.hour + at.minute / 60 + station.lon / 15) % 24
+        phase = math.sin(2 * math.pi * (hour - 9) / 24)
+        temperature = (
+            station.mean_temperature_c
+            + station.diurnal_range_c / 2 * phase
+            + rng.gauss(0, 0.3 * self.noise)
+        )
+        self.battery = max(5.0, self.battery - rng.uniform(0, 0.01))
+        humidity = station.mean_humidity - 18 * phase + rng.gauss(0, 2 * self.noise)
+        self.pressure_drift = 0.995 * self.pressure_drift + rng.gauss(0, 0.05)
+        pressure = (
+            station.mean_pressure_hpa
+            + self.pressure_drift * 10
+            + 1.2 * math.cos(4 * math.pi * hour / 24)
+            + rng.gauss(0, 0.2 * self.noise)
+        )
+
+        anomaly = None
+        if self.stuck is not None:
+            # A stuck sensor repeats its last value until it recovers
+            temperature = self.stuck
+            if rng.random() < 0.05:
+                self.stuck = None
+        elif rng.random() < self.anomaly_rate:
+            anomaly = rng.choice(("spike", "stuck", "dropout"))
+            if anomaly == "spike":
+                temperature += rng.choice((-1, 1)) * rng.uniform(15, 30)
+            elif anomaly == "stuck":
+                self.stuck = temperature
+            else:
+                humidity = 0.0
+
+        record = {
+            "timestamp": at.isoformat(),
+            "sensor_id": station.sensor_id,
+            "location": {"lat": station.lat, "lon": station.lon},
+            "readings": {
+                "temperature_c": round(temperature, 2),
+                "humidity_percent": round(min(100.0, max(0.0, humidity)), 1),
+                "pressure_hpa": round(pressure, 1),
+                "wind_speed_mps": round(abs(rng.gauss(3, 2 * self.noise)), 1),
+                "wind_direction_deg": rng.randint(0, 359),
+            },
+            "device_info": {
+                "model": "ESP32-CAM",
+                "battery_level": round(self.battery),
+                "signal_strength": rng.randint(-90, -40),
+            },
+        }
+        if anomaly is not None:
+            record["anomaly"] = {"detected": True, "type": anomaly}
+        return record
+
+
+def image_pool(size: int, seed: int) -> list[str]:
+    """Pre-encode a few distinct image payloads so records reuse them."""
+    rng = random.Random(seed)
+    return [
+        base64.b64encode(
+            b"\xff\xd8\xff\xe0" + rng.randbytes(max(0, size - 6)) + b"\xff\xd9"
+        ).decode()
+        for _ in range(IMAGE_POOL_SIZE)
+    ]
+
+
+class HttpSink:
+    """Posts NDJSON batches to the ingestion app's bulk endpoint."""
+
+    def __init__(self, url: str):
+        """Remember the ``/ingest/bulk`` URL."""
+        self.url = url
+
+    def write(self, records: list) -> int:
+        """Post a batch and return the number of accepted records."""
+        body = "\n".join(json.dumps(record) for record in records).encode()
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+        with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+            return json.load(response)["accepted"]
+
+    def close(self):
+        """Nothing to release."""
+
+
+class DatabaseSink:
+    """Inserts batches straight into MongoDB."""
+
+    def __init__(self, profile=None):
+        """Connect to ``$MONGO_URI`` with the given write profile."""
+        from database.mongo_ops import WeatherDB
+
+        self.weather_db = WeatherDB(profile=profile)
+
+    def write(self, records: list) -> int:
+        """Insert a batch and return the number of stored records."""
+        outcomes = self.weather_db.insert_sensor_data_many(records)
+        return sum(1 for _, error in outcomes if error is None)
+
+    def close(self):
+        """Flush and close the database handle."""
+        self.weather_db.close()
+
+
+class NdjsonSink:
+    """Appends records to one NDJSON file."""
+
+    def __init__(self, path: Path):
+        """Open ``path`` for appending, creating its directory."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, records: list) -> int:
+        """Write a batch, one JSON object per line."""
+        self.file.writelines(json.dumps(record) + "\n" for record in records)
+        return len(records)
+
+    def close(self):
+        """Close the file."""
+        self.file.close()
+
+
+def make_sink(args, worker: int):
+    """Create the sink selected on the command line for one worker."""
+    if args.sink == "http":
+        return HttpSink(args.url)
+    if args.sink == "db":
+        return DatabaseSink(args.db_profile)
+    return NdjsonSink(Path(args.out) / f"load-{worker:02d}.ndjson")
+
+
+def run_worker(args, worker: int) -> dict:
+    """Simulate this worker's share of the stations and emit their readings.
+
+    Returns:
+        dict: Counts of generated, written and outage-skipped readings.
+    """
+    rng = random.Random(args.seed * 1000 + worker)
+    stations = [
+        StationSimulator(
+            make_station(index, random.Random(args.seed + index)),
+            rng,
+            noise=args.noise,
+            outage_rate=args.outage_rate,
+            anomaly_rate=args.anomaly_rate,
+        )
+        for index in range(worker, args.stations, args.workers)
+    ]
+    images = image_pool(args.image_bytes, args.seed + worker) if args.image_rate else []
+    rate = args.rate / args.workers
+    count = None if args.count is None else args.count // args.workers
+    sink = make_sink(args, worker)
+    counts = {"generated": 0, "written": 0, "offline": 0}
+
+    started = time.monotonic()
+    at = args.start
+    batch = []
+    try:
+        while stations:
+            for simulator in stations:
+                record = simulator.reading(at)
+                if record is None:
+                    counts["offline"] += 1
+                    continue
+                if images and rng.random() < args.image_rate:
+                    record["image"] = {
+                        "base64_data": rng.choice(images),
+                        "format": "jpeg",
+                    }
+                batch.append(record)
+                counts["generated"] += 1
+                if len(batch) >= args.batch_size:
+                    counts["written"] += sink.write(batch)
+                    batch = []
+                    # Pace against the target rate
+                    ahead = counts["generated"] / rate - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+                if (count is not None and counts["generated"] >= count) or (
+                    args.duration and time.monotonic() - started >= args.duration
+                ):
+                    stations = []
+                    break
+            at += timedelta(seconds=args.interval)
+        if batch:
+            counts["written"] += sink.write(batch)
+    finally:
+        sink.close()
+    return counts
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=1000, help="readings/s, total")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--duration", type=float, default=0, help="seconds; 0 = no limit"
+    )
+    parser.add_argument("--count", type=int, help="total readings to generate")
+    parser.add_argument(
+        "--interval", type=float, default=60, help="simulated seconds between readings"
+    )
+    parser.add_argument(
+        "--start",
+        type=datetime.fromisoformat,
+        default=datetime.now(timezone.utc).replace(microsecond=0),
+        help="simulated start time (ISO 8601)",
+    )
+    parser.add_argument("--noise", type=float, default=1.0)
+    parser.add_argument("--outage-rate", type=float, default=0.001)
+    parser.add_argument("--anomaly-rate", type=float, default=0.002)
+    parser.add_argument("--image-rate", type=float, default=0.0)
+    parser.add_argument("--image-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--sink", choices=("http", "db", "ndjson"), default="ndjson")
+    parser.add_argument("--url", default="http://localhost:5000/ingest/bulk")
+    parser.add_argument(
+        "--db-profile",
+        default="fast_ingest",
+        help="write profile of the db sink (see database.clients)",
+    )
+    parser.add_argument("--out", default="storage/load")
+    args = parser.parse_args(argv)
+    if not args.duration and args.count is None:
+        parser.error("give --duration or --count")
+    args.workers = max(1, min(args.workers, args.stations))
+    return args
+
+
+def main(argv=None) -> dict:
+    """Run the workers and print the totals."""
+    args = parse_args(argv)
+    started = time.monotonic()
+    with multiprocessing.Pool(args.workers) as pool:
+        results = pool.starmap(run_worker, [(args, w) for w in range(args.workers)])
+    elapsed = time.monotonic() - started
+    totals = {key: sum(result[key] for result in results) for key in results[0]}
+    print(
+        f"{totals['generated']} readings from {args.stations} stations in "
+        f"{elapsed:.1f} s ({totals['generated'] / elapsed:,.0f}/s), "
+        f"{totals['written']} written, {totals['offline']} missed to outages"
+    )
+    return totals
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""Rebuild hourly and daily sensor rollups for a time range from raw sensor_data.
+
+Usage:
+    PYTHONPATH=src python -m scripts.rebuild_rollups --start 2025-06-01 --end 2025-07-01
+"""
+
+import argparse
+from datetime import datetime
+
+from database.mongo_ops import WeatherDB
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", required=True, type=datetime.fromisoformat)
+    parser.add_argument("--end", required=True, type=datetime.fromisoformat)
+    parser.add_argument("--sensor", action="append", help="sensor_id (repeatable)")
+    args = parser.parse_args()
+
+    db = WeatherDB(rollups=True)
+    db.rollups.ensure_indexes()
+    count = db.rollups.rebuild(db, args.start, args.end, sensor_ids=args.sensor)
+    print(f"Rebuilt rollups from {count} sensor documents.")
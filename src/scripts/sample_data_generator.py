@@ -157,5 +157,5 @@ def create_sample_sensor_data():
 if __name__ == "__main__":
     sample_data = create_sample_sensor_data()
     db = WeatherDB()
-    db.insert_sensor_data(cleaned_data=sample_data)
+    db.insert_sensor_data(sample_data)
     print("Sample sensor data inserted into MongoDB.")
@@ -0,0 +1,29 @@
+"""Append sensor readings stored since the last run to the memory-mapped feature store.
+
+Usage:
+    PYTHONPATH=src python -m scripts.sync_feature_store [--root data/features]
+"""
+
+import argparse
+
+from database.feature_store import FEATURE_SYNC_BATCH_SIZE, FeatureStore
+from database.mongo_ops import WeatherDB
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default="data/features", help="store directory")
+    parser.add_argument(
+        "--feature",
+        action="append",
+        help="dotted document path (repeatable; only when creating the store)",
+    )
+    parser.add_argument("--batch-size", type=int, default=FEATURE_SYNC_BATCH_SIZE)
+    args = parser.parse_args()
+
+    store = FeatureStore(args.root, features=args.feature)
+    appended = store.sync(
+        WeatherDB(profile="analytics_read"), batch_size=args.batch_size
+    )
+    print(
+        f"Appended {appended} rows; {len(store)} rows across {len(store.sensor_ids())} sensors."
+    )
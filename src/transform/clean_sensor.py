@@ -14,6 +14,8 @@ Core Features:
 - Parses boolean values from strings
 - Normalizes numeric values and strips whitespace
 - Supports extensible schema for diverse weather sensor types
+- Cleans whole batches column-wise with NumPy (``clean_sensor_batch``)
+- Caches a compiled cleaning plan per payload shape (``compile_cleaning_plan``)
 
 Usage:
     from data_cleaner import clean_sensor_data
@@ -28,9 +30,15 @@ Usage:
 """
 
 import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator
 
-logging.basicConfig(level=logging.INFO)
-from typing import Callable
+import numpy as np
+
+from observability import metrics
+
+logger = logging.getLogger(__name__)
 
 
 def c_to_k(c):
@@ -105,6 +113,41 @@ FIELD_MAP: dict[str, tuple[str, Callable]] = {
 }
 
 
+# Number of distinct payload shapes whose cleaning plans are kept (LRU)
+PLAN_CACHE_SIZE = 256
+
+# Per-record INFO logging is kept off the hot path unless switched on
+LOG_EACH_RECORD = False
+
+
+def set_record_logging(enabled: bool):
+    """Enable or disable the INFO log line emitted for every cleaned record."""
+    global LOG_EACH_RECORD
+    LOG_EACH_RECORD = enabled
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def compile_cleaning_plan(keys: tuple) -> tuple:
+    """Compile the transforms needed for one payload shape.
+
+    Plans are cached per key tuple, so each device model pays the ``FIELD_MAP``
+    scan once. Call ``compile_cleaning_plan.cache_clear()`` after changing
+    ``FIELD_MAP`` at runtime.
+
+    Args:
+        keys (tuple): The payload's keys in arrival order.
+
+    Returns:
+        tuple: ``(raw_field, clean_field, transformer)`` steps in ``FIELD_MAP`` order.
+    """
+    present = set(keys)
+    return tuple(
+        (raw_field, clean_field, transformer)
+        for raw_field, (clean_field, transformer) in FIELD_MAP.items()
+        if raw_field in present
+    )
+
+
 def clean_sensor_data(sensor_data: dict) -> dict:
     """Cleans and transforms raw sensor input data.
 
@@ -117,18 +160,166 @@ def clean_sensor_data(sensor_data: dict) -> dict:
     Notes:
         - Fields not present in the input will be skipped.
         - If a transformation fails, the field will be set to None.
+        - Only the transforms in the cached plan for the payload's shape are run.
     """
-    logging.info(
-        "Cleaning sensor data: %s at %s",
-        sensor_data.get("sensor_id", "unknown"),
-        sensor_data.get("timestamp", "unknown"),
-    )
+    if LOG_EACH_RECORD:
+        logger.info(
+            "Cleaning sensor data: %s at %s",
+            sensor_data.get("sensor_id", "unknown"),
+            sensor_data.get("timestamp", "unknown"),
+        )
 
     cleaned = {}
-    for raw_field, (clean_field, transformer) in FIELD_MAP.items():
-        if raw_field in sensor_data:
-            try:
-                cleaned[clean_field] = transformer(sensor_data[raw_field])
-            except Exception:
-                cleaned[clean_field] = None
+    for raw_field, clean_field, transformer in compile_cleaning_plan(
+        tuple(sensor_data)
+    ):
+        try:
+            cleaned[clean_field] = transformer(sensor_data[raw_field])
+        except Exception:
+            cleaned[clean_field] = None
     return cleaned
+
+
+# Vectorized equivalents of the numeric transformers, applied to float64 columns
+NUMERIC_OPS: dict[Callable, Callable] = {
+    c_to_k: lambda values: values + 273.15,
+    mps_to_kph: lambda values: values * 3.6,
+    hpa_to_pa: lambda values: values * 100,
+    as_float: lambda values: values,
+}
+
+TRUTHY_VALUES = ["true", "yes", "1", "good", "valid"]
+
+# Raw value types NumPy converts exactly like ``float()`` does (it parses str
+# with float()), plus None, which it turns into NaN; anything else, e.g. lists,
+# goes through float() one by one
+_FLOAT_TYPES = frozenset((int, float, bool, str, type(None)))
+
+
+@dataclass
+class CleanedBatch:
+    """Column-oriented result of cleaning a batch of sensor records.
+
+    Attributes:
+        size (int): Number of records in the batch.
+        columns (dict[str, np.ndarray]): Cleaned values per clean field. Numeric
+            fields are float64 with NaN for missing or unparsable values, boolean
+            fields are bool, and text fields are object arrays holding None.
+        present (dict[str, np.ndarray]): Boolean mask per clean field marking the
+            records whose raw payload contained the field.
+        failed (dict[str, np.ndarray]): Boolean mask per numeric field marking
+            the values ``float()`` could not convert (a parsed ``"nan"`` is not
+            failed).
+    """
+
+    size: int
+    columns: dict[str, np.ndarray]
+    present: dict[str, np.ndarray]
+    failed: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def to_records(self) -> list[dict]:
+        """Rebuild the per-record dictionaries ``clean_sensor_data`` would return.
+
+        Failed numeric conversions are reported as None, like in the scalar path.
+        """
+        records = [{} for _ in range(self.size)]
+        for name, column in self.columns.items():
+            values = column.tolist()
+            if name in self.failed:
+                for index in np.flatnonzero(self.failed[name]).tolist():
+                    values[index] = None
+            for index in np.flatnonzero(self.present[name]).tolist():
+                records[index][name] = values[index]
+        return records
+
+
+def _numeric_column(values: list) -> tuple:
+    """Convert raw values to a 1-D float64 column with ``float()`` semantics.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The column, NaN where ``float()`` failed,
+        and the mask of those failed values.
+    """
+    failed = np.zeros(len(values), dtype=bool)
+    if {type(value) for value in values} <= _FLOAT_TYPES:
+        try:
+            column = np.array(values, dtype=np.float64)
+        except (ValueError, OverflowError):
+            pass  # some value is unparsable; find which below
+        else:
+            # NaN is either a parsed "nan" or a None, which float() rejects
+            nan = np.flatnonzero(np.isnan(column))
+            failed[nan] = [values[index] is None for index in nan.tolist()]
+            return column, failed
+    column = np.empty(len(values), dtype=np.float64)
+    for index, value in enumerate(values):
+        try:
+            column[index] = float(value)
+        except Exception:
+            column[index] = np.nan
+            failed[index] = True
+    return column, failed
+
+
+def _apply(transformer: Callable, value):
+    """Apply a scalar transformer, returning None if it fails."""
+    try:
+        return transformer(value)
+    except Exception:
+        return None
+
+
+@metrics.timed("clean")
+def clean_sensor_batch(records: list[dict]) -> CleanedBatch:
+    """Clean a batch of raw sensor records column by column.
+
+    Produces the same values as calling ``clean_sensor_data`` on every record,
+    but performs the unit conversions on whole NumPy columns and only visits
+    fields that occur somewhere in the batch.
+
+    Args:
+        records (list[dict]): Raw sensor payloads.
+
+    Returns:
+        CleanedBatch: Cleaned column arrays and per-field presence masks.
+    """
+    logger.info("Cleaning batch of %d sensor records", len(records))
+
+    seen = set().union(*records) if records else set()
+    columns = {}
+    present = {}
+    failed = {}
+    for raw_field, (clean_field, transformer) in FIELD_MAP.items():
+        if raw_field not in seen:
+            continue
+        values = [record.get(raw_field) for record in records]
+        present[clean_field] = np.array(
+            [raw_field in record for record in records], dtype=bool
+        )
+        if transformer in NUMERIC_OPS:
+            column, failed[clean_field] = _numeric_column(values)
+            columns[clean_field] = NUMERIC_OPS[transformer](column)
+        elif transformer is parse_bool:
+            text = np.char.lower(np.char.strip(np.array([str(v) for v in values])))
+            columns[clean_field] = np.isin(text, TRUTHY_VALUES)
+        else:
+            columns[clean_field] = np.array(
+                [_apply(transformer, value) for value in values], dtype=object
+            )
+    return CleanedBatch(
+        size=len(records), columns=columns, present=present, failed=failed
+    )
+
+
+def clean_sensor_chunks(chunks: Iterable[list[dict]]) -> Iterator[CleanedBatch]:
+    """Clean an iterable of record chunks lazily, one ``CleanedBatch`` per chunk.
+
+    Args:
+        chunks (Iterable[list[dict]]): Chunks of raw sensor payloads, e.g. pages
+            read from a replay file.
+
+    Yields:
+        CleanedBatch: The cleaned columns of each chunk.
+    """
+    for chunk in chunks:
+        yield clean_sensor_batch(list(chunk))
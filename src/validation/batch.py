@@ -0,0 +1,144 @@
+"""Batch validation of WeatherSensorData payloads.
+
+Validating one nested ``WeatherSensorData`` builds half a dozen sub-models
+with dozens of defaulted optional fields, and ``.dict(exclude_none=True)``
+then walks them all again. ``validate_sensor_batch`` instead validates a
+whole list in one call of a compiled ``TypeAdapter`` over a ``TypedDict``
+mirror of the models: pydantic-core checks and coerces the same fields but
+returns plain dicts holding only the keys that were sent, which are already
+Mongo-ready once explicit ``None`` values are dropped.
+
+Records from our own replay tools are already clean; with ``trusted=True``
+they only have their required top-level fields checked and ``None`` values
+dropped, skipping validation entirely.
+"""
+
+from dataclasses import dataclass, field
+from typing import Annotated, NotRequired, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing_extensions import TypedDict
+
+from validation.schemas.weather_sensor_data import WeatherSensorData
+
+REQUIRED_FIELDS = tuple(
+    name for name, info in WeatherSensorData.model_fields.items() if info.is_required()
+)
+
+# Top-level fields holding a nested sub-model, pruned of None values one level down
+NESTED_FIELDS = tuple(
+    name
+    for name, info in WeatherSensorData.model_fields.items()
+    if any(
+        isinstance(arg, type) and issubclass(arg, BaseModel)
+        for arg in get_args(info.annotation) or (info.annotation,)
+    )
+)
+
+_DOCUMENT_TYPES = {}
+
+
+def document_type(annotation):
+    """Return a ``TypedDict`` mirror of a model annotation, recursively.
+
+    Fields keep their types and constraints; optional fields become
+    ``NotRequired`` so validated dicts contain only the keys that were sent.
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        if annotation not in _DOCUMENT_TYPES:
+            fields = {}
+            for name, info in annotation.model_fields.items():
+                field_type = document_type(info.annotation)
+                if info.metadata:
+                    field_type = Annotated[(field_type, *info.metadata)]
+                fields[name] = (
+                    field_type if info.is_required() else NotRequired[field_type]
+                )
+            _DOCUMENT_TYPES[annotation] = TypedDict(
+                f"{annotation.__name__}Document", fields
+            )
+        return _DOCUMENT_TYPES[annotation]
+    if get_origin(annotation) is Union:
+        return Union[tuple(document_type(arg) for arg in get_args(annotation))]
+    return annotation
+
+
+_SENSOR_LIST = TypeAdapter(list[document_type(WeatherSensorData)])
+
+
+@dataclass
+class BatchValidation:
+    """Outcome of validating a batch of payloads.
+
+    Attributes:
+        records (list[dict]): Mongo-ready documents of the valid payloads.
+        indices (list[int]): Position in the input batch of each record.
+        errors (dict[int, list[dict]]): Pydantic error dicts of each invalid
+            payload, keyed by its position; ``loc`` is relative to the payload.
+    """
+
+    records: list = field(default_factory=list)
+    indices: list = field(default_factory=list)
+    errors: dict = field(default_factory=dict)
+
+
+def _drop_none(record: dict) -> dict:
+    """Drop explicit None values from a validated record and its sub-documents."""
+    if None in record.values():
+        record = {k: v for k, v in record.items() if v is not None}
+    for name in NESTED_FIELDS:
+        nested = record.get(name)
+        if isinstance(nested, dict) and None in nested.values():
+            record[name] = {k: v for k, v in nested.items() if v is not None}
+    return record
+
+
+def _validate_trusted(payloads: list) -> BatchValidation:
+    """Prune and shallow-check payloads from a trusted source."""
+    result = BatchValidation()
+    for index, payload in enumerate(payloads):
+        missing = [
+            name
+            for name in REQUIRED_FIELDS
+            if not isinstance(payload, dict) or payload.get(name) is None
+        ]
+        if missing:
+            result.errors[index] = [
+                {"type": "missing", "loc": (name,), "msg": "Field required"}
+                for name in missing
+            ]
+            continue
+        result.records.append(_drop_none(dict(payload)))
+        result.indices.append(index)
+    return result
+
+
+def validate_sensor_batch(payloads: list, trusted: bool = False) -> BatchValidation:
+    """Validate many sensor payloads and dump the valid ones for MongoDB.
+
+    When some payloads are invalid, the remaining ones are validated again in
+    a second batch call, so a bad record never rejects its neighbours.
+
+    Args:
+        payloads (list[dict]): Raw sensor payloads.
+        trusted (bool): Skip model validation for records from our own tools.
+
+    Returns:
+        BatchValidation: Valid records with their input positions, and errors.
+    """
+    if trusted:
+        return _validate_trusted(payloads)
+
+    result = BatchValidation()
+    indices = list(range(len(payloads)))
+    try:
+        records = _SENSOR_LIST.validate_python(payloads)
+    except ValidationError as exc:
+        for error in exc.errors():
+            index, *loc = error["loc"]
+            result.errors.setdefault(index, []).append(dict(error, loc=tuple(loc)))
+        indices = [index for index in indices if index not in result.errors]
+        records = _SENSOR_LIST.validate_python([payloads[i] for i in indices])
+    result.records = [_drop_none(record) for record in records]
+    result.indices = indices
+    return result
@@ -0,0 +1 @@
+"""Validation schemas: Pydantic models for sensor documents and their sub-records."""
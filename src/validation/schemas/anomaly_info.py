@@ -0,0 +1,28 @@
+"""# SPDX-License-Identifier: Apache-2.0.
+
+AnomalyInfo Schema:
+
+This module defines the AnomalyInfo schema using Pydantic, which represents the outcome of anomaly
+detection on a sensor reading.
+
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class AnomalyInfo(BaseModel):
+    """Represents anomaly detection results for a sensor reading.
+
+    Attributes:
+        detected (Optional[bool]): Whether an anomaly was detected.
+        type (Optional[str]): Kind of anomaly (e.g. "spike", "flatline").
+        severity (Optional[str]): Severity of the anomaly (e.g. "low", "high").
+        comments (Optional[str]): Free-form notes about the anomaly.
+    """
+
+    detected: Optional[bool] = None
+    type: Optional[str] = None
+    severity: Optional[str] = None
+    comments: Optional[str] = None
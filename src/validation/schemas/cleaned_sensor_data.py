@@ -31,41 +31,41 @@ class WeatherSensorData(BaseModel):
         None, ge=0, description="Heat index in Kelvin"
     )
 
-    timestamp: Optional[datetime]
-    upload_time: Optional[datetime]
-    anomaly_timestamp: Optional[datetime]
+    timestamp: Optional[datetime] = None
+    upload_time: Optional[datetime] = None
+    anomaly_timestamp: Optional[datetime] = None
 
-    sensor_id: Optional[StrictStr]
-    location: Optional[StrictStr]
-    battery_level: Optional[StrictFloat]
-    signal_strength: Optional[StrictFloat]
-    data_quality: Optional[bool]
+    sensor_id: Optional[StrictStr] = None
+    location: Optional[StrictStr] = None
+    battery_level: Optional[StrictFloat] = None
+    signal_strength: Optional[StrictFloat] = None
+    data_quality: Optional[bool] = None
 
-    comments: Optional[StrictStr]
-    sensor_type: Optional[StrictStr]
-    manufacturer: Optional[StrictStr]
-    model: Optional[StrictStr]
-    firmware_version: Optional[StrictStr]
-    calibration_data: Optional[StrictStr]
-    raw_data: Optional[StrictStr]
-    data_source: Optional[StrictStr]
+    comments: Optional[StrictStr] = None
+    sensor_type: Optional[StrictStr] = None
+    manufacturer: Optional[StrictStr] = None
+    model: Optional[StrictStr] = None
+    firmware_version: Optional[StrictStr] = None
+    calibration_data: Optional[StrictStr] = None
+    raw_data: Optional[StrictStr] = None
+    data_source: Optional[StrictStr] = None
 
-    upload_status: Optional[StrictStr]
-    processing_notes: Optional[StrictStr]
-    quality_flags: Optional[StrictStr]
+    upload_status: Optional[StrictStr] = None
+    processing_notes: Optional[StrictStr] = None
+    quality_flags: Optional[StrictStr] = None
 
-    anomaly_detected: Optional[bool]
-    anomaly_type: Optional[StrictStr]
-    anomaly_severity: Optional[StrictStr]
-    anomaly_timestamp: Optional[datetime]
-    anomaly_resolution: Optional[StrictStr]
-    anomaly_comments: Optional[StrictStr]
+    anomaly_detected: Optional[bool] = None
+    anomaly_type: Optional[StrictStr] = None
+    anomaly_severity: Optional[StrictStr] = None
+    anomaly_timestamp: Optional[datetime] = None
+    anomaly_resolution: Optional[StrictStr] = None
+    anomaly_comments: Optional[StrictStr] = None
 
-    sensor_status: Optional[StrictStr]
-    sensor_location: Optional[StrictStr]
-    sensor_calibration: Optional[StrictStr]
-    sensor_accuracy: Optional[StrictStr]
-    sensor_precision: Optional[StrictStr]
+    sensor_status: Optional[StrictStr] = None
+    sensor_location: Optional[StrictStr] = None
+    sensor_calibration: Optional[StrictStr] = None
+    sensor_accuracy: Optional[StrictStr] = None
+    sensor_precision: Optional[StrictStr] = None
 
     # Validators
     @validator("timestamp", "upload_time", "anomaly_timestamp", pre=True, always=True)
@@ -37,17 +37,17 @@ class DeviceMetadata(BaseModel):
         sensor_precision (Optional[str]): Precision or resolution of readings.
     """
 
-    sensor_id: Optional[str]
-    location: Optional[str]
-    battery_level: Optional[float]
-    signal_strength: Optional[float]
-    sensor_type: Optional[str]
-    manufacturer: Optional[str]
-    model: Optional[str]
-    firmware_version: Optional[str]
-    calibration_data: Optional[str]
-    sensor_status: Optional[str]
-    sensor_location: Optional[str]
-    sensor_calibration: Optional[str]
-    sensor_accuracy: Optional[str]
-    sensor_precision: Optional[str]
+    sensor_id: Optional[str] = None
+    location: Optional[str] = None
+    battery_level: Optional[float] = None
+    signal_strength: Optional[float] = None
+    sensor_type: Optional[str] = None
+    manufacturer: Optional[str] = None
+    model: Optional[str] = None
+    firmware_version: Optional[str] = None
+    calibration_data: Optional[str] = None
+    sensor_status: Optional[str] = None
+    sensor_location: Optional[str] = None
+    sensor_calibration: Optional[str] = None
+    sensor_accuracy: Optional[str] = None
+    sensor_precision: Optional[str] = None
@@ -41,7 +41,7 @@ class GeoLocation(BaseModel):
 
     lat: float
     lon: float
-    description: Optional[str]
+    description: Optional[str] = None
     altitude: Optional[float] = None  # Altitude in meters
     accuracy: Optional[float] = None  # Accuracy in meters
     timestamp: Optional[str] = None  # ISO 8601 format
@@ -18,8 +18,15 @@ class ImageInfo(BaseModel):
     Contains image dimensions, format details, timestamps, and optional diagnostics
     such as error logs, warnings, and processing duration.
 
+    Images are either embedded (as base64 text, or as raw bytes from binary
+    encodings) or, once stored, referenced by the SHA-256 of their bytes in
+    the blob store.
+
     Attributes:
-        base64_data (str): Base64-encoded representation of the image.
+        base64_data (Optional[str]): Base64-encoded representation of the image.
+        data (Optional[bytes]): Raw image bytes (MessagePack/CBOR uploads).
+        sha256 (Optional[str]): Blob store digest of the image bytes.
+        size_bytes (Optional[int]): Size of the image in bytes.
         width (Optional[int]): Width of the image in pixels.
         height (Optional[int]): Height of the image in pixels.
         resolution (Optional[str]): Human-readable resolution description (e.g. "640x480").
@@ -38,7 +45,10 @@ class ImageInfo(BaseModel):
         processing_time (Optional[float]): Time taken to process the image, in seconds.
     """
 
-    base64_data: str
+    base64_data: Optional[str] = None
+    data: Optional[bytes] = None
+    sha256: Optional[str] = None
+    size_bytes: Optional[int] = None
     width: Optional[int] = None
     height: Optional[int] = None
     resolution: Optional[str] = None
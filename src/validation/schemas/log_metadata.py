@@ -26,9 +26,9 @@ class LogMetadata(BaseModel):
         processing_time (Optional[float]): Time taken to process the log entry, in seconds.
     """
 
-    processing_notes: Optional[str]
-    raw_data: Optional[str]
-    error_logs: Optional[str]
-    warnings: Optional[str]
-    debug_info: Optional[str]
-    processing_time: Optional[float]
+    processing_notes: Optional[str] = None
+    raw_data: Optional[str] = None
+    error_logs: Optional[str] = None
+    warnings: Optional[str] = None
+    debug_info: Optional[str] = None
+    processing_time: Optional[float] = None
@@ -0,0 +1,41 @@
+"""# SPDX-License-Identifier: Apache-2.0.
+
+SensorReading Schema:
+
+This module defines the SensorReading schema using Pydantic, which represents the raw numeric measurements
+reported by a weather station node. Values are kept in the units the device reports them in.
+
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class SensorReading(BaseModel):
+    """Represents the numeric measurements of a single sensor reading.
+
+    Contains temperature, humidity, pressure, wind, rain and light measurements
+    in the device's native units.
+
+    Attributes:
+        temperature_c (Optional[float]): Air temperature in degrees Celsius.
+        humidity_percent (Optional[float]): Relative humidity percentage.
+        pressure_hpa (Optional[float]): Atmospheric pressure in hectopascals.
+        wind_speed_mps (Optional[float]): Wind speed in meters per second.
+        wind_direction_deg (Optional[float]): Wind direction in degrees.
+        rain_mm (Optional[float]): Rainfall in millimeters.
+        sunlight_lux (Optional[float]): Ambient light in lux.
+        dew_point_c (Optional[float]): Dew point in degrees Celsius.
+        heat_index_c (Optional[float]): Heat index in degrees Celsius.
+    """
+
+    temperature_c: Optional[float] = None
+    humidity_percent: Optional[float] = None
+    pressure_hpa: Optional[float] = None
+    wind_speed_mps: Optional[float] = None
+    wind_direction_deg: Optional[float] = None
+    rain_mm: Optional[float] = None
+    sunlight_lux: Optional[float] = None
+    dew_point_c: Optional[float] = None
+    heat_index_c: Optional[float] = None
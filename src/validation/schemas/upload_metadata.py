@@ -8,9 +8,10 @@ raw data, data source, upload status, processing notes, quality flags, error log
 and processing time.
 """
 
+from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field, datetime
+from pydantic import BaseModel, Field
 
 
 class UploadMetadata(BaseModel):
@@ -39,20 +40,20 @@ class UploadMetadata(BaseModel):
         upload_id (Optional[str]): Unique identifier for the upload.
     """
 
-    timestamp: Optional[datetime]
-    upload_time: Optional[datetime]
-    status: Optional[str]
-    source: Optional[str]
-    data_quality: Optional[bool]
-    comments: Optional[str]
-    raw_data: Optional[str]
-    data_source: Optional[str]
-    upload_status: Optional[str]
-    processing_notes: Optional[str]
-    quality_flags: Optional[str]
-    error_logs: Optional[str]
-    warnings: Optional[str]
-    debug_info: Optional[str]
+    timestamp: Optional[datetime] = None
+    upload_time: Optional[datetime] = None
+    status: Optional[str] = None
+    source: Optional[str] = None
+    data_quality: Optional[bool] = None
+    comments: Optional[str] = None
+    raw_data: Optional[str] = None
+    data_source: Optional[str] = None
+    upload_status: Optional[str] = None
+    processing_notes: Optional[str] = None
+    quality_flags: Optional[str] = None
+    error_logs: Optional[str] = None
+    warnings: Optional[str] = None
+    debug_info: Optional[str] = None
     processing_time: Optional[float] = Field(
         default=None, description="Time taken to process the upload in seconds"
     )
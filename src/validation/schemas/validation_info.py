@@ -0,0 +1,26 @@
+"""# SPDX-License-Identifier: Apache-2.0.
+
+ValidationInfo Schema:
+
+This module defines the ValidationInfo schema using Pydantic, which records the result of the
+validation checks applied to a sensor reading.
+
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ValidationInfo(BaseModel):
+    """Represents the validation checks applied to a sensor reading.
+
+    Attributes:
+        quality_flags (Optional[List[str]]): Checks passed or failed by the reading.
+        data_quality (Optional[str]): Overall quality label (e.g. "good", "suspect").
+        validator_version (Optional[str]): Version of the validator that ran the checks.
+    """
+
+    quality_flags: Optional[List[str]] = None
+    data_quality: Optional[str] = None
+    validator_version: Optional[str] = None
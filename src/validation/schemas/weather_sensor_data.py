@@ -38,6 +38,7 @@ class WeatherSensorData(BaseModel):
         readings (SensorReading): Sensor readings including temperature, humidity, etc.
         image (Optional[ImageInfo]): Optional image information associated with the sensor data.
         device_info (DeviceMetadata): Metadata about the device that collected the data.
+        message_id (Optional[str]): Client message ID; a retried reading reuses it.
         anomaly (Optional[AnomalyInfo]): Optional anomaly information detected in the sensor data.
         validation (Optional[ValidationInfo]): Optional validation information for the sensor data.
         upload (Optional[UploadMetadata]): Optional metadata about the upload process.
@@ -80,12 +81,13 @@ class WeatherSensorData(BaseModel):
     sensor_id: str
     location: GeoLocation
     readings: SensorReading
-    image: Optional[ImageInfo]
+    image: Optional[ImageInfo] = None
     device_info: DeviceMetadata
-    anomaly: Optional[AnomalyInfo]
-    validation: Optional[ValidationInfo]
-    upload: Optional[UploadMetadata]
-    logs: Optional[LogMetadata]
+    message_id: Optional[str] = None  # Client message ID, part of the idempotency key
+    anomaly: Optional[AnomalyInfo] = None
+    validation: Optional[ValidationInfo] = None
+    upload: Optional[UploadMetadata] = None
+    logs: Optional[LogMetadata] = None
     comments: Optional[str] = None
     data_quality: Optional[bool] = None
     processing_time: Optional[float] = None
@@ -7,6 +7,41 @@ when executing this script directly or in development environments.
 import os
 import sys
 
+import mongomock
+import pytest
+
 sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
 )
+
+from database.mongo_ops import WeatherDB
+
+
+@pytest.fixture
+def memory_db():
+    """WeatherDB instance backed by an in-memory mongomock client."""
+    db = WeatherDB(client=mongomock.MongoClient())
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def app_client(memory_db):
+    """Test client for an ingestion app that stores into ``memory_db``."""
+    # Imported here: importing the app at conftest load time, before pytest
+    # installs its log capture, would start logging to logs/system.log.
+    from ingestion.app import create_app
+
+    return create_app(weather_db=memory_db).test_client()
+
+
+@pytest.fixture
+def sensor_payload():
+    """Minimal payload that passes the nested WeatherSensorData schema."""
+    return {
+        "timestamp": "2025-06-29T14:00:00",
+        "sensor_id": "esp32_01",
+        "location": {"lat": 28.6139, "lon": 77.2090, "description": "Delhi"},
+        "readings": {"temperature_c": 36.5, "humidity_percent": 64.2},
+        "device_info": {"model": "ESP32-CAM", "battery_level": 82},
+    }
@@ -0,0 +1,57 @@
+"""Tests for the content-addressed image blob store and its WeatherDB wiring.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import base64
+import hashlib
+
+import mongomock
+import pytest
+
+from database.blob_store import BlobStore
+from database.mongo_ops import WeatherDB
+
+FRAME = b"\xff\xd8\xff\xe0 fake jpeg frame"
+
+
+@pytest.fixture
+def blob_db(tmp_path):
+    return WeatherDB(client=mongomock.MongoClient(), blob_store=BlobStore(tmp_path))
+
+
+def test_blobs_are_sharded_and_deduplicated(tmp_path):
+    store = BlobStore(tmp_path)
+    sha256, size = store.put(FRAME)
+    assert store.put(FRAME) == (sha256, size)
+    assert sha256 == hashlib.sha256(FRAME).hexdigest()
+    assert store.path_for(sha256).relative_to(tmp_path).parts == (
+        sha256[:2],
+        sha256[2:4],
+        sha256,
+    )
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+    assert store.get(sha256) == FRAME
+
+
+def test_sensor_documents_keep_only_image_reference(blob_db):
+    encoded = base64.b64encode(FRAME).decode()
+    inserted_id = blob_db.insert_sensor_data(
+        {
+            "sensor_id": "esp32_01",
+            "image": {"base64_data": encoded, "format": "jpeg"},
+            "cloud_snapshot": {"image_base64": encoded, "image_format": "JPEG"},
+        }
+    )
+    stored = blob_db.sensor_collection.find_one({"_id": inserted_id})
+    assert "base64_data" not in stored["image"]
+    assert stored["image"]["size_bytes"] == len(FRAME)
+    assert stored["image"]["format"] == "jpeg"
+    assert stored["cloud_snapshot"]["image_sha256"] == stored["image"]["sha256"]
+    assert blob_db.get_image(stored["image"]["sha256"]) == FRAME
+
+
+def test_invalid_base64_stays_inline(blob_db):
+    inserted_id = blob_db.insert_sensor_data({"image": {"base64_data": "<BASE64>"}})
+    stored = blob_db.sensor_collection.find_one({"_id": inserted_id})
+    assert stored["image"]["base64_data"] == "<BASE64>"
@@ -0,0 +1,87 @@
+"""Tests for buffered bulk inserts through WeatherDB.
+
+Uses an in-memory mongomock client, so no running MongoDB is required.
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import mongomock
+import pytest
+
+from database.bulk_writer import BulkWriteFailure
+from database.mongo_ops import WeatherDB
+
+
+@pytest.fixture
+def bulk_db():
+    db = WeatherDB(client=mongomock.MongoClient(), bulk_write=True, bulk_batch_size=3)
+    yield db
+    db.close()
+
+
+def test_flushes_when_batch_is_full(bulk_db):
+    futures = [bulk_db.submit_sensor_data({"sensor_id": f"s{i}"}) for i in range(3)]
+    assert all(future.done() for future in futures)
+    assert bulk_db.sensor_collection.count_documents({}) == 3
+
+
+def test_flushes_on_age():
+    db = WeatherDB(client=mongomock.MongoClient(), bulk_write=True, bulk_max_age=0.01)
+    future = db.submit_sensor_data({"sensor_id": "esp32_01"})
+    assert future.result(timeout=2) is not None
+    assert db.sensor_collection.count_documents({}) == 1
+    db.close()
+
+
+def test_close_flushes_pending_documents(bulk_db):
+    future = bulk_db.submit_sensor_data({"sensor_id": "esp32_01"})
+    bulk_db.close()
+    assert future.done()
+    assert bulk_db.sensor_collection.count_documents({"sensor_id": "esp32_01"}) == 1
+
+
+def test_reports_per_document_failures(bulk_db):
+    bulk_db.sensor_collection.create_index("sensor_id", unique=True)
+    futures = [
+        bulk_db.submit_sensor_data({"sensor_id": sensor_id})
+        for sensor_id in ("a", "a", "b")
+    ]
+    assert futures[0].result() is not None
+    with pytest.raises(BulkWriteFailure):
+        futures[1].result()
+    assert futures[2].result() is not None
+
+
+def test_insert_sensor_data_returns_id(memory_db):
+    inserted_id = memory_db.insert_sensor_data({"timestamp": "2025-06-29T10:00:00"})
+    stored = memory_db.sensor_collection.find_one({"_id": inserted_id})
+    assert stored["timestamp"].hour == 10
+
+
+def test_validate_and_store_uses_bulk_writer(bulk_db, sensor_payload, monkeypatch):
+    from ingestion import app as ingestion_app
+
+    monkeypatch.setitem(ingestion_app.app.extensions, "weather_db", bulk_db)
+    bulk_db.bulk_writer.max_age = 0.01
+    with ingestion_app.app.app_context():
+        record_id = ingestion_app.validate_and_store(sensor_payload)
+    assert record_id is not None
+    assert bulk_db.sensor_collection.count_documents({"sensor_id": "esp32_01"}) == 1
+
+
+def test_failing_rollups_do_not_fail_stored_documents(monkeypatch):
+    db = WeatherDB(
+        client=mongomock.MongoClient(), rollups=True, bulk_write=True, bulk_batch_size=2
+    )
+
+    def broken_apply(documents):
+        raise RuntimeError("rollup upsert failed")
+
+    monkeypatch.setattr(db.rollups, "apply", broken_apply)
+    futures = [db.submit_sensor_data({"sensor_id": f"s{i}"}) for i in range(2)]
+    assert all(future.result(timeout=2) is not None for future in futures)
+    assert db.submit_sensor_data({"sensor_id": "s9"}).result(timeout=2) is not None
+    db.close()
+
+    plain = WeatherDB(client=mongomock.MongoClient(), rollups=True)
+    monkeypatch.setattr(plain.rollups, "apply", broken_apply)
+    assert plain.insert_sensor_data({"sensor_id": "s1"}) is not None
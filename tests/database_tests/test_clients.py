@@ -0,0 +1,44 @@
+"""Tests for the shared MongoDB client registry and write profiles.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import mongomock
+import pytest
+from pymongo import ReadPreference
+
+from database import clients
+from database.mongo_ops import WeatherDB
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    clients.close_clients()
+    yield
+    clients.close_clients()
+
+
+def test_weather_dbs_share_one_client_per_uri():
+    first = WeatherDB(uri="mongodb://db-a:27017/")
+    second = WeatherDB(uri="mongodb://db-a:27017/", db_name="other")
+    third = WeatherDB(uri="mongodb://db-b:27017/")
+    assert first.client is second.client
+    assert first.client is not third.client
+
+
+def test_pool_options_apply_when_client_is_created():
+    client = clients.get_client("mongodb://db-a:27017/", maxPoolSize=7)
+    assert client.options.pool_options.max_pool_size == 7
+    assert clients.get_client("mongodb://db-a:27017/", maxPoolSize=50) is client
+
+
+def test_write_profiles_set_concerns():
+    uri = "mongodb://db-a:27017/"
+    durable = WeatherDB(uri=uri, profile="durable").sensor_collection
+    assert durable.write_concern.document == {"w": "majority", "j": True}
+    replay = WeatherDB(uri=uri, profile="replay").sensor_collection
+    assert not replay.write_concern.acknowledged
+    analytics = WeatherDB(uri=uri, profile="analytics_read").sensor_collection
+    assert analytics.read_preference == ReadPreference.SECONDARY_PREFERRED
+    with pytest.raises(ValueError, match="unknown write profile"):
+        WeatherDB(client=mongomock.MongoClient(), profile="fastest")
@@ -0,0 +1,115 @@
+"""Tests for idempotent sensor inserts and the recent-reading Bloom filter.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import mongomock
+import pytest
+
+from database.dedupe import (
+    BloomFilter,
+    DuplicateReading,
+    RecentReadingFilter,
+    is_duplicate,
+    reading_key,
+)
+from database.mongo_ops import WeatherDB
+
+
+def _reading(sensor_payload, minutes=0, **fields):
+    timestamp = datetime(2025, 6, 29, 14) + timedelta(minutes=minutes)
+    return dict(sensor_payload, timestamp=timestamp, **fields)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"key-{i}".encode() for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"other-{i}".encode() in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_recent_filter_keeps_at_least_capacity_keys():
+    recent = RecentReadingFilter(capacity=100, error_rate=1e-4)
+    for i in range(250):
+        recent.add(str(i).encode())
+    assert all(str(i).encode() in recent for i in range(150, 250))
+    assert recent.stats()["keys"] == 150
+
+
+def test_reading_key_normalizes_timestamps():
+    naive = {"sensor_id": "s1", "timestamp": datetime(2025, 6, 29, 14)}
+    aware = {
+        "sensor_id": "s1",
+        "timestamp": datetime(
+            2025, 6, 29, 19, 30, tzinfo=timezone(timedelta(hours=5, minutes=30))
+        ),
+    }
+    assert reading_key(naive) == reading_key(aware)
+    assert reading_key(dict(naive, message_id="m1")) != reading_key(naive)
+    assert reading_key({"sensor_id": "s1", "timestamp": "not a date"}) is None
+
+
+def test_retried_reading_is_reported_as_duplicate(memory_db, sensor_payload):
+    memory_db.insert_sensor_data(_reading(sensor_payload))
+    with pytest.raises(DuplicateReading):
+        memory_db.insert_sensor_data(_reading(sensor_payload))
+    memory_db.insert_sensor_data(_reading(sensor_payload, minutes=1))
+    assert memory_db.sensor_collection.count_documents({}) == 2
+
+
+def test_unique_index_catches_duplicates_the_filter_missed(sensor_payload):
+    db = WeatherDB(client=mongomock.MongoClient(), dedupe_filter_size=0)
+    db.ensure_schema()
+    db.insert_sensor_data(_reading(sensor_payload))
+    with pytest.raises(DuplicateReading):
+        db.insert_sensor_data(_reading(sensor_payload))
+    outcomes = db.insert_sensor_data_many(
+        [_reading(sensor_payload), _reading(sensor_payload, minutes=1)]
+    )
+    assert [is_duplicate(error) for _, error in outcomes] == [True, False]
+    assert db.sensor_collection.count_documents({}) == 2
+
+
+def test_unique_index_makes_the_filter_lookup_unnecessary(sensor_payload):
+    db = WeatherDB(client=mongomock.MongoClient())
+    db.ensure_schema()
+    db.insert_sensor_data(_reading(sensor_payload))
+    lookups = []
+    db.sensor_collection.find_one = lambda *args: lookups.append(args)
+    with pytest.raises(DuplicateReading):
+        db.insert_sensor_data(_reading(sensor_payload))
+    assert lookups == []
+    assert WeatherDB(client=db.client)._has_unique_reading_key()
+
+    # Without the index (a fresh WeatherDB finds out once), hits are looked up
+    fresh = WeatherDB(client=mongomock.MongoClient())
+    fresh.insert_sensor_data(_reading(sensor_payload))
+    with pytest.raises(DuplicateReading):
+        fresh.insert_sensor_data(_reading(sensor_payload))
+    assert fresh._unique_reading_key is False
+
+
+def test_bulk_ingest_reports_already_stored(app_client, memory_db, sensor_payload):
+    retry = dict(sensor_payload, message_id="m-1")
+    app_client.post("/ingest/bulk", json=[retry])
+    response = app_client.post("/ingest/bulk", json=[retry, retry])
+    result = response.get_json()
+    assert response.status_code == 200
+    assert (result["accepted"], result["duplicates"], result["rejected"]) == (0, 2, 0)
+    assert result["results"][0]["message"] == "already stored"
+    assert memory_db.sensor_collection.count_documents({}) == 1
+
+
+def test_filter_false_positive_does_not_drop_a_new_reading(memory_db, sensor_payload):
+    # Simulate false positives: keys in the filter that were never stored
+    for minutes in (0, 1):
+        memory_db.recent_readings.add(reading_key(_reading(sensor_payload, minutes)))
+    memory_db.insert_sensor_data(_reading(sensor_payload))
+    outcomes = memory_db.insert_sensor_data_many([_reading(sensor_payload, minutes=1)])
+    assert outcomes[0][1] is None
+    assert memory_db.sensor_collection.count_documents({}) == 2
@@ -0,0 +1,76 @@
+"""Tests for WeatherDB.ensure_schema index and time-series setup.
+
+mongomock has no time-series support, so those tests record the collection
+options WeatherDB asks for instead.
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+from datetime import datetime
+
+
+def test_indexes_are_created_idempotently(memory_db):
+    first = memory_db.ensure_schema()
+    second = memory_db.ensure_schema()
+    assert (
+        first
+        == second
+        == {
+            "sensor_data": "regular",
+            "indexes": ["sensor_id_timestamp", "sensor_id_timestamp", "reading_key"],
+        }
+    )
+    index = memory_db.sensor_collection.index_information()["sensor_id_timestamp"]
+    assert index["key"] == [("sensor_id", 1), ("timestamp", 1)]
+
+
+def _record_timeseries_options(db, existing):
+    created = {}
+    create_plain_collection = db.db.create_collection
+
+    def list_collections(filter):
+        return [info for info in existing if info["name"] == filter["name"]]
+
+    def create_collection(name, timeseries):
+        created[name] = timeseries
+        return create_plain_collection(name)
+
+    db.db.list_collections = list_collections
+    db.db.create_collection = create_collection
+    return created
+
+
+def test_timeseries_collection_is_created(memory_db):
+    created = _record_timeseries_options(memory_db, existing=[])
+    report = memory_db.ensure_schema(timeseries=True, granularity="minutes")
+    assert report["sensor_data"] == "created"
+    assert created["sensor_data"] == {
+        "timeField": "timestamp",
+        "metaField": "sensor_id",
+        "granularity": "minutes",
+    }
+
+
+def test_existing_timeseries_collection_is_left_alone(memory_db):
+    created = _record_timeseries_options(
+        memory_db, existing=[{"name": "sensor_data", "type": "timeseries"}]
+    )
+    assert memory_db.ensure_schema(timeseries=True)["sensor_data"] == "exists"
+    assert created == {}
+
+
+def test_regular_collection_is_migrated(memory_db):
+    memory_db.insert_sensor_data({"sensor_id": "a", "timestamp": datetime(2025, 1, 1)})
+    memory_db.insert_sensor_data({"sensor_id": "b", "timestamp": "not a date"})
+    existing = [{"name": "sensor_data", "type": "collection", "options": {}}]
+    _record_timeseries_options(memory_db, existing)
+
+    assert memory_db.ensure_schema(timeseries=True)["sensor_data"] == "regular"
+    report = memory_db.ensure_schema(timeseries=True, migrate=True)
+    assert report["sensor_data"] == "migrated"
+    assert [d["sensor_id"] for d in memory_db.sensor_collection.find()] == ["a"]
+    legacy = [
+        name
+        for name in memory_db.db.list_collection_names()
+        if name.startswith("sensor_data_legacy_")
+    ]
+    assert len(legacy) == 1
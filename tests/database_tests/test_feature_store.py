@@ -0,0 +1,73 @@
+"""Tests for the memory-mapped feature store and its window iterator.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from database.feature_store import FeatureStore, epoch_ms
+
+START = datetime(2025, 6, 29)
+
+
+def _store_hours(db, sensor_payload, sensor_id, hours):
+    for hour in hours:
+        db.insert_sensor_data(
+            dict(
+                sensor_payload,
+                sensor_id=sensor_id,
+                timestamp=START + timedelta(hours=hour),
+                readings={"temperature_c": float(hour), "pressure_hpa": 1000 + hour},
+            )
+        )
+
+
+def test_sync_appends_only_new_readings(memory_db, sensor_payload, tmp_path):
+    store = FeatureStore(str(tmp_path))
+    _store_hours(memory_db, sensor_payload, "esp32_01", range(3))
+    assert store.sync(memory_db, batch_size=2) == 3
+    _store_hours(memory_db, sensor_payload, "esp32_01", range(3, 5))
+    _store_hours(memory_db, sensor_payload, "esp32_02", range(2))
+    assert store.sync(memory_db) == 4
+
+    reopened = FeatureStore(str(tmp_path))
+    assert reopened.sensor_ids() == ["esp32_01", "esp32_02"]
+    timestamps, values = reopened.series("esp32_01")
+    assert timestamps[-1] == epoch_ms(START + timedelta(hours=4))
+    assert values.dtype == np.float32
+    np.testing.assert_array_equal(values[:, 0], np.arange(5, dtype=np.float32))
+    assert np.isnan(values[:, 1]).all()
+    assert values[4, 2] == 1004
+
+
+def test_append_drops_rows_that_are_not_newer(tmp_path):
+    store = FeatureStore(str(tmp_path), features=("readings.rain_mm",))
+    assert store.append("s1", [3, 1, 2, 2], [[3], [1], [2], [2]]) == 3
+    assert store.append("s1", [2, 4], [[0], [4]]) == 1
+    timestamps, values = store.series("s1")
+    assert timestamps.tolist() == [1, 2, 3, 4]
+    assert values[:, 0].tolist() == [1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        FeatureStore(str(tmp_path), features=("readings.temperature_c",))
+
+
+def test_windows_are_views_of_the_mapped_series(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    hours = np.arange(10)
+    store.append(
+        "s1",
+        [epoch_ms(START + timedelta(hours=int(h))) for h in hours],
+        np.stack([hours, hours + 100, hours + 1000], axis=1),
+    )
+    batches = list(store.windows("s1", window=4, stride=2, batch_size=2))
+    assert [batch.values.shape for batch in batches] == [(2, 4, 3), (2, 4, 3)]
+    assert batches[0].values[1, :, 1].tolist() == [102, 103, 104, 105]
+    assert batches[1].timestamps[0, 0] == epoch_ms(START + timedelta(hours=4))
+    mapped = store.series("s1")[1]
+    assert all(np.shares_memory(batch.values, mapped) for batch in batches)
+
+    last_day = store.series("s1", start=START + timedelta(hours=8))[1]
+    assert last_day[:, 0].tolist() == [8, 9]
@@ -0,0 +1,61 @@
+"""Tests for the streaming time-range query API on WeatherDB.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+from datetime import datetime, timedelta
+from types import GeneratorType
+
+import pytest
+from pymongo import DESCENDING
+
+START = datetime(2025, 6, 29)
+
+
+@pytest.fixture
+def history_db(memory_db):
+    memory_db.insert_sensor_data_many(
+        [
+            {
+                "sensor_id": sensor_id,
+                "timestamp": START + timedelta(hours=hour),
+                "readings": {"temperature_c": 20.0 + hour},
+                "image": {"base64_data": "AAAA", "format": "jpeg"},
+            }
+            for sensor_id in ("esp32_01", "esp32_02", "esp32_03")
+            for hour in range(6)
+        ]
+    )
+    return memory_db
+
+
+def test_window_is_start_inclusive_end_exclusive(history_db):
+    readings = history_db.find_readings(
+        "esp32_01", start=START + timedelta(hours=1), end=START + timedelta(hours=4)
+    )
+    assert isinstance(readings, GeneratorType)
+    assert [r["readings"]["temperature_c"] for r in readings] == [21.0, 22.0, 23.0]
+
+
+def test_multiple_sensors_with_projection_and_sort(history_db):
+    readings = list(
+        history_db.find_readings(
+            ["esp32_02", "esp32_03"],
+            fields=["sensor_id", "timestamp"],
+            sort=[("timestamp", DESCENDING), ("sensor_id", DESCENDING)],
+            batch_size=2,
+        )
+    )
+    assert len(readings) == 12
+    assert readings[0]["timestamp"] == START + timedelta(hours=5)
+    assert readings[0]["sensor_id"] == "esp32_03"
+    assert set(readings[0]) == {"_id", "sensor_id", "timestamp"}
+
+
+def test_image_payloads_are_excluded_by_default(history_db):
+    reading = next(history_db.find_readings("esp32_01"))
+    assert reading["image"] == {"format": "jpeg"}
+    requested = next(history_db.find_readings("esp32_01", fields=["image"]))
+    assert "base64_data" not in requested["image"]
+    full = next(history_db.find_readings("esp32_01", include_images=True))
+    assert full["image"]["base64_data"] == "AAAA"
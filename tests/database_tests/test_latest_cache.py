@@ -0,0 +1,71 @@
+"""Tests for the latest-reading cache and its write-through from WeatherDB.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+from datetime import datetime
+
+from database.latest_cache import LatestReadingCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def doc(sensor_id, hour):
+    return {"sensor_id": sensor_id, "timestamp": datetime(2025, 6, 29, hour)}
+
+
+def test_lru_eviction_and_counters():
+    cache = LatestReadingCache(maxsize=2)
+    cache.put(doc("a", 1))
+    cache.put(doc("b", 1))
+    assert cache.get("a")["sensor_id"] == "a"
+    cache.put(doc("c", 1))
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+    assert stats["size"] == 2
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = LatestReadingCache(ttl=10, clock=clock)
+    cache.put(doc("a", 1))
+    clock.now = 9.9
+    assert cache.get("a") is not None
+    clock.now = 10.0
+    assert cache.get("a") is None
+
+
+def test_older_reading_does_not_replace_newer():
+    cache = LatestReadingCache()
+    cache.put(doc("a", 5))
+    cache.put(doc("a", 3))
+    assert cache.get("a")["timestamp"].hour == 5
+
+
+def test_insert_writes_through_and_miss_reads_mongo(memory_db, sensor_payload):
+    memory_db.insert_sensor_data(dict(sensor_payload, image={"base64_data": "aGk="}))
+    latest = memory_db.get_latest_reading("esp32_01")
+    assert latest["readings"]["temperature_c"] == 36.5
+    assert "base64_data" not in latest["image"]
+    assert memory_db.latest_cache.stats()["hits"] == 1
+
+    memory_db.latest_cache.clear()
+    assert memory_db.get_latest_reading("esp32_01")["sensor_id"] == "esp32_01"
+    assert memory_db.latest_cache.stats()["misses"] == 1
+    assert memory_db.get_latest_reading("unknown") is None
+
+
+def test_latest_endpoint(app_client, memory_db, sensor_payload):
+    memory_db.insert_sensor_data(sensor_payload)
+    response = app_client.get("/sensors/esp32_01/latest")
+    assert response.status_code == 200
+    assert response.get_json()["timestamp"] == "2025-06-29T14:00:00"
+    assert app_client.get("/sensors/nope/latest").status_code == 404
+    assert app_client.get("/sensors/latest/cache").get_json()["hits"] == 1
@@ -0,0 +1,64 @@
+"""Tests for the partitioned Parquet export of sensor history.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import pyarrow.dataset as ds  # noqa: E402
+
+from database.parquet_export import ParquetExporter, partition_path  # noqa: E402
+
+
+def _store(db, sensor_payload, day, sensor_id, hours=(0, 12)):
+    for hour in hours:
+        db.insert_sensor_data(
+            dict(
+                sensor_payload,
+                sensor_id=sensor_id,
+                timestamp=datetime.combine(day, datetime.min.time())
+                + timedelta(hours=hour),
+                image={"filename": "sky.jpg", "base64_data": "aGVsbG8="},
+            )
+        )
+
+
+def test_export_writes_typed_partitions_without_images(
+    memory_db, sensor_payload, tmp_path
+):
+    _store(memory_db, sensor_payload, date(2025, 6, 29), "esp32_01")
+    _store(memory_db, sensor_payload, date(2025, 6, 29), "esp32/02", hours=(3,))
+    _store(memory_db, sensor_payload, date(2025, 6, 30), "esp32_01")
+
+    report = ParquetExporter(memory_db, str(tmp_path), chunk_size=1).export()
+
+    assert report == {"days": 2, "partitions": 3, "rows": 5, "skipped": 0}
+    assert os.path.exists(partition_path(str(tmp_path), date(2025, 6, 29), "esp32/02"))
+    table = ds.dataset(str(tmp_path), partitioning="hive").to_table()
+    assert table.num_rows == 5
+    assert not any("image" in name for name in table.column_names)
+    row = table.filter(ds.field("sensor_id") == "esp32/02").to_pylist()[0]
+    assert row["readings_temperature_c"] == 36.5
+    assert row["device_info_battery_level"] == 82.0
+    assert row["location_description"] == "Delhi"
+    assert row["timestamp"].hour == 3
+
+
+def test_later_runs_only_export_new_days(memory_db, sensor_payload, tmp_path):
+    exporter = ParquetExporter(memory_db, str(tmp_path))
+    _store(memory_db, sensor_payload, date(2025, 6, 29), "esp32_01")
+    exporter.export()
+    assert exporter.load_state() == {"exported_through": date.today().isoformat()}
+
+    _store(memory_db, sensor_payload, date(2025, 6, 29), "esp32_02")
+    assert exporter.export()["partitions"] == 0
+
+    report = exporter.export(start=date(2025, 6, 29), end=date(2025, 6, 30))
+    assert (report["partitions"], report["skipped"]) == (1, 1)
+    table = ds.dataset(str(tmp_path), partitioning="hive").to_table()
+    assert table.num_rows == 4
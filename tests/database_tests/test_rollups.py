@@ -0,0 +1,74 @@
+"""Tests for incremental hourly/daily rollups and their rebuild.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+from datetime import datetime
+
+import mongomock
+import pytest
+
+from database.mongo_ops import WeatherDB
+
+
+def reading(sensor_id, hour, minute, temperature):
+    return {
+        "sensor_id": sensor_id,
+        "timestamp": datetime(2025, 6, 29, hour, minute),
+        "readings": {"temperature_c": temperature},
+        "device_info": {"battery_level": 80},
+    }
+
+
+@pytest.fixture
+def rollup_db():
+    db = WeatherDB(client=mongomock.MongoClient(), rollups=True)
+    yield db
+    db.close()
+
+
+def test_hourly_rollup_is_updated_on_insert(rollup_db):
+    rollup_db.insert_sensor_data(reading("esp32_01", 14, 30, 25.0))
+    rollup_db.insert_sensor_data_many(
+        [reading("esp32_01", 14, 10, 21.0), reading("esp32_01", 14, 50, 23.0)]
+    )
+    [row] = rollup_db.rollups.get("hour", "esp32_01")
+    stats = row["stats"]["readings_temperature_c"]
+    assert row["count"] == 3
+    assert (stats["min"], stats["max"], stats["mean"]) == (21.0, 25.0, 23.0)
+    assert row["last"]["readings_temperature_c"] == 23.0
+    assert row["last_timestamp"] == datetime(2025, 6, 29, 14, 50)
+
+
+def test_daily_rollup_spans_hours(rollup_db):
+    rollup_db.insert_sensor_data_many(
+        [reading("esp32_01", hour, 0, float(hour)) for hour in range(24)]
+    )
+    assert len(rollup_db.rollups.get("hour", "esp32_01")) == 24
+    [day] = rollup_db.rollups.get("day", "esp32_01")
+    assert day["stats"]["readings_temperature_c"]["mean"] == 11.5
+    assert day["stats"]["device_info_battery_level"]["count"] == 24
+
+
+def test_bulk_writer_updates_rollups():
+    db = WeatherDB(
+        client=mongomock.MongoClient(), rollups=True, bulk_write=True, bulk_batch_size=2
+    )
+    db.submit_sensor_data(reading("esp32_01", 9, 0, 10.0))
+    db.submit_sensor_data(reading("esp32_02", 9, 0, 12.0))
+    assert len(db.rollups.get("hour")) == 2
+    db.close()
+
+
+def test_rebuild_recomputes_from_raw_documents(rollup_db):
+    rollup_db.insert_sensor_data_many(
+        [reading("esp32_01", 8, 0, 10.0), reading("esp32_01", 9, 0, 20.0)]
+    )
+    rollup_db.rollups.collections["hour"].delete_many({})
+    rollup_db.rollups.collections["day"].update_many({}, {"$set": {"count": 99}})
+    processed = rollup_db.rollups.rebuild(
+        rollup_db, datetime(2025, 6, 29, 9), datetime(2025, 6, 29, 10)
+    )
+    assert processed == 2
+    assert len(rollup_db.rollups.get("hour", "esp32_01")) == 2
+    assert rollup_db.rollups.get("day", "esp32_01")[0]["count"] == 2
@@ -0,0 +1,118 @@
+"""Tests for the asyncio ingestion server and its backpressure behaviour.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import asyncio
+import functools
+import os
+import threading
+
+import mongomock
+from aiohttp.test_utils import TestClient, TestServer
+
+from database.mongo_ops import WeatherDB
+from ingestion.async_app import AsyncIngestService, create_app
+from observability import metrics
+
+
+class StalledDB:
+    """Wraps a WeatherDB and blocks batch writes until released."""
+
+    def __init__(self, db):
+        self.db = db
+        self.released = threading.Event()
+
+    def insert_sensor_data_many(self, documents):
+        self.released.wait(timeout=5)
+        return self.db.insert_sensor_data_many(documents)
+
+
+async def _post(service, *bodies):
+    async with TestClient(TestServer(create_app(service))) as client:
+        responses = []
+        for body in bodies:
+            response = await client.post("/readings", json=body)
+            responses.append((response.status, response.headers.get("Retry-After")))
+            await asyncio.sleep(0.05)
+        if isinstance(service.weather_db, StalledDB):
+            service.weather_db.released.set()
+    return responses
+
+
+def test_readings_are_batched_and_stored(memory_db, sensor_payload):
+    service = AsyncIngestService(memory_db, batch_wait=0.01, consumers=2)
+    invalid = dict(sensor_payload, location="window")
+    payloads = [dict(sensor_payload, message_id=str(i)) for i in range(3)]
+    responses = asyncio.run(_post(service, payloads, invalid))
+    assert [status for status, _ in responses] == [202, 202]
+    assert service.stats["stored"] == 3
+    assert service.stats["invalid"] == 1
+    assert memory_db.sensor_collection.count_documents({}) == 3
+
+
+def test_full_queue_answers_429_with_retry_after(memory_db, sensor_payload):
+    service = AsyncIngestService(
+        StalledDB(memory_db), maxsize=2, batch_size=1, consumers=1
+    )
+    payloads = [dict(sensor_payload, message_id=str(i)) for i in range(4)]
+    responses = asyncio.run(_post(service, *payloads))
+    assert (429, "1") in responses
+    assert service.stats["rejected"] >= 1
+    assert memory_db.sensor_collection.count_documents({}) == service.stats["queued"]
+
+
+def test_batch_larger_than_queue_answers_413(memory_db, sensor_payload):
+    service = AsyncIngestService(memory_db, maxsize=2, batch_wait=0.01)
+    payloads = [dict(sensor_payload, message_id=str(i)) for i in range(3)]
+    responses = asyncio.run(_post(service, payloads, payloads[:2]))
+    assert responses == [(413, None), (202, None)]
+    assert memory_db.sensor_collection.count_documents({}) == 2
+
+
+def memory_weather_db():
+    return WeatherDB(client=mongomock.MongoClient())
+
+
+class CrashOnceDB:
+    """Kills its worker process on the first write, marked by a file."""
+
+    def __init__(self, marker):
+        self.marker = marker
+        self.db = memory_weather_db()
+
+    def insert_sensor_data_many(self, documents, **kwargs):
+        if not os.path.exists(self.marker):
+            open(self.marker, "w").close()
+            os._exit(1)
+        return self.db.insert_sensor_data_many(documents, **kwargs)
+
+
+def test_dead_worker_is_replaced_and_batch_stored(sensor_payload, tmp_path):
+    marker = str(tmp_path / "crashed")
+    service = AsyncIngestService(
+        None,
+        batch_wait=0.01,
+        processes=1,
+        worker_db=functools.partial(CrashOnceDB, marker),
+    )
+    payloads = [dict(sensor_payload, message_id=str(i)) for i in range(3)]
+    responses = asyncio.run(_post(service, payloads, payloads[0]))
+    assert [status for status, _ in responses] == [202, 202]
+    assert os.path.exists(marker)
+    assert service.stats["failed"] == 0
+    assert service.stats["stored"] + service.stats["duplicates"] == 4
+
+
+def test_process_mode_stores_batches_in_workers(sensor_payload):
+    insert_timer = metrics.STAGE_SECONDS.labels("insert", "ok")
+    inserts_before = insert_timer.count
+    service = AsyncIngestService(
+        None, batch_wait=0.01, processes=2, worker_db=memory_weather_db
+    )
+    invalid = dict(sensor_payload, location="window")
+    payloads = [dict(sensor_payload, message_id=str(i)) for i in range(3)]
+    responses = asyncio.run(_post(service, payloads, invalid))
+    assert [status for status, _ in responses] == [202, 202]
+    assert (service.stats["stored"], service.stats["invalid"]) == (3, 1)
+    assert insert_timer.count > inserts_before
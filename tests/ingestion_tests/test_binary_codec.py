@@ -0,0 +1,97 @@
+"""Tests for the compact binary reading encodings accepted by /ingest/bulk.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import io
+from datetime import datetime, timezone
+
+import mongomock
+import pytest
+
+from database.blob_store import BlobStore
+from database.mongo_ops import WeatherDB
+from ingestion.app import create_app
+from ingestion.binary_codec import (
+    FRAME_HEADER,
+    FRAME_MAGIC,
+    FRAME_MIMETYPE,
+    decode_frame,
+    encode_frame,
+    iter_cbor,
+    iter_msgpack,
+)
+
+READING = {
+    "timestamp": datetime(2025, 6, 29, 14, 0, tzinfo=timezone.utc),
+    "sensor_id": "esp32_01",
+    "location": {"lat": 28.6139, "lon": 77.209},
+    "readings": {"temperature_c": 36.5, "humidity_percent": 64.2, "rain_mm": 0.4},
+    "device_info": {"battery_level": 82.0},
+}
+
+
+def test_frame_round_trip_drops_absent_readings():
+    (record,) = decode_frame(encode_frame([READING]))
+    assert record == READING
+
+
+def test_frame_rejects_bad_version_and_length():
+    body = encode_frame([READING, READING])
+    with pytest.raises(ValueError, match="length"):
+        decode_frame(body[:-1])
+    with pytest.raises(ValueError, match="version"):
+        decode_frame(FRAME_HEADER.pack(FRAME_MAGIC, 99, 0, 0))
+
+
+def test_bulk_frame_is_stored(app_client, memory_db):
+    other = dict(READING, sensor_id="esp32_02")
+    response = app_client.post(
+        "/ingest/bulk",
+        data=encode_frame([READING, other]),
+        content_type=FRAME_MIMETYPE,
+    )
+    assert response.status_code == 200
+    assert response.get_json()["accepted"] == 2
+    stored = memory_db.sensor_collection.find_one({"sensor_id": "esp32_02"})
+    assert stored["readings"]["rain_mm"] == 0.4
+
+
+def test_msgpack_raw_image_goes_to_blob_store(tmp_path, monkeypatch):
+    msgpack = pytest.importorskip("msgpack")
+    weather_db = WeatherDB(
+        client=mongomock.MongoClient(), blob_store=BlobStore(tmp_path)
+    )
+    image = b"\x89PNG" + bytes(range(256))
+    record = dict(READING, image={"format": "png", "data": image})
+    body = msgpack.packb([record, "oops"], datetime=True)
+
+    response = (
+        create_app(weather_db=weather_db)
+        .test_client()
+        .post("/ingest/bulk", data=body, content_type="application/msgpack")
+    )
+    assert [r["status"] for r in response.get_json()["results"]] == [
+        "accepted",
+        "rejected",
+    ]
+    stored = weather_db.sensor_collection.find_one({"sensor_id": "esp32_01"})
+    assert "data" not in stored["image"]
+    assert weather_db.blob_store.get(stored["image"]["sha256"]) == image
+    weather_db.close()
+
+
+def test_msgpack_reports_oversized_record():
+    msgpack = pytest.importorskip("msgpack")
+    body = msgpack.packb({"blob": b"x" * 64}) + msgpack.packb({"a": 1})
+    parsed = list(iter_msgpack(io.BytesIO(body), max_record_bytes=32))
+    assert parsed[0][2] == "record too large"
+
+
+def test_cbor_concatenated_items():
+    cbor2 = pytest.importorskip("cbor2")
+    body = cbor2.dumps(READING, datetime_as_timestamp=True) + cbor2.dumps([{"a": 1}])
+    parsed = list(iter_cbor(io.BytesIO(body), max_record_bytes=1024))
+    assert [error for _, _, error in parsed] == [None, None]
+    assert parsed[0][1]["readings"] == READING["readings"]
+    assert parsed[1][1] == {"a": 1}
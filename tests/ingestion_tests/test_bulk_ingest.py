@@ -0,0 +1,88 @@
+"""Tests for the streaming bulk ingest endpoint and its incremental parsers.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import io
+import json
+
+from ingestion import app as ingestion_app
+from ingestion.stream_parser import iter_json_array, iter_ndjson
+
+
+def test_ndjson_records_split_across_chunks():
+    body = b'{"a": 1}\n\n{"b": 2}\nnot json\n{"c": 3}'
+    parsed = list(iter_ndjson(io.BytesIO(body), chunk_size=3))
+    assert [(line, record) for line, record, _ in parsed] == [
+        (1, {"a": 1}),
+        (3, {"b": 2}),
+        (4, None),
+        (5, {"c": 3}),
+    ]
+
+
+def test_ndjson_rejects_oversized_line():
+    body = b'{"a": 1}\n' + b"x" * 64 + b'\n{"b": 2}\n'
+    parsed = list(iter_ndjson(io.BytesIO(body), chunk_size=4, max_record_bytes=16))
+    assert [error for _, _, error in parsed] == [None, "record too large", None]
+
+
+def test_json_seq_records_drop_their_separator():
+    body = b'\x1e{"a": 1}\n\x1e{"b": 2}\n'
+    parsed = list(iter_ndjson(io.BytesIO(body), chunk_size=3, json_seq=True))
+    assert parsed == [(1, {"a": 1}, None), (2, {"b": 2}, None)]
+
+
+def test_json_array_syntax_error_is_reported_before_the_limit():
+    body = b'[{"a": 1}, {"b": ]' + b" " * 4096 + b'{"c": "' + b"x" * 4096
+    stream = io.BytesIO(body)
+    parsed = list(iter_json_array(stream, chunk_size=8, max_record_bytes=1024))
+    assert parsed[-1][0] == 2 and parsed[-1][2].startswith("invalid JSON")
+    assert stream.tell() < 64
+
+    truncated = b'[{"a": "' + b"x" * 512 + b'"}]'
+    parsed = list(iter_json_array(io.BytesIO(truncated), chunk_size=8))
+    assert parsed == [(1, {"a": "x" * 512}, None)]
+
+
+def test_json_array_is_parsed_incrementally():
+    body = '[{"a": 1}, 7, {"b": "é"}]'.encode()
+    parsed = list(iter_json_array(io.BytesIO(body), chunk_size=2))
+    assert parsed == [
+        (1, {"a": 1}, None),
+        (2, None, "expected a JSON object"),
+        (3, {"b": "é"}, None),
+    ]
+
+
+def test_bulk_ndjson_reports_per_line_results(app_client, memory_db, sensor_payload):
+    invalid = dict(sensor_payload, location="window")
+    other = dict(sensor_payload, sensor_id="esp32_02")
+    body = "\n".join(json.dumps(p) for p in (sensor_payload, invalid, other))
+    response = app_client.post(
+        "/ingest/bulk", data=body, content_type="application/x-ndjson"
+    )
+    assert response.status_code == 200
+    result = response.get_json()
+    assert (result["accepted"], result["rejected"]) == (2, 1)
+    assert [r["status"] for r in result["results"]] == [
+        "accepted",
+        "rejected",
+        "accepted",
+    ]
+    assert memory_db.sensor_collection.count_documents({}) == 2
+
+
+def test_bulk_json_array_writes_in_batches(
+    app_client, memory_db, sensor_payload, monkeypatch
+):
+    monkeypatch.setattr(ingestion_app, "BULK_INGEST_BATCH_SIZE", 2)
+    payloads = [dict(sensor_payload, message_id=str(i)) for i in range(5)]
+    response = app_client.post("/ingest/bulk", json=payloads)
+    assert response.get_json()["accepted"] == 5
+    assert memory_db.sensor_collection.count_documents({}) == 5
+
+
+def test_bulk_rejects_unknown_content_type(app_client):
+    response = app_client.post("/ingest/bulk", data="x", content_type="text/plain")
+    assert response.status_code == 415
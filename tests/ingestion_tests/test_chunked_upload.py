@@ -0,0 +1,124 @@
+"""Tests for resumable chunked uploads and the /uploads routes.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import hashlib
+import io
+import time
+
+import pytest
+
+from ingestion import app as ingestion_app
+from ingestion.chunked_upload import ChunkedUploadManager, UploadError
+from ingestion.image_jobs import ImageJobQueue
+
+IMAGE = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return ChunkedUploadManager(
+        staging_dir=tmp_path / "staging",
+        upload_dir=tmp_path / "images",
+        max_upload_bytes=len(IMAGE),
+        max_part_bytes=4096,
+    )
+
+
+def test_parts_out_of_order_are_assembled(manager, tmp_path):
+    upload_id = manager.init_upload("cam.jpg", {"sensor_id": "esp32_01"})
+    parts = [IMAGE[i : i + 4096] for i in range(0, len(IMAGE), 4096)]
+    for number in reversed(range(1, len(parts) + 1)):
+        manager.write_part(upload_id, number, io.BytesIO(parts[number - 1]))
+    result = manager.commit(
+        upload_id, len(parts), sha256=hashlib.sha256(IMAGE).hexdigest()
+    )
+    assert (tmp_path / "images" / result["filename"]).read_bytes() == IMAGE
+    assert not (tmp_path / "staging" / upload_id).exists()
+
+
+def test_commit_reports_missing_parts(manager):
+    upload_id = manager.init_upload("cam.jpg", {})
+    manager.write_part(upload_id, 2, io.BytesIO(b"abc"))
+    with pytest.raises(UploadError, match=r"missing parts: \[1\]"):
+        manager.commit(upload_id, 2)
+    assert manager.status(upload_id)["parts"] == [2]
+
+
+def test_oversized_part_and_bad_checksum_are_rejected(manager):
+    upload_id = manager.init_upload("cam.jpg", {})
+    with pytest.raises(UploadError) as excinfo:
+        manager.write_part(upload_id, 1, io.BytesIO(b"x" * 5000))
+    assert excinfo.value.status == 413
+    with pytest.raises(UploadError, match="checksum"):
+        manager.write_part(upload_id, 1, io.BytesIO(b"abc"), sha256="0" * 64)
+    assert manager.status(upload_id)["parts"] == []
+
+
+def test_cleanup_removes_abandoned_uploads(manager):
+    upload_id = manager.init_upload("old.jpg", {})
+    assert manager.cleanup_abandoned() == 0
+    assert manager.cleanup_abandoned(now=time.time() + manager.stale_after + 1) == 1
+    with pytest.raises(UploadError):
+        manager.status(upload_id)
+
+
+def test_malformed_init_requests_are_rejected(manager, monkeypatch):
+    monkeypatch.setattr(ingestion_app, "upload_manager", manager)
+    client = ingestion_app.app.test_client()
+    body = {"filename": "cam.jpg", "sensor_id": "esp32_01", "timestamp": "now"}
+    for bad in ({"total_size": "1024"}, {"total_size": -1}, {"sha256": 12}):
+        response = client.post("/uploads", json=body | bad)
+        assert response.status_code == 400, bad
+    assert client.post("/uploads", json=[body]).status_code == 400
+    assert client.post("/uploads/0/commit", json=[2]).status_code == 400
+    assert not manager.staging_dir.exists()
+
+
+def test_failed_commit_releases_its_claim(manager, monkeypatch):
+    upload_id = manager.init_upload("cam.jpg", {})
+    manager.write_part(upload_id, 1, io.BytesIO(IMAGE[:100]))
+
+    def disk_full(*args):
+        raise OSError(28, "No space left on device")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("ingestion.chunked_upload.os.replace", disk_full)
+        with pytest.raises(OSError):
+            manager.commit(upload_id, 1)
+    assert manager.status(upload_id)["parts"]
+    assert manager.commit(upload_id, 1)["size"] == 100
+
+
+def test_cleanup_removes_claims_of_crashed_commits(manager):
+    upload_id = manager.init_upload("cam.jpg", {})
+    claimed = manager.staging_dir / f"{upload_id}.committing"
+    (manager.staging_dir / upload_id).rename(claimed)
+    assert manager.cleanup_abandoned() == 0
+    assert manager.cleanup_abandoned(now=time.time() + manager.stale_after + 1) == 1
+    assert not claimed.exists()
+
+
+def test_chunked_upload_routes(manager, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion_app, "upload_manager", manager)
+    monkeypatch.setattr(ingestion_app, "image_jobs", ImageJobQueue(tmp_path / "jobs"))
+    client = ingestion_app.app.test_client()
+    response = client.post(
+        "/uploads",
+        json={"filename": "cam.jpg", "sensor_id": "esp32_01", "timestamp": "now"},
+    )
+    assert response.status_code == 201
+    upload_id = response.get_json()["upload_id"]
+
+    client.put(f"/uploads/{upload_id}/parts/1", data=IMAGE[:4096])
+    assert (
+        client.post(f"/uploads/{upload_id}/commit", json={"parts": 2}).status_code
+        == 409
+    )
+    client.put(f"/uploads/{upload_id}/parts/2", data=IMAGE[4096:8192])
+    response = client.post(f"/uploads/{upload_id}/commit", json={"parts": 2})
+    assert response.status_code == 200
+    assert response.get_json()["size"] == 8192
+    assert ingestion_app.image_jobs.counts()["pending"] == 1
+    assert client.get(f"/uploads/{upload_id}").status_code == 404
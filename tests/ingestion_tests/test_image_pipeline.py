@@ -0,0 +1,146 @@
+"""Tests for the persistent image job queue and the background image pipeline.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import io
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from unittest import mock
+
+import pytest
+
+from database.blob_store import BlobStore
+from ingestion import app as ingestion_app
+from ingestion.image_jobs import ImageJobQueue
+from ingestion.image_pipeline import ImagePipeline
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _jpeg(path, size=(640, 480), captured="2025:06:29 14:00:00"):
+    exif = Image.Exif()
+    exif[0x0132] = captured
+    Image.new("RGB", size, (30, 120, 200)).save(path, "JPEG", exif=exif)
+    return path
+
+
+def test_failed_job_waits_out_its_backoff(tmp_path):
+    queue = ImageJobQueue(tmp_path, retry_delay=60)
+    queue.enqueue(tmp_path / "a.jpg", {"sensor_id": "cam_01"})
+    [job] = queue.claim(10)
+    assert queue.claim(10) == []
+    assert queue.fail(job, "decode error") is True
+    assert queue.claim(10) == []
+    assert queue.counts() == {"pending": 1, "running": 0, "failed": 0}
+
+
+def test_job_gives_up_after_max_attempts(tmp_path):
+    queue = ImageJobQueue(tmp_path, max_attempts=2, retry_delay=0)
+    queue.enqueue(tmp_path / "a.jpg", {})
+    assert queue.fail(queue.claim(1)[0], "decode error") is True
+    [job] = queue.claim(1)
+    assert job["attempts"] == 1
+    assert queue.fail(job, "decode error") is False
+    assert queue.counts() == {"pending": 0, "running": 0, "failed": 1}
+
+
+def test_interrupted_jobs_are_recovered(tmp_path):
+    queue = ImageJobQueue(tmp_path)
+    queue.enqueue(tmp_path / "a.jpg", {})
+    queue.claim(1)
+    assert queue.counts()["running"] == 1
+    assert queue.recover() == 1
+    assert len(queue.claim(1)) == 1
+
+
+def test_pipeline_stores_thumbnail_archive_and_metadata(memory_db, tmp_path):
+    queue = ImageJobQueue(tmp_path / "jobs")
+    blobs = BlobStore(tmp_path / "blobs")
+    job_id = queue.enqueue(
+        _jpeg(tmp_path / "sky.jpg"),
+        {"sensor_id": "cam_01", "timestamp": "2025-06-29T14:00:00"},
+    )
+    queue.enqueue(tmp_path / "missing.jpg", {"sensor_id": "cam_01"})
+
+    stats = ImagePipeline(
+        queue, memory_db, blob_store=blobs, processes=0
+    ).run_until_idle()
+
+    assert stats == {"processed": 1, "retried": 0, "failed": 1}
+    assert queue.counts() == {"pending": 0, "running": 0, "failed": 1}
+    document = memory_db.image_collection.find_one({"_id": job_id})
+    assert document["timestamp"] == datetime(2025, 6, 29, 14)
+    assert document["image"]["width"] == 640
+    assert document["captured_at"].year == 2025
+    assert document["thumbnail"]["width"] == 256
+    assert document["archive"]["format"] == "webp"
+    with Image.open(io.BytesIO(blobs.get(document["thumbnail"]["sha256"]))) as thumb:
+        assert thumb.size == (256, 192)
+    assert blobs.exists(document["archive"]["sha256"])
+
+
+def test_pipeline_runs_jobs_in_worker_processes(memory_db, tmp_path):
+    queue = ImageJobQueue(tmp_path / "jobs")
+    for index in range(3):
+        queue.enqueue(_jpeg(tmp_path / f"{index}.jpg", size=(64, 48 + index)), {})
+    pipeline = ImagePipeline(
+        queue, memory_db, blob_store=BlobStore(tmp_path / "blobs"), processes=1
+    )
+    assert pipeline.run_until_idle()["processed"] == 3
+    assert memory_db.image_collection.count_documents({}) == 3
+
+
+def test_broken_pool_is_restarted_once(memory_db, tmp_path, monkeypatch):
+    queue = ImageJobQueue(tmp_path / "jobs", retry_delay=60)
+    for index in range(3):
+        queue.enqueue(tmp_path / f"{index}.jpg", {})
+    pipeline = ImagePipeline(
+        queue, memory_db, blob_store=BlobStore(tmp_path / "blobs"), processes=1
+    )
+    broken = pipeline._executor = mock.Mock()
+    for job in queue.claim(3):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        pipeline._in_flight[future] = (job, broken)
+
+    monkeypatch.setattr(
+        pipeline, "_start_executor", lambda: setattr(pipeline, "_executor", "new")
+    )
+    while pipeline._in_flight:
+        pipeline.step(0)
+
+    broken.shutdown.assert_called_once()
+    assert pipeline._executor == "new"
+    assert pipeline.stats["retried"] == 3
+
+
+def test_upload_only_enqueues(memory_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion_app, "image_jobs", ImageJobQueue(tmp_path / "jobs"))
+    app = ingestion_app.create_app(weather_db=memory_db)
+    app.config["UPLOAD_FOLDER"] = str(tmp_path / "raw")
+    response = app.test_client().post(
+        "/upload",
+        data={
+            "file": (_jpeg(tmp_path / "cam.jpg").open("rb"), "cam.jpg"),
+            "sensor_id": "cam_01",
+            "timestamp": "2025-06-29T14:00:00",
+        },
+    )
+    assert response.status_code == 200
+    again = app.test_client().post(
+        "/upload",
+        data={
+            "file": (_jpeg(tmp_path / "cam.jpg").open("rb"), "cam.jpg"),
+            "sensor_id": "cam_01",
+            "timestamp": "2025-06-29T14:05:00",
+        },
+    )
+    first, second = ingestion_app.image_jobs.claim(2)
+    assert first["id"] == response.get_json()["job_id"]
+    assert second["id"] == again.get_json()["job_id"]
+    assert first["metadata"]["sensor_id"] == "cam_01"
+    assert first["path"] != second["path"]
+    assert len(list((tmp_path / "raw").iterdir())) == 2
+    assert memory_db.image_collection.count_documents({}) == 0
@@ -0,0 +1,64 @@
+"""Tests for the ingest stage metrics and the Prometheus /metrics route.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import json
+
+import pytest
+
+from observability import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1))
+    histogram.labels("a").observe(0.05)
+    histogram.labels("a").observe(0.5)
+    histogram.labels("a").observe(3)
+    lines = histogram.render()
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{stage="a"} 3' in lines
+
+
+def test_counter_escapes_label_values():
+    counter = metrics.Counter("demo_events", "Demo.", ("name",))
+    counter.labels('a"b').inc(2)
+    assert 'demo_events_total{name="a\\"b"} 2.0' in counter.render()
+
+
+def test_stage_tags_outcome():
+    def count(outcome):
+        return metrics.STAGE_SECONDS.labels("demo_stage", outcome).count
+
+    before = {outcome: count(outcome) for outcome in ("ok", "invalid", "error")}
+    with metrics.stage("demo_stage"):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.stage("demo_stage", invalid=ValueError):
+            raise ValueError
+    with pytest.raises(KeyError):
+        with metrics.stage("demo_stage", invalid=ValueError):
+            raise KeyError
+    assert {o: count(o) - before[o] for o in before} == {
+        "ok": 1,
+        "invalid": 1,
+        "error": 1,
+    }
+
+
+def test_metrics_route_reports_bulk_ingest(app_client, sensor_payload):
+    body = "\n".join([json.dumps(sensor_payload), "{}"])
+    app_client.post("/ingest/bulk", data=body, content_type="application/x-ndjson")
+
+    response = app_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+    for stage, outcome in (("decode", "ok"), ("validate", "invalid"), ("insert", "ok")):
+        assert (
+            f'weather_ingest_stage_seconds_count{{stage="{stage}",outcome="{outcome}"}}'
+            in text
+        )
+    assert 'weather_ingest_records_total{endpoint="bulk",outcome="accepted"}' in text
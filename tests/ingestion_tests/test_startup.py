@@ -0,0 +1,61 @@
+"""Tests for the lazy ingestion app factory and its warm-up hook.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from ingestion import app as ingestion_app
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+
+
+def test_import_defers_heavy_dependencies(tmp_path):
+    script = (
+        "import sys, ingestion.app; "
+        "print(sorted(m for m in ('pymongo', 'pydantic', 'numpy') if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=tmp_path,  # the app writes logs/ relative to it
+        env=dict(os.environ, PYTHONPATH=SRC),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert output.strip() == "[]"
+
+
+def test_create_app_logs_to_log_file(tmp_path):
+    script = (
+        "from ingestion import app; "
+        "app.create_app(); "
+        "app.log_event('Probe', step=1)"
+    )
+    subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=tmp_path,
+        env=dict(os.environ, PYTHONPATH=SRC),
+        check=True,
+    )
+    lines = (tmp_path / "logs" / "system.log").read_text().splitlines()
+    probe = [json.loads(line) for line in lines if '"Probe"' in line]
+    assert probe and probe[0]["data"] == {"step": 1}
+
+
+def test_create_app_uses_given_database(memory_db, sensor_payload):
+    app = ingestion_app.create_app(weather_db=memory_db)
+    response = app.test_client().post("/ingest/bulk", json=[sensor_payload])
+    assert response.get_json()["accepted"] == 1
+    assert ingestion_app.get_weather_db(app) is memory_db
+    assert ingestion_app.app.extensions.get("weather_db") is not memory_db
+
+
+def test_warm_up_reports_each_step_and_ensures_schema(memory_db):
+    timings = ingestion_app.warm_up(ingestion_app.create_app(weather_db=memory_db))
+    assert set(timings) == {"schemas", "binary_codec", "database"}
+    assert all(seconds >= 0 for seconds in timings.values())
+    assert "reading_key" in memory_db.sensor_collection.index_information()
@@ -0,0 +1,85 @@
+"""Tests for the queue-backed structured JSON logging pipeline.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import json
+import logging
+import queue
+
+import pytest
+
+from observability.structured_logging import (
+    DroppingQueueHandler,
+    SamplingFilter,
+    configure_logging,
+    shutdown_logging,
+)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    root = logging.getLogger()
+    saved = (list(root.handlers), root.level)
+    yield tmp_path / "logs" / "system.log"
+    shutdown_logging()
+    root.handlers[:] = saved[0]
+    root.setLevel(saved[1])
+    logging.getLogger("demo.quiet").setLevel(logging.NOTSET)
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_records_are_written_as_json_lines(log_file):
+    configure_logging(log_file=str(log_file), levels="demo.quiet=ERROR", sample="")
+    logging.getLogger("demo").info("Stored %s", "reading", extra={"data": {"id": 7}})
+    logging.getLogger("demo.quiet").warning("suppressed")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("demo").exception("Failed")
+    shutdown_logging()
+
+    first, second = read_lines(log_file)
+    assert first["message"] == "Stored reading"
+    assert (first["level"], first["logger"], first["data"]) == (
+        "INFO",
+        "demo",
+        {"id": 7},
+    )
+    assert "ValueError: boom" in second["exc"]
+
+
+def test_sampling_keeps_every_nth_record():
+    sampler = SamplingFilter({"demo.hot": 3})
+    hot = [
+        logging.LogRecord("demo.hot.x", 20, "", 0, "m", None, None) for _ in range(7)
+    ]
+    other = logging.LogRecord("demo.cold", 20, "", 0, "m", None, None)
+    assert [sampler.filter(record) for record in hot] == [
+        True,
+        False,
+        False,
+        True,
+        False,
+        False,
+        True,
+    ]
+    assert sampler.filter(other)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    for _ in range(3):
+        handler.handle(logging.LogRecord("demo", 20, "", 0, "m", None, None))
+    assert handler.dropped == 2
+
+
+def test_log_file_is_rotated_by_size(log_file):
+    configure_logging(log_file=str(log_file), max_bytes=300, backup_count=2)
+    for index in range(20):
+        logging.getLogger("demo").info("line %d", index)
+    shutdown_logging()
+    assert log_file.with_name("system.log.1").exists()
@@ -0,0 +1,49 @@
+"""Tests for batch validation of WeatherSensorData payloads.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+from datetime import datetime
+
+from validation.batch import validate_sensor_batch
+from validation.schemas.weather_sensor_data import WeatherSensorData
+
+
+def test_batch_matches_per_record_dump(sensor_payload):
+    result = validate_sensor_batch([sensor_payload, dict(sensor_payload)])
+    expected = WeatherSensorData(**sensor_payload).model_dump(exclude_none=True)
+    assert result.records == [expected, expected]
+    assert result.indices == [0, 1]
+    assert result.errors == {}
+    assert isinstance(result.records[0]["timestamp"], datetime)
+
+
+def test_invalid_payloads_do_not_reject_the_batch(sensor_payload):
+    bad = dict(sensor_payload, readings={"temperature_c": "hot"})
+    result = validate_sensor_batch([bad, sensor_payload, "not a dict"])
+    assert result.indices == [1]
+    assert len(result.records) == 1
+    assert sorted(result.errors) == [0, 2]
+    assert result.errors[0][0]["loc"] == ("readings", "temperature_c")
+
+
+def test_trusted_mode_prunes_none_and_checks_required(sensor_payload):
+    trusted = dict(sensor_payload, comments=None)
+    trusted["device_info"] = dict(trusted["device_info"], firmware_version=None)
+    result = validate_sensor_batch([trusted, {"sensor_id": "x"}], trusted=True)
+    assert result.indices == [0]
+    assert "comments" not in result.records[0]
+    assert "firmware_version" not in result.records[0]["device_info"]
+    assert {error["loc"] for error in result.errors[1]} == {
+        ("timestamp",),
+        ("location",),
+        ("readings",),
+        ("device_info",),
+    }
+
+
+def test_explicit_none_and_extra_fields_are_dropped(sensor_payload):
+    payload = dict(sensor_payload, comments=None, unknown="x")
+    payload["readings"] = dict(payload["readings"], rain_mm=None)
+    [record] = validate_sensor_batch([payload]).records
+    assert record == WeatherSensorData(**payload).model_dump(exclude_none=True)
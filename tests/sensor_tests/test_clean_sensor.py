@@ -7,7 +7,7 @@ and boolean value normalization.
 
 import pytest
 
-from transform.clean_sensor import clean_sensor_data
+from transform.clean_sensor import clean_sensor_data, compile_cleaning_plan
 
 
 def test_temperature_conversion():
@@ -32,3 +32,16 @@ def test_boolean_conversion():
     input_data = {"anomaly_detected": "True"}
     result = clean_sensor_data(input_data)
     assert result["anomaly_detected"] is True
+
+
+def test_plan_is_cached_per_payload_shape():
+    compile_cleaning_plan.cache_clear()
+    clean_sensor_data({"sensor_id": "a", "humidity": "10"})
+    clean_sensor_data({"sensor_id": "b", "humidity": "20"})
+    info = compile_cleaning_plan.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_plan_only_contains_present_fields():
+    plan = compile_cleaning_plan(("humidity", "unknown_field", "temperature_c"))
+    assert [step[0] for step in plan] == ["temperature_c", "humidity"]
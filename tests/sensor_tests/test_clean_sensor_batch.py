@@ -0,0 +1,70 @@
+"""Batch Sensor Data Cleaning Tests
+This module contains tests for clean_sensor_batch, checking that the column-wise
+NumPy path produces the same values as clean_sensor_data record by record.
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import numpy as np
+import pytest
+
+from transform.clean_sensor import (
+    clean_sensor_batch,
+    clean_sensor_chunks,
+    clean_sensor_data,
+)
+
+RAW_RECORDS = [
+    {
+        "sensor_id": " esp32_01 ",
+        "temperature_c": "25.0",
+        "humidity": 80,
+        "wind_speed_mps": 10,
+        "pressure_hpa": 1008.3,
+        "anomaly_detected": "True",
+    },
+    {"sensor_id": "esp32_02", "temperature_c": "n/a", "humidity": "", "comments": ""},
+    {"sensor_id": "esp32_03", "temperature_c": None, "data_quality": "good"},
+    {"timestamp": "2025-06-29T14:00:00Z", "battery_level": True},
+]
+
+# Values float() rejects or parses specially, which NumPy alone handles differently
+EDGE_RECORDS = [
+    {"temperature_c": [1], "humidity": "nan"},
+    {"temperature_c": [[1, 2]], "humidity": [[1], [2]]},
+    {"temperature_c": 10**400, "humidity": " 42 "},
+]
+
+
+def _nan_as_text(records):
+    return [
+        {k: "NaN" if isinstance(v, float) and np.isnan(v) else v for k, v in r.items()}
+        for r in records
+    ]
+
+
+@pytest.mark.parametrize("records", [RAW_RECORDS, EDGE_RECORDS, [{"humidity": 7}]])
+def test_batch_matches_scalar_path(records):
+    batch = clean_sensor_batch(records)
+    expected = [clean_sensor_data(r) for r in records]
+    assert _nan_as_text(batch.to_records()) == _nan_as_text(expected)
+    assert all(column.ndim == 1 for column in batch.columns.values())
+
+
+def test_unit_conversions_are_vectorized():
+    batch = clean_sensor_batch(RAW_RECORDS)
+    assert batch.columns["temperature_k"].dtype == np.float64
+    assert batch.columns["temperature_k"][0] == pytest.approx(298.15)
+    assert batch.columns["wind_speed_kph"][0] == pytest.approx(36.0)
+    assert batch.columns["pressure_pa"][0] == pytest.approx(100830.0)
+
+
+def test_unparsable_values_are_nan():
+    batch = clean_sensor_batch(RAW_RECORDS)
+    assert np.isnan(batch.columns["temperature_k"][1])
+    assert batch.present["temperature_k"].tolist() == [True, True, True, False]
+
+
+def test_chunks_are_cleaned_lazily():
+    chunks = iter([RAW_RECORDS[:2], RAW_RECORDS[2:]])
+    sizes = [batch.size for batch in clean_sensor_chunks(chunks)]
+    assert sizes == [2, 2]
@@ -0,0 +1,55 @@
+"""Tests for the synthetic multi-station load generator.
+
+# SPDX-License-Identifier: Apache-2.0
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+
+from scripts.load_generator import (
+    StationSimulator,
+    make_station,
+    parse_args,
+    run_worker,
+)
+from validation.schemas.weather_sensor_data import WeatherSensorData
+
+
+def simulator(**kwargs):
+    station = make_station(0, random.Random(7))
+    station.lon = 0.0  # local solar time == UTC
+    return StationSimulator(station, random.Random(7), **kwargs)
+
+
+def test_readings_follow_diurnal_cycle_and_validate():
+    sim = simulator(noise=0, outage_rate=0, anomaly_rate=0)
+    dawn = sim.reading(datetime(2025, 6, 29, 5))
+    afternoon = sim.reading(datetime(2025, 6, 29, 15))
+    WeatherSensorData(**afternoon)
+    assert afternoon["readings"]["temperature_c"] > dawn["readings"]["temperature_c"]
+    assert (
+        afternoon["readings"]["humidity_percent"] < dawn["readings"]["humidity_percent"]
+    )
+
+
+def test_outages_skip_readings():
+    sim = simulator(outage_rate=1)
+    start = datetime(2025, 6, 29)
+    readings = [sim.reading(start + timedelta(minutes=i)) for i in range(5)]
+    assert readings == [None] * 5
+
+
+def test_worker_writes_requested_count_to_ndjson(tmp_path):
+    args = parse_args(
+        ["--stations", "4", "--workers", "2", "--count", "40", "--rate", "1e6"]
+        + ["--out", str(tmp_path), "--image-rate", "1", "--image-bytes", "64"]
+    )
+    counts = run_worker(args, 0)
+    lines = (tmp_path / "load-00.ndjson").read_text().splitlines()
+    assert counts["generated"] == counts["written"] == len(lines) == 20
+    assert {json.loads(line)["sensor_id"] for line in lines} == {
+        "sim_00000",
+        "sim_00002",
+    }
+    assert all("base64_data" in json.loads(line)["image"] for line in lines)